@@ -4,19 +4,22 @@ import pandas as pd
 import os
 import time 
 import pytz
-from datetime import timedelta, datetime, date, time as dt_time 
+from datetime import datetime, date, time as dt_time 
 from dotenv import load_dotenv
 
 # Dependência do scraper (Deve estar disponível no src/)
 from src.scraper_soccerstats import get_today_games 
 # 🚨 CORREÇÃO NO IMPORT: Usar a função de envio único
 from src.telegram_alerts import enviar_alertes_unicos, enviar_mensagem 
-from src.database import prepare_df_for_insertion, get_mysql_connection, insert_df_into_mysql, run_results_update_workflow
+from src.database import prepare_df_for_insertion, mysql_connection, insert_df_into_mysql, run_results_update_workflow
 from buscar_resultados import recreate_results_csv
+from src.features import limpar_e_converter_dados, calcular_probabilidades
+from src.fixture_store import load_fixtures, save_fixtures, fixtures_mtime, remove_fixtures, FIXTURES_PATH
+from src.kickoff_time import format_horario, minutes_of_day
+from src.alert_rules import RuleSet
 
 # --- Configurações ---
 TIMEZONE_TARGET = 'America/Sao_Paulo'
-EXCEL_PATH = "data/Jogos_de_Hoje.xlsx"
 
 # Configurações do Telegram para o botão de teste
 load_dotenv()
@@ -33,60 +36,20 @@ st.title("📊 Robô de Apostas - SoccerStats")
 st.sidebar.title("Menu")
 # A navegação multipáginas do Streamlit exibirá automaticamente as páginas do diretório "pages/" no menu lateral.
 
-# --- FUNÇÕES DE PROCESSAMENTO DE DADOS (Mantidas) ---
-def limpar_e_converter_dados(df):
-    """Limpa '%' das colunas de porcentagem e converte para float."""
-    perc_cols = [col for col in df.columns if col.startswith(('Over', 'BTTS')) and ('H' in col or 'A' in col)]
-    
-    for col in perc_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace('%', '', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-    df.dropna(subset=perc_cols, inplace=True)
-    return df
-
-def calcular_probabilidades(df):
-    """Adiciona colunas com probabilidade de Over 1.5, Over 2.5 e ambas"""
-    # 1. Cálculos de Médias Simples
-    if 'Over15_H' in df.columns and 'Over15_A' in df.columns:
-        df['Prob_Over1.5'] = ((df['Over15_H'] + df['Over15_A']) / 2).round(2)
-        df['Over15_MEDIA'] = df['Prob_Over1.5'] # Manter o nome de coluna para compatibilidade
-    if 'Over25_H' in df.columns and 'Over25_A' in df.columns:
-        df['Prob_Over2.5'] = ((df['Over25_H'] + df['Over25_A']) / 2).round(2)
-        df['Over25_MEDIA'] = df['Prob_Over2.5']
-    if 'BTTS_H' in df.columns and 'BTTS_A' in df.columns:
-        df['Prob_BTTS'] = ((df['BTTS_H'] + df['BTTS_A']) / 2).round(2)
-        df['Over_BOTH'] = df['Prob_BTTS']
-
-    # 2. Cálculo da MÉDIA_PROB
-    perc_cols = ['Over15_H', 'Over25_H', 'BTTS_H', 'Over15_A', 'Over25_A', 'BTTS_A']
-    colunas_para_media = [col for col in perc_cols if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
-    
-    if len(colunas_para_media) == 6:
-        df['MÉDIA_PROB'] = df[colunas_para_media].sum(axis=1) / 6
-        df['MÉDIA_PROB'] = df['MÉDIA_PROB'].round(2)
-    else:
-        df['MÉDIA_PROB'] = 0 
-        
-    return df
-# --- FIM DAS FUNÇÕES DE PROCESSAMENTO ---
-
-
 # --- FUNÇÃO PRINCIPAL DE CARREGAMENTO DE DADOS COM CACHE (Mantida) ---
 @st.cache_data(ttl=3600, show_spinner="🔄 Raspando dados atualizados. Aguarde, isso pode levar 10-20 segundos...")
 def load_and_process_data():
     
     # 1. Tenta carregar do arquivo se for de hoje (rápido)
-    if os.path.exists(EXCEL_PATH):
-        data_modificacao_timestamp = os.path.getmtime(EXCEL_PATH)
+    data_modificacao_timestamp = fixtures_mtime()
+    if data_modificacao_timestamp is not None:
         data_modificacao = datetime.fromtimestamp(data_modificacao_timestamp).date()
         
         if data_modificacao == DATA_DE_HOJE:
-            df = pd.read_excel(EXCEL_PATH)
+            df = load_fixtures()
             # Verifica se o DF tem dados e se o cache está sendo usado
             if not df.empty and 'MÉDIA_PROB' in df.columns:
-                st.info(f"Dados carregados do Excel salvo em {datetime.fromtimestamp(data_modificacao_timestamp).strftime('%H:%M:%S')} (Cache ativo).")
+                st.info(f"Dados carregados do cache salvo em {datetime.fromtimestamp(data_modificacao_timestamp).strftime('%H:%M:%S')} (Cache ativo).")
                 return df
 
     # 2. Raspagem (Acontece se o cache não existir ou estiver expirado)
@@ -98,9 +61,7 @@ def load_and_process_data():
     df = calcular_probabilidades(df)
     
     # 4. Salvar (para o bot de backend e para carregamentos rápidos futuros)
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    df.to_excel(EXCEL_PATH, index=False)
+    save_fixtures(df)
     
     return df
 # --- FIM DA FUNÇÃO DE CACHE ---
@@ -116,13 +77,12 @@ def clear_cache_and_reload():
 st.markdown("---")
 if st.button("🔄 RASPAR DADOS AGORA (Pode levar 10-20 segundos)"):
     try:
-        # Remove o arquivo Excel antes de raspar novamente
-        if os.path.exists(EXCEL_PATH):
-            os.remove(EXCEL_PATH)
-            st.info(f"Arquivo '{EXCEL_PATH}' removido para recriação.")
+        # Remove o cache de jogos antes de raspar novamente
+        for removido in remove_fixtures():
+            st.info(f"Arquivo '{removido}' removido para recriação.")
     except Exception as e:
-        st.warning(f"Não foi possível remover '{EXCEL_PATH}': {e}")
-    # Limpa cache e força nova raspagem que irá salvar o Excel novamente
+        st.warning(f"Não foi possível remover '{FIXTURES_PATH}': {e}")
+    # Limpa cache e força nova raspagem que irá salvar o cache novamente
     clear_cache_and_reload()
     st.rerun()
 
@@ -143,49 +103,25 @@ df_filtrado = pd.DataFrame()
 if not df.empty:
     st.subheader("Filtros de Apostas e Análise")
 
-    # --- FILTROS INTERATIVOS ---
-    tipo_aposta = st.selectbox("Tipo de aposta", [
-        "Todos",
-        "Alta Prob. Aberto (Top)", 
-        "Over 1.5",
-        "Over 2.5",
-        "Mandante Forte x Visitante Fraco",
-        "Visitante Forte x Mandante Fraco"
-    ], index=2)  # default: Over 1.5
+    # --- FILTROS INTERATIVOS (regras da seção "painel" de config/alert_rules.json) ---
+    regras_painel = RuleSet.from_file("painel")
+    nomes_regras = [r.name for r in regras_painel.rules]
+    tipo_aposta = st.selectbox(
+        "Tipo de aposta",
+        nomes_regras,
+        index=nomes_regras.index("over15") if "over15" in nomes_regras else 0,  # default: Over 1.5
+        format_func=lambda nome: regras_painel.get(nome).label,
+    )
     
     min_jogos = st.slider("Número mínimo de partidas", 0, 20, 10)  # default: 10
     
     perc_min = 0
-    if tipo_aposta.startswith("Over") or tipo_aposta.startswith("Alta Prob."):
+    if "perc_min" in regras_painel.get(tipo_aposta).params:
         perc_min = st.slider("Porcentagem mínima", 0, 100, 70)  # default: 70
     
-    # --- Aplicar filtros dinamicamente ---
-    df_filtrado = df.copy()
-    
-    df_filtrado = df_filtrado[df_filtrado.get('Partidas', 0) >= min_jogos] 
-
-    if tipo_aposta == "Mandante Forte x Visitante Fraco":
-        df_filtrado = df_filtrado[
-            (df_filtrado.get('PPG_Casa', 0) >= 1.5) & 
-            (df_filtrado.get('PPG_A', 0) < 1.0) 
-        ]
-        
-    elif tipo_aposta == "Visitante Forte x Mandante Fraco":
-        df_filtrado = df_filtrado[
-            (df_filtrado.get('PPG_A', 0) >= 1.5) & 
-            (df_filtrado.get('PPG_Casa', 0) < 1.0) 
-        ]
-        
-    elif tipo_aposta == "Alta Prob. Aberto (Top)":
-        if 'MÉDIA_PROB' in df_filtrado.columns:
-            df_filtrado = df_filtrado[df_filtrado['MÉDIA_PROB'] >= perc_min]
-            df_filtrado = df_filtrado.sort_values(by='MÉDIA_PROB', ascending=False)
-        
-    elif tipo_aposta == "Over 1.5":
-        df_filtrado = df_filtrado[df_filtrado.get('Prob_Over1.5', 0) >= perc_min] 
-        
-    elif tipo_aposta == "Over 2.5":
-        df_filtrado = df_filtrado[df_filtrado.get('Prob_Over2.5', 0) >= perc_min] 
+    # --- Aplicar filtros: uma regra compilada com os valores dos sliders, uma máscara só ---
+    regra = RuleSet.from_file("painel", names=[tipo_aposta], params={"min_jogos": min_jogos, "perc_min": perc_min})
+    df_filtrado = regra.select(df)
         
     # --- 4. Exibir resultados ---
     st.subheader(f"Jogos filtrados ({len(df_filtrado)} partidas encontradas)")
@@ -200,46 +136,14 @@ if not df.empty:
         
         cols_display_simple = [
             'País', 'Horário', 'Time 1', 'Time 2', 'MÉDIA_PROB', 'Prob_Over1.5', 'Prob_Over2.5', 'Prob_BTTS',
-            'PPG_Casa', 'PPG_A', 'Over15_H', 'Over15_A', 'Over25_H', 'Over25_A', 'BTTS_H', 'BTTS_A', 'Partidas'
+            'PPG_Casa', 'PPG_Fora', 'Over15_H', 'Over15_A', 'Over25_H', 'Over25_A', 'BTTS_H', 'BTTS_A', 'Partidas'
         ]
         final_cols_simple = [col for col in cols_display_simple if col in df_filtrado.columns]
         
         df_simple = df_filtrado.copy()
-        formato_24h = '%H:%M'
-        formato_12h = '%I:%M %p'
-        
-        from datetime import datetime
-        
-        def parse_to_timestamp(s: str):
-            s = str(s).strip()
-            for fmt in (formato_24h, formato_12h):
-                try:
-                    t = datetime.strptime(s, fmt).time()
-                    return datetime(2000, 1, 1, t.hour, t.minute)  # timestamp neutro
-                except Exception:
-                    continue
-            return None
-        
-        # Compensação: subtrai 3 horas
-        OFFSET_HORAS = -3
-        
-        def minutes_from_ts(ts):
-            if ts is None:
-                return None
-            ajustado = ts + timedelta(hours=OFFSET_HORAS)
-            return int(ajustado.hour) * 60 + int(ajustado.minute)
-        
-        def format_24h_with_offset(ts, original: str):
-            if ts is None:
-                return str(original).strip() if original is not None else ""
-            ajustado = ts + timedelta(hours=OFFSET_HORAS)
-            h = int(ajustado.hour)
-            m = int(ajustado.minute)
-            return f"{h:02d}:{m:02d}"
-        
-        parsed_ts = df_simple['Horário'].apply(parse_to_timestamp)
-        df_simple['Horario_sort_min'] = parsed_ts.apply(minutes_from_ts)
-        df_simple['Horário'] = [format_24h_with_offset(ts, orig) for ts, orig in zip(parsed_ts, df_simple['Horário'])]
+        # Horário 24h/12h corrigido pelo offset configurado (HORARIO_OFFSET_HORAS, padrão -3h)
+        df_simple['Horario_sort_min'] = minutes_of_day(df_simple['Horário'])
+        df_simple['Horário'] = format_horario(df_simple['Horário'])
         # Não sobrescrever 'Horário': manter o valor original do DF
         # df_simple['Horário'] = [to_inverted_ampm_from_ts(ts, orig) for ts, orig in zip(parsed_ts, df_simple['Horário'])]  # removido
         
@@ -260,41 +164,8 @@ if not df.empty:
         st.markdown("### Tabela com Links Clicáveis (Ordenada por Horário)")
 
         df_html = df_filtrado.copy()
-
-        formato_24h = '%H:%M'
-        formato_12h = '%I:%M %p'
-
-        from datetime import datetime
-
-        def parse_to_timestamp(s: str):
-            s = str(s).strip()
-            for fmt in (formato_24h, formato_12h):
-                try:
-                    t = datetime.strptime(s, fmt).time()
-                    return datetime(2000, 1, 1, t.hour, t.minute)
-                except Exception:
-                    continue
-            return None
-
-        OFFSET_HORAS = -3
-
-        def minutes_from_ts(ts):
-            if ts is None:
-                return None
-            ajustado = ts + timedelta(hours=OFFSET_HORAS)
-            return int(ajustado.hour) * 60 + int(ajustado.minute)
-
-        def format_24h_with_offset(ts, original: str):
-            if ts is None:
-                return str(original).strip() if original is not None else ""
-            ajustado = ts + timedelta(hours=OFFSET_HORAS)
-            h = int(ajustado.hour)
-            m = int(ajustado.minute)
-            return f"{h:02d}:{m:02d}"
-
-        parsed_ts = df_html['Horário'].apply(parse_to_timestamp)
-        df_html['Horario_sort_min'] = parsed_ts.apply(minutes_from_ts)
-        df_html['Horário'] = [format_24h_with_offset(ts, orig) for ts, orig in zip(parsed_ts, df_html['Horário'])]
+        df_html['Horario_sort_min'] = minutes_of_day(df_html['Horário'])
+        df_html['Horário'] = format_horario(df_html['Horário'])
 
         df_html = df_html.sort_values('Horario_sort_min', na_position='last').reset_index(drop=True)
 
@@ -332,7 +203,7 @@ if not df.empty:
         # Exibição da Tabela HTML
         cols_to_display_html = [
             'País', 'Horário', 'Time 1', 'Time 2', 'Resultado', 'MÉDIA_PROB', 'Prob_Over1.5', 'Prob_Over2.5', 'Prob_BTTS',
-            'PPG_Casa', 'PPG_A', 'Over15_H', 'Over15_A', 'Over25_H', 'Over25_A', 'BTTS_H', 'BTTS_A', 'Partidas'
+            'PPG_Casa', 'PPG_Fora', 'Over15_H', 'Over15_A', 'Over25_H', 'Over25_A', 'BTTS_H', 'BTTS_A', 'Partidas'
         ]
 
         final_cols_html = [col for col in cols_to_display_html if col in df_html.columns]
@@ -365,8 +236,8 @@ col_db1, col_db2, col_db3 = st.columns(3)
 with col_db1:
     if st.button("🔌 Testar conexão MySQL"):
         try:
-            conn = get_mysql_connection()
-            conn.close()
+            with mysql_connection():
+                pass
             st.success("Conexão MySQL bem-sucedida!")
         except Exception as e:
             st.error(f"Erro ao conectar no MySQL: {e}")
@@ -376,9 +247,8 @@ with col_db2:
         if 'df_filtrado' in locals() and not df_filtrado.empty:
             try:
                 df_ready = prepare_df_for_insertion(df_filtrado)
-                conn = get_mysql_connection()
-                total = insert_df_into_mysql(df_ready, conn)
-                conn.close()
+                with mysql_connection() as conn:
+                    total = insert_df_into_mysql(df_ready, conn)
                 st.success(f"✅ {total} registros inseridos na tabela 'jogos' (filtrados).")
             except Exception as e:
                 st.error(f"Erro ao inserir jogos filtrados: {e}")
@@ -390,9 +260,8 @@ with col_db3:
         if 'df' in locals() and not df.empty:
             try:
                 df_ready = prepare_df_for_insertion(df)
-                conn = get_mysql_connection()
-                total = insert_df_into_mysql(df_ready, conn)
-                conn.close()
+                with mysql_connection() as conn:
+                    total = insert_df_into_mysql(df_ready, conn)
                 st.success(f"✅ {total} registros inseridos na tabela 'jogos' (todos os jogos de hoje).")
             except Exception as e:
                 st.error(f"Erro ao inserir todos os jogos: {e}")
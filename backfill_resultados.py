@@ -0,0 +1,172 @@
+"""
+Backfill de resultados (GOLS_CASA/GOLS_FORA) para um intervalo de datas que o process_scheduler perdeu.
+
+Para cada data: confere a cota, busca /fixtures?date= (em paralelo, até o limite da cota; dias já
+gravados em data/api_cache não gastam cota), grava data/results_backfill/<YYYY-MM-DD>.csv e marca o
+checkpoint. No fim, todas as partições ainda não aplicadas vão ao MySQL num único UPDATE em lote.
+Interrompido (Ctrl+C, cota esgotada), basta rodar de novo: o checkpoint retoma de onde parou.
+
+Uso:
+    python backfill_resultados.py --start 2025-10-01 --end 2025-10-31
+    python backfill_resultados.py --start 2025-10-01 --end 2025-10-31 --workers 8 --no-apply
+    python backfill_resultados.py --start 2025-10-01 --end 2025-10-31 --reset
+"""
+import os
+import json
+import argparse
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from buscar_resultados import recreate_results_csv
+from src.quota import remaining_quota_today
+
+load_dotenv()
+
+BACKFILL_DIR = os.getenv("RESULTS_BACKFILL_DIR", "data/results_backfill")
+API_DAILY_LIMIT = int(os.getenv("API_DAILY_LIMIT", "100"))
+LOG_RESULTS_PATH = os.getenv("LOG_RESULTS_PATH", "logs/results_update.sql")
+
+_lock = threading.Lock()
+
+
+def log(msg: str) -> None:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{now}] {msg}")
+
+
+def _checkpoint_path(out_dir: str) -> str:
+    return os.path.join(out_dir, "checkpoint.json")
+
+
+def load_checkpoint(out_dir: str) -> dict:
+    path = _checkpoint_path(out_dir)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return {"fetched": {}, "applied": {}}
+
+
+def save_checkpoint(out_dir: str, checkpoint: dict) -> None:
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out_dir, suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=1, sort_keys=True)
+        os.replace(tmp, _checkpoint_path(out_dir))
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def date_range(start: date, end: date) -> list[str]:
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+
+def partition_path(out_dir: str, day: str) -> str:
+    return os.path.join(out_dir, f"{day}.csv")
+
+
+def fetch_range(days: list[str], out_dir: str, checkpoint: dict, workers: int = 4) -> int:
+    """Busca as datas pendentes em paralelo. Para de submeter quando a cota acaba. Retorna datas gravadas."""
+    pendentes = [d for d in days if d not in checkpoint["fetched"]]
+    if not pendentes:
+        return 0
+
+    def _one(day: str) -> int:
+        # A cota é conferida antes de cada requisição (e só consumida se não houver cache)
+        total = recreate_results_csv(csv_path=partition_path(out_dir, day), date=day)
+        with _lock:
+            checkpoint["fetched"][day] = total
+            save_checkpoint(out_dir, checkpoint)
+        return total
+
+    gravadas = 0
+    idx = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while idx < len(pendentes):
+            restante = remaining_quota_today(API_DAILY_LIMIT)
+            if restante <= 0:
+                log(f"Cota diária esgotada ({API_DAILY_LIMIT}); {len(pendentes) - idx} data(s) ficam para a próxima execução.")
+                break
+            # Lote do tamanho da cota restante (dias em cache podem nem consumir)
+            lote = pendentes[idx:idx + min(restante, workers * 4)]
+            idx += len(lote)
+            futuros = {pool.submit(_one, d): d for d in lote}
+            for fut in as_completed(futuros):
+                day = futuros[fut]
+                try:
+                    log(f"{day}: {fut.result()} jogo(s)")
+                    gravadas += 1
+                except Exception as e:
+                    log(f"{day}: erro ({e})")
+    return gravadas
+
+
+def apply_fetched(out_dir: str, checkpoint: dict, days: list[str]) -> int:
+    """Junta as partições buscadas e ainda não aplicadas num único CSV e roda um UPDATE em lote."""
+    from src.database import run_results_update_workflow
+
+    a_aplicar = [d for d in days if d in checkpoint["fetched"] and d not in checkpoint["applied"]]
+    a_aplicar = [d for d in a_aplicar if os.path.exists(partition_path(out_dir, d))]
+    if not a_aplicar:
+        return 0
+
+    frames = [pd.read_csv(partition_path(out_dir, d)) for d in a_aplicar]
+    combinado = os.path.join(out_dir, "_apply.csv")
+    pd.concat(frames, ignore_index=True).to_csv(combinado, index=False, encoding="utf-8")
+
+    total = run_results_update_workflow(csv_path=combinado, log_file_path=LOG_RESULTS_PATH)
+    for d in a_aplicar:
+        checkpoint["applied"][d] = True
+    save_checkpoint(out_dir, checkpoint)
+    os.remove(combinado)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="Data inicial (YYYY-MM-DD).")
+    parser.add_argument("--end", default=None, help="Data final inclusiva (padrão: ontem).")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--out-dir", default=BACKFILL_DIR)
+    parser.add_argument("--no-apply", action="store_true", help="Só busca/grava as partições.")
+    parser.add_argument("--reset", action="store_true", help="Ignora o checkpoint e refaz o intervalo.")
+    args = parser.parse_args()
+
+    start = date.fromisoformat(args.start)
+    end = date.fromisoformat(args.end) if args.end else date.today() - timedelta(days=1)
+    if end < start:
+        parser.error("--end anterior a --start")
+
+    days = date_range(start, end)
+    checkpoint = {"fetched": {}, "applied": {}} if args.reset else load_checkpoint(args.out_dir)
+    log(f"Backfill {days[0]} -> {days[-1]} ({len(days)} dias); já buscados: "
+        f"{sum(d in checkpoint['fetched'] for d in days)}, já aplicados: {sum(d in checkpoint['applied'] for d in days)}")
+
+    try:
+        gravadas = fetch_range(days, args.out_dir, checkpoint, workers=args.workers)
+        log(f"Partições gravadas nesta execução: {gravadas}")
+    except KeyboardInterrupt:
+        log("Interrompido; checkpoint salvo.")
+        return
+
+    if not args.no_apply:
+        total = apply_fetched(args.out_dir, checkpoint, days)
+        log(f"Resultados aplicados no MySQL: {total} linha(s)")
+
+    faltando = [d for d in days if d not in checkpoint["fetched"]]
+    if faltando:
+        log(f"{len(faltando)} data(s) pendente(s); rode novamente para retomar.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara linhas/s do insert linha a linha (INSERT IGNORE + UPDATE) com o caminho em massa
+(executemany + ON DUPLICATE KEY UPDATE) de src.database.insert_df_into_mysql.
+
+Usa uma tabela temporária com o mesmo schema de `jogos` (nada é gravado na tabela real).
+Precisa das variáveis MYSQL_* do .env.
+
+Uso:
+    python -m benchmarks.bench_insert_mysql --rows 3000 --chunk 500
+"""
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.database import get_mysql_connection, insert_df_into_mysql
+
+BENCH_TABLE = "jogos_bench"
+
+
+def frame_sintetico(n: int, dia: date) -> pd.DataFrame:
+    """DataFrame no formato de prepare_df_for_insertion, com n jogos distintos."""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'DATA_JOGO': [dia] * n,
+        'TIME_CASA': [f"Casa {i}" for i in range(n)],
+        'TIME_FORA': [f"Fora {i}" for i in range(n)],
+        'MEDIA_HOME': rng.uniform(0, 4, n).round(2),
+        'MEDIA_AWAY': rng.uniform(0, 4, n).round(2),
+        'Prob_Over1.5': rng.uniform(0, 100, n).round(2),
+        'Prob_Over2.5': rng.uniform(0, 100, n).round(2),
+        'Prob_BTTS': rng.uniform(0, 100, n).round(2),
+        'MÉDIA_PROB': rng.uniform(0, 100, n).round(2),
+        'CONT_HOME': rng.integers(1, 38, n),
+        'CONT_AWAY': rng.integers(1, 38, n),
+        'PAIS': rng.choice(['BRA', 'ENG', 'ESP', 'ITA'], n),
+    })
+
+
+def medir(conn, df: pd.DataFrame, bulk: bool, chunk: int) -> tuple[float, int]:
+    inicio = time.perf_counter()
+    total = insert_df_into_mysql(df, conn, bulk=bulk, chunk_size=chunk, table=BENCH_TABLE)
+    return time.perf_counter() - inicio, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--chunk", type=int, default=500)
+    args = parser.parse_args()
+
+    df = frame_sintetico(args.rows, date.today())
+    conn = get_mysql_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"CREATE TEMPORARY TABLE {BENCH_TABLE} LIKE jogos")
+        print(f"{args.rows} linhas, chunk={args.chunk}")
+        for nome, bulk in (("linha a linha", False), ("em massa", True)):
+            cur.execute(f"TRUNCATE TABLE {BENCH_TABLE}")
+            t_ins, novos = medir(conn, df, bulk, args.chunk)
+            # Segunda passada: todas as linhas já existem (caminho de atualização)
+            t_upd, _ = medir(conn, df, bulk, args.chunk)
+            print(f"  {nome:14s} insert: {args.rows / t_ins:9.0f} linhas/s ({t_ins:6.2f}s, novos={novos})"
+                  f" | update: {args.rows / t_upd:9.0f} linhas/s ({t_upd:6.2f}s)")
+    finally:
+        cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {BENCH_TABLE}")
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
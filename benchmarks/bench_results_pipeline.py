@@ -0,0 +1,49 @@
+"""
+Mede o pipeline de resultados (API-Football -> linhas -> estado incremental -> CSV) totalmente offline,
+servindo as respostas gravadas em data/api_cache (modo replay de src/api_football.py).
+
+Grave uma vez com rede (qualquer execução normal de buscar_resultados grava o cache) e depois:
+    python -m benchmarks.bench_results_pipeline --date 2025-11-08
+    python -m benchmarks.bench_results_pipeline --date 2025-11-08 --repeat 50 --csv /tmp/resultados.csv
+"""
+import os
+import argparse
+import tempfile
+import time
+
+from src import api_football, results_state
+import buscar_resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--date", required=True, help="Data gravada no cache (YYYY-MM-DD).")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--csv", default=None, help="CSV de saída (padrão: arquivo temporário).")
+    args = parser.parse_args()
+
+    os.environ["API_FOOTBALL_REPLAY"] = "1"
+    fixtures = api_football.fetch(buscar_resultados.ENDPOINT, {"date": args.date}, buscar_resultados.headers)
+    print(f"{len(fixtures)} jogos gravados para {args.date}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Estado isolado: não toca em data/results_state
+        results_state.STATE_DIR = tmp
+        csv_path = args.csv or os.path.join(tmp, "resultados.csv")
+
+        inicio = time.perf_counter()
+        for _ in range(args.repeat):
+            buscar_resultados.recreate_results_csv(csv_path, date=args.date)
+        ms_full = (time.perf_counter() - inicio) / args.repeat * 1000
+
+        inicio = time.perf_counter()
+        for _ in range(args.repeat):
+            alteradas = buscar_resultados.update_results_csv_incremental(csv_path, date=args.date)
+        ms_inc = (time.perf_counter() - inicio) / args.repeat * 1000
+
+    print(f"  recriar CSV completo : {ms_full:8.1f} ms")
+    print(f"  incremental (estado) : {ms_inc:8.1f} ms  linhas emitidas={alteradas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compara o extrator lxml (src/html_tables.py) com o caminho antigo (pd.read_html + índice fixo).
+
+Uso:
+    python -m benchmarks.bench_table_extraction                 # snapshots de hoje
+    python -m benchmarks.bench_table_extraction --date 2025-11-08 --repeat 20
+    python -m benchmarks.bench_table_extraction --file pagina.html --listing 1
+"""
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src import html_snapshots
+from src.html_tables import extract_table, MATCHES_LISTING1_SIGNATURE, MATCHES_LISTING2_SIGNATURE
+
+URLS = {
+    1: "https://www.soccerstats.com/matches.asp?matchday=1&listing=1",
+    2: "https://www.soccerstats.com/matches.asp?matchday=1&listing=2",
+}
+SIGNATURES = {1: MATCHES_LISTING1_SIGNATURE, 2: MATCHES_LISTING2_SIGNATURE}
+
+
+def _medir(fn, repeat: int) -> tuple[float, float, object]:
+    """Retorna (ms médio por execução, pico de memória em MB, último resultado)."""
+    resultado = fn()  # aquecimento
+    inicio = time.perf_counter()
+    for _ in range(repeat):
+        resultado = fn()
+    ms = (time.perf_counter() - inicio) / repeat * 1000
+
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, pico / 1024 / 1024, resultado
+
+
+def bench(html: str, listing: int, repeat: int) -> None:
+    signature = SIGNATURES[listing]
+    ms_old, mb_old, df_old = _medir(lambda: pd.read_html(html)[8], repeat)
+    ms_new, mb_new, df_new = _medir(lambda: extract_table(html, signature), repeat)
+
+    print(f"listing={listing} ({len(html) / 1024:.0f} KB, {repeat} execuções)")
+    print(f"  pd.read_html[8] : {ms_old:8.1f} ms  pico {mb_old:6.1f} MB  linhas={len(df_old)}")
+    if df_new is None:
+        print("  lxml extrator   : tabela não encontrada")
+        return
+    print(f"  lxml extrator   : {ms_new:8.1f} ms  pico {mb_new:6.1f} MB  linhas={len(df_new)}")
+    print(f"  speedup         : {ms_old / ms_new:6.1f}x")
+    faltando = set(df_old.columns) - set(df_new.columns)
+    if faltando:
+        print(f"  colunas ausentes no extrator: {sorted(faltando)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--date", default=None, help="Dia dos snapshots (YYYY-MM-DD). Padrão: hoje.")
+    parser.add_argument("--file", default=None, help="Arquivo HTML avulso (usa --listing).")
+    parser.add_argument("--listing", type=int, choices=[1, 2], default=1)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            bench(f.read(), args.listing, args.repeat)
+        return
+
+    dia = args.date or html_snapshots.today_str()
+    for listing, url in URLS.items():
+        bench(html_snapshots.replay(url, dia), listing, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,89 @@
-import requests
-from datetime import datetime
+from datetime import datetime, timezone
 import pandas as pd
+import pytz
 import os
+import time
 
-API_KEY = "19316383aa95e288fe9d50c14d4748d0"
-BASE_URL = "https://v3.football.api-sports.io/"
+from src import api_football
+from src.results_state import load_state, save_state, pending_ids, merge_rows, unapplied_rows, record_apply
+
+API_KEY = os.getenv("API_FOOTBALL_KEY", "19316383aa95e288fe9d50c14d4748d0")
 ENDPOINT = "fixtures"
 
 headers = {
     'x-rapidapi-key': API_KEY,
     'x-rapidapi-host': 'v3.football.api-sports.io'
 }
+TZ_SP = pytz.timezone('America/Sao_Paulo')
+
+CSV_COLUMNS = [
+    'Data', 'Horário', 'Liga', 'Temporada', 'Time_Casa', 'Time_Fora',
+    'Gols_Casa', 'Gols_Fora', 'Status', 'Fixture_ID'
+]
+IDS_PER_REQUEST = 20  # limite do parâmetro ids= da API-Football
+
+
+def _reserve_quota() -> str:
+    """Reserva uma chamada da cota diária/por minuto (src.quota). Espera quando o limite por minuto
+    está cheio; só falha se o limite diário foi atingido."""
+    from src.quota import reserve, remaining_quota_today, RateLimited
+    limit = int(os.getenv("API_DAILY_LIMIT", "100"))
+    while True:
+        try:
+            reserva = reserve("fixtures", max_per_day=limit)
+        except RateLimited as e:
+            time.sleep(e.retry_after)
+            continue
+        if reserva is None:
+            raise RuntimeError(f"Limite diário da API atingido ({limit}). Restante: {remaining_quota_today(limit)}")
+        return reserva
+
+
+def _fetch_fixtures(params: dict) -> list[dict]:
+    """/fixtures via cache em disco (src.api_football); a cota só é consumida quando há chamada de rede.
+    Com API_FOOTBALL_REPLAY=1 serve apenas respostas gravadas (offline)."""
+    return api_football.fetch(ENDPOINT, params, headers, before_request=_reserve_quota)
+
+
+def _fixture_to_row(fixture: dict, target_date: str) -> dict:
+    info_jogo = fixture['fixture']
+    info_times = fixture['teams']
+    info_score = fixture['score']
+
+    data_hora_utc = datetime.strptime(info_jogo['date'], '%Y-%m-%dT%H:%M:%S%z')
+    # Converte de UTC para América/São_Paulo para evitar +3h
+    data_hora_sp = data_hora_utc.astimezone(TZ_SP)
+    horario_local = data_hora_sp.strftime('%H:%M')
+
+    placar_casa = info_score['fulltime']['home']
+    placar_fora = info_score['fulltime']['away']
+
+    return {
+        'Data': target_date,
+        'Horário': horario_local,
+        'Liga': fixture['league']['name'],
+        'Temporada': fixture['league']['season'],
+        'Time_Casa': info_times['home']['name'],
+        'Time_Fora': info_times['away']['name'],
+        'Gols_Casa': placar_casa if placar_casa is not None else 'N/A',
+        'Gols_Fora': placar_fora if placar_fora is not None else 'N/A',
+        'Status': info_jogo['status']['short'],
+        'Fixture_ID': info_jogo['id'],
+        'Kickoff_UTC': data_hora_utc.astimezone(timezone.utc).isoformat(),
+    }
+
+
+def _write_csv(rows: list[dict], csv_path: str) -> int:
+    df = pd.DataFrame(rows, columns=CSV_COLUMNS)
+    try:
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+    except Exception:
+        pass
+
+    df.to_csv(csv_path, index=False, encoding='utf-8')
+    return len(df)
+
 
 def recreate_results_csv(csv_path: str = 'resultados_futebol_hoje.csv', date: str | None = None) -> int:
     """
@@ -18,69 +91,77 @@ def recreate_results_csv(csv_path: str = 'resultados_futebol_hoje.csv', date: st
     Remove o arquivo antigo (se existir) e salva um novo com o mesmo nome.
     Retorna o número de jogos salvos no CSV.
     """
-    # Controle de cota antes da requisição
-    from src.quota import allow_request, remaining_quota_today
-    limit = int(os.getenv("API_DAILY_LIMIT", "100"))
-    if not allow_request("fixtures", max_per_day=limit):
-        raise RuntimeError(f"Limite diário da API atingido ({limit}). Restante: {remaining_quota_today(limit)}")
-
     target_date = date or datetime.now().strftime('%Y-%m-%d')
-    params = {"date": target_date}
+    fixtures = _fetch_fixtures({"date": target_date})
     try:
-        response = requests.get(BASE_URL + ENDPOINT, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        fixtures = data.get('response', [])
-
-        if not fixtures:
-            df = pd.DataFrame(columns=[
-                'Data', 'Horário', 'Liga', 'Temporada', 'Time_Casa', 'Time_Fora',
-                'Gols_Casa', 'Gols_Fora', 'Status'
-            ])
-        else:
-            rows = []
-            for fixture in fixtures:
-                info_jogo = fixture['fixture']
-                info_times = fixture['teams']
-                info_score = fixture['score']
-    
-                data_hora_utc = datetime.strptime(info_jogo['date'], '%Y-%m-%dT%H:%M:%S%z')
-                # Converte de UTC para América/São_Paulo para evitar +3h
-                import pytz
-                tz_sp = pytz.timezone('America/Sao_Paulo')
-                data_hora_sp = data_hora_utc.astimezone(tz_sp)
-                horario_local = data_hora_sp.strftime('%H:%M')
-    
-                placar_casa = info_score['fulltime']['home']
-                placar_fora = info_score['fulltime']['away']
-
-                rows.append({
-                    'Data': target_date,
-                    'Horário': horario_local,
-                    'Liga': fixture['league']['name'],
-                    'Temporada': fixture['league']['season'],
-                    'Time_Casa': info_times['home']['name'],
-                    'Time_Fora': info_times['away']['name'],
-                    'Gols_Casa': placar_casa if placar_casa is not None else 'N/A',
-                    'Gols_Fora': placar_fora if placar_fora is not None else 'N/A',
-                    'Status': info_jogo['status']['short']
-                })
-
-            df = pd.DataFrame(rows)
+        rows = [_fixture_to_row(f, target_date) for f in fixtures]
+        # Mantém o estado incremental em dia com a chamada completa
+        state = load_state(target_date)
+        merge_rows(state, rows)
+        save_state(target_date, state)
+        return _write_csv(rows, csv_path)
+    except Exception as e:
+        raise RuntimeError(f"Ocorreu um erro ao recriar o CSV: {e}")
 
-        try:
-            if os.path.exists(csv_path):
-                os.remove(csv_path)
-        except Exception:
-            pass
 
-        df.to_csv(csv_path, index=False, encoding='utf-8')
-        return len(df)
+def update_results_csv_incremental(csv_path: str = 'resultados_futebol_hoje.csv', date: str | None = None) -> int:
+    """
+    Modo incremental: mantém o estado dos jogos do dia em data/results_state e só consulta a API
+    para jogos que já começaram e ainda não terminaram (ids= em lotes de 20). O CSV recebe as
+    linhas novas ou alteradas desde o último ciclo mais os jogos finalizados que o banco ainda não
+    recebeu; depois do UPDATE, chame record_results_applied. Retorna o número de linhas gravadas.
+    """
+    target_date = date or datetime.now().strftime('%Y-%m-%d')
+    state = load_state(target_date)
+
+    if not state:
+        # Primeiro ciclo do dia: uma chamada completa por data
+        fixtures = _fetch_fixtures({"date": target_date})
+    else:
+        pendentes = pending_ids(state)
+        if not pendentes:
+            return _write_csv(unapplied_rows(state), csv_path)
+        lotes = [pendentes[i:i + IDS_PER_REQUEST] for i in range(0, len(pendentes), IDS_PER_REQUEST)]
+        if len(lotes) > 1 or api_football.replay_enabled():
+            # Mais de um lote custaria mais cota que a chamada por data; no replay só a data foi gravada
+            fixtures = _fetch_fixtures({"date": target_date})
+        else:
+            fixtures = _fetch_fixtures({"ids": "-".join(lotes[0])})
 
-    except requests.exceptions.RequestException as e:
-        raise RuntimeError(f"Erro na requisição à API: {e}")
+    try:
+        rows = [_fixture_to_row(f, target_date) for f in fixtures]
+        alteradas = merge_rows(state, rows)
+        save_state(target_date, state)
+        # Finalizados ainda não aplicados (UPDATE anterior falhou ou o jogo não estava em `jogos`)
+        return _write_csv(_union_rows(alteradas, unapplied_rows(state)), csv_path)
     except Exception as e:
-        raise RuntimeError(f"Ocorreu um erro ao recriar o CSV: {e}")
+        raise RuntimeError(f"Ocorreu um erro ao atualizar o CSV incremental: {e}")
+
+
+def _union_rows(*listas: list[dict]) -> list[dict]:
+    """Concatena listas de linhas sem repetir Fixture_ID (a primeira ocorrência vence)."""
+    vistas, out = set(), []
+    for lista in listas:
+        for row in lista:
+            fid = str(row['Fixture_ID'])
+            if fid not in vistas:
+                vistas.add(fid)
+                out.append(row)
+    return out
+
+
+def record_results_applied(applied_ids, csv_path: str = 'resultados_futebol_hoje.csv',
+                           date: str | None = None) -> None:
+    """Chamar só depois de run_results_update_workflow terminar sem erro: os jogos casados
+    (`applied_ids`) saem da fila; os demais finalizados do CSV voltam no próximo ciclo."""
+    target_date = date or datetime.now().strftime('%Y-%m-%d')
+    if not os.path.exists(csv_path):
+        return
+    tentados = pd.read_csv(csv_path, usecols=['Fixture_ID'])['Fixture_ID'].dropna().astype(int)
+    state = load_state(target_date)
+    record_apply(state, tentados, applied_ids)
+    save_state(target_date, state)
+
 
 if __name__ == '__main__':
     total = recreate_results_csv('resultados_futebol_hoje.csv', date=datetime.now().strftime('%Y-%m-%d'))
@@ -4,7 +4,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import pytz
-from src.database import get_mysql_connection
+from src.database import mysql_connection
 
 st.set_page_config(page_title="Resultados (DB)", layout="wide")
 st.sidebar.title("Menu")
@@ -36,7 +36,6 @@ st.subheader(f"Resultados em '{mysql_db}' de {data_inicio} até {data_fim}")
 # --- Consulta no DB pelo intervalo de datas ---
 df_resultados = pd.DataFrame()
 try:
-    conn = get_mysql_connection()
     query = """
         SELECT *
         FROM jogos
@@ -44,8 +43,8 @@ try:
           AND GOLS_CASA IS NOT NULL
           AND GOLS_FORA IS NOT NULL
     """
-    df_resultados = pd.read_sql(query, conn, params=[data_inicio, data_fim])
-    conn.close()
+    with mysql_connection() as conn:
+        df_resultados = pd.read_sql(query, conn, params=[data_inicio, data_fim])
 except Exception as e:
     st.error(f"Erro ao consultar o DB: {e}")
 
@@ -219,8 +218,8 @@ st.markdown("---")
 st.subheader("Conexão MySQL")
 if st.button("🔌 Testar conexão"):
     try:
-        conn = get_mysql_connection()
-        conn.close()
+        with mysql_connection():
+            pass
         st.success("Conexão MySQL bem-sucedida!")
     except Exception as e:
         st.error(f"Erro ao conectar no MySQL: {e}")
\ No newline at end of file
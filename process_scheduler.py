@@ -5,8 +5,11 @@ from dotenv import load_dotenv
 
 # Pipelines existentes
 from src.database import run_insertion_workflow, run_results_update_workflow
-from buscar_resultados import recreate_results_csv
+from buscar_resultados import recreate_results_csv, update_results_csv_incremental, record_results_applied
 from src.quota import remaining_quota_today
+from src.frame_memo import source_fingerprint
+from src.stage_dag import Stage, StageDAG
+from src.results_state import load_state, unapplied_rows
 
 # Configurações
 load_dotenv()
@@ -16,48 +19,90 @@ CSV_PATH = os.getenv("RESULTS_CSV_PATH", "resultados_futebol_hoje.csv")
 API_DAILY_LIMIT = int(os.getenv("API_DAILY_LIMIT", "100"))
 LOG_RESULTS_PATH = os.getenv("LOG_RESULTS_PATH", "logs/results_update.sql")
 INSERT_LOG_PATH = os.getenv("LOG_INSERT_PATH", None)  # opcional, pode ser 'logs/insert.log'
+SCRAPE_DAYS_AHEAD = int(os.getenv("SCRAPE_DAYS_AHEAD", "0"))  # 1 = também pré-carrega amanhã (máximo útil: 1)
+RESULTS_INCREMENTAL = os.getenv("RESULTS_INCREMENTAL", "1") == "1"  # 0 = recria o CSV do dia inteiro
 
 def log(msg: str) -> None:
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{now}] {msg}")
 
+# -------------------------------------------------------------
+# Estágios do ciclo (DAG): raspagem e API são independentes e rodam em paralelo;
+# a atualização de resultados espera os dois e só roda se o CSV ou os jogos mudaram.
+# -------------------------------------------------------------
+
+def stage_scrape_insert(_: dict) -> int:
+    return run_insertion_workflow(log_file_path=INSERT_LOG_PATH, days_ahead=SCRAPE_DAYS_AHEAD)
+
+
+def stage_fetch_results(_: dict) -> int | str:
+    """Linhas gravadas no CSV; sem cota, o motivo (texto) em vez do número."""
+    quota_restante = remaining_quota_today(API_DAILY_LIMIT)
+    if quota_restante <= 0:
+        return f"Limite diário de API atingido ({API_DAILY_LIMIT}). CSV de resultados não gerado."
+    if RESULTS_INCREMENTAL:
+        return update_results_csv_incremental(csv_path=CSV_PATH)
+    return recreate_results_csv(csv_path=CSV_PATH)
+
+
+def stage_update_results(_: dict) -> int:
+    aplicados: set[int] = set()
+    total = run_results_update_workflow(
+        csv_path=CSV_PATH,
+        log_file_path=LOG_RESULTS_PATH,
+        fallback_like=True,       # tenta localizar por LIKE quando não encontra match exato
+        remove_prefixes=True,     # normalização (ex.: 'FC', 'Club', etc.)
+        remove_suffixes=True,     # normalização (ex.: 'W', 'Women', etc.)
+        remove_categories=True,   # normalização (ex.: 'U21', 'B', 'II', etc.)
+        applied_ids=aplicados
+    )
+    # Só após o UPDATE sem erro: casados saem da fila; finalizados sem match voltam no próximo CSV
+    record_results_applied(aplicados, csv_path=CSV_PATH)
+    return total
+
+
+def _results_inputs(results: dict):
+    """Conteúdo do CSV + jogos novos no MySQL + finalizados ainda não aplicados (com tentativas
+    restantes): se nada mudou, o UPDATE seria idêntico ao anterior."""
+    pendentes = len(unapplied_rows(load_state(datetime.now().strftime('%Y-%m-%d'))))
+    return (source_fingerprint(CSV_PATH, by_content=True), results.get("scrape"), pendentes)
+
+
+DAG = StageDAG([
+    Stage("scrape", stage_scrape_insert),
+    Stage("fetch_results", stage_fetch_results),
+    # Como antes, roda mesmo se a raspagem ou a API falharem (usa o CSV/jogos que existirem)
+    Stage("update_results", stage_update_results, deps=("scrape", "fetch_results"),
+          inputs=_results_inputs, require_deps_ok=False),
+])
+
+STAGE_MESSAGES = {
+    "scrape": "Raspagem/Inserção concluída. Registros inseridos/atualizados: {}",
+    "fetch_results": "CSV de resultados ({}): " + CSV_PATH,
+    "update_results": "Atualização de resultados concluída. Linhas processadas: {}",
+}
+
+
 def run_once() -> None:
     log("-" * 60)
     log("Iniciando ciclo: raspagem + inserção + atualização de resultados")
 
-    # 1) Raspagem e inserção no MySQL
-    try:
-        total_inserted = run_insertion_workflow(log_file_path=INSERT_LOG_PATH)
-        log(f"Raspagem/Inserção concluída. Registros inseridos/atualizados: {total_inserted}")
-    except Exception as e:
-        log(f"Erro em run_insertion_workflow: {e}")
-
-    # 2) CSV de resultados via API (com cota diária)
-    try:
-        quota_restante = remaining_quota_today(API_DAILY_LIMIT)
-        if quota_restante <= 0:
-            log(f"Limite diário de API atingido ({API_DAILY_LIMIT}). Pulando geração do CSV.")
+    inicio = time.perf_counter()
+    runs = DAG.run()
+    for nome in DAG.stages:
+        r = runs[nome]
+        if r.status == "ok":
+            log(r.result if isinstance(r.result, str) else STAGE_MESSAGES[nome].format(r.result))
+        elif r.status == "error":
+            log(f"Erro no estágio {nome}: {r.result}")
+        elif r.status == "skipped":
+            log(f"Estágio {nome} pulado: entradas inalteradas desde a última execução.")
         else:
-            total_csv = recreate_results_csv(csv_path=CSV_PATH)
-            log(f"CSV recriado: {CSV_PATH}. Jogos no CSV: {total_csv}")
-    except Exception as e:
-        log(f"Erro ao recriar CSV de resultados: {e}")
-
-    # 3) Atualizar resultados (GOLS/STATUS/LIGA) no MySQL
-    try:
-        total_updates = run_results_update_workflow(
-            csv_path=CSV_PATH,
-            log_file_path=LOG_RESULTS_PATH,
-            fallback_like=True,       # tenta localizar por LIKE quando não encontra match exato
-            remove_prefixes=True,     # normalização (ex.: 'FC', 'Club', etc.)
-            remove_suffixes=True,     # normalização (ex.: 'W', 'Women', etc.)
-            remove_categories=True    # normalização (ex.: 'U21', 'B', 'II', etc.)
-        )
-        log(f"Atualização de resultados concluída. Linhas processadas: {total_updates}")
-    except Exception as e:
-        log(f"Erro em run_results_update_workflow: {e}")
+            log(f"Estágio {nome} não executado: dependência falhou.")
+    tempos = ", ".join(f"{n}={runs[n].seconds:.1f}s({runs[n].status})" for n in DAG.stages)
+    log(f"Tempos por estágio: {tempos}; total {time.perf_counter() - inicio:.1f}s")
 
-    # 4) Status de cota após ciclo
+    # Status de cota após ciclo
     try:
         quota_restante = remaining_quota_today(API_DAILY_LIMIT)
         log(f"Ciclo concluído. Cota restante da API hoje: {quota_restante}/{API_DAILY_LIMIT}")
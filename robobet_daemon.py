@@ -0,0 +1,153 @@
+"""
+Daemon único do robobet: substitui main.py + process_scheduler.py (+ auto_alerts.py) rodando em
+processos separados sob nohup.
+
+Um só processo, com o DataFrame de jogos em memória (src.frame_memo), o pool MySQL do processo,
+o dicionário de aliases e a outbox do Telegram compartilhados entre os estágios:
+    - raspagem + inserção no MySQL      a cada DAEMON_SCRAPE_SECONDS   (padrão 1h)
+    - resultados (API incremental + DB) a cada DAEMON_RESULTS_SECONDS  (padrão 15 min)
+    - alertas pré-jogo                  pelo heap de kickoffs, um por antecedência das regras de
+                                        config/alert_rules.json (30 min também com DAEMON_ALERTS_30MIN=1)
+    - entrega da outbox                 worker de segundo plano
+Cada estágio bloqueante roda numa thread (asyncio.to_thread); SIGINT/SIGTERM encerram com calma:
+nenhum estágio novo começa e os que estão em andamento terminam antes da saída.
+
+Uso:
+    python robobet_daemon.py
+"""
+import os
+import time
+import signal
+import asyncio
+import threading
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.database import run_insertion_workflow, run_results_update_workflow
+from src.quota import remaining_quota_today
+from src.alert_outbox import start_worker
+from src.kickoff_scheduler import run_kickoff_scheduler
+from src.telegram_alerts import enviar_alertes_unicos
+from buscar_resultados import update_results_csv_incremental, record_results_applied
+from src.alert_rules import RuleSet
+from src.kickoff_time import HORARIO_OFFSET_HORAS
+
+SCRAPE_SECONDS = int(os.getenv("DAEMON_SCRAPE_SECONDS", "3600"))
+RESULTS_SECONDS = int(os.getenv("DAEMON_RESULTS_SECONDS", "900"))
+ALERTS_30MIN = os.getenv("DAEMON_ALERTS_30MIN", "0") == "1"
+SCRAPE_DAYS_AHEAD = int(os.getenv("SCRAPE_DAYS_AHEAD", "0"))
+CSV_PATH = os.getenv("RESULTS_CSV_PATH", "resultados_futebol_hoje.csv")
+API_DAILY_LIMIT = int(os.getenv("API_DAILY_LIMIT", "100"))
+LOG_RESULTS_PATH = os.getenv("LOG_RESULTS_PATH", "logs/results_update.sql")
+INSERT_LOG_PATH = os.getenv("LOG_INSERT_PATH", None)
+
+token = os.getenv("TELEGRAM_TOKEN")
+
+
+def carregar_regras() -> RuleSet:
+    """Regras de alerta habilitadas; DAEMON_ALERTS_30MIN=1 liga também a regra 'todos_30min'."""
+    regras = RuleSet.from_file("alerts")
+    if ALERTS_30MIN and all(r.name != "todos_30min" for r in regras.rules):
+        regras = RuleSet(regras.rules + RuleSet.from_file("alerts", names=["todos_30min"]).rules)
+    return regras
+
+
+def log(msg: str) -> None:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{now}] {msg}", flush=True)
+
+
+# -------------------------------------------------------------
+# Estágios (bloqueantes; rodam em threads)
+# -------------------------------------------------------------
+
+def stage_scrape_insert() -> str:
+    total = run_insertion_workflow(log_file_path=INSERT_LOG_PATH, days_ahead=SCRAPE_DAYS_AHEAD)
+    return f"{total} registro(s) inseridos/atualizados"
+
+
+def stage_results() -> str:
+    if remaining_quota_today(API_DAILY_LIMIT) <= 0:
+        return "cota diária esgotada; pulado"
+    alteradas = update_results_csv_incremental(csv_path=CSV_PATH)
+    if not alteradas:
+        return "nenhum jogo novo/alterado"
+    aplicados: set[int] = set()
+    total = run_results_update_workflow(csv_path=CSV_PATH, log_file_path=LOG_RESULTS_PATH, applied_ids=aplicados)
+    # Só após o UPDATE sem erro: casados saem da fila; finalizados sem match voltam no próximo ciclo
+    record_results_applied(aplicados, csv_path=CSV_PATH)
+    return f"{alteradas} jogo(s) no CSV, {total} linha(s) processadas, {len(aplicados)} aplicada(s)"
+
+
+def _alert_callback(regras: RuleSet):
+    def _disparar(df_alertas):
+        for hit in regras.fire(df_alertas):
+            jogos = hit.games.copy()
+            jogos['Tipo_Alerta'] = hit.rule.tipo_alerta
+            enviados = enviar_alertes_unicos(jogos, token, list(hit.recipients), regra=hit.rule.name)
+            log(f"[alertas] {hit.rule.name}: {len(enviados)} novo(s) alerta(s)")
+    return _disparar
+
+
+# -------------------------------------------------------------
+# Orquestração
+# -------------------------------------------------------------
+
+async def every(name: str, seconds: int, stage, stop: asyncio.Event) -> None:
+    """Roda `stage` numa thread a cada `seconds`, sem sobreposição, até `stop`."""
+    while not stop.is_set():
+        inicio = time.perf_counter()
+        try:
+            resultado = await asyncio.to_thread(stage)
+            log(f"[{name}] {resultado} ({time.perf_counter() - inicio:.1f}s)")
+        except Exception as e:
+            log(f"[{name}] Erro: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_daemon() -> None:
+    stop = asyncio.Event()
+    stop_threads = threading.Event()  # para os loops bloqueantes (scheduler de kickoff)
+
+    def _shutdown(signame: str) -> None:
+        if not stop.is_set():
+            log(f"{signame} recebido; encerrando após os estágios em andamento...")
+            stop.set()
+            stop_threads.set()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _shutdown, sig.name)
+        except NotImplementedError:  # Windows
+            signal.signal(sig, lambda *_, n=sig.name: loop.call_soon_threadsafe(_shutdown, n))
+
+    worker = start_worker(token)
+    regras = carregar_regras()
+    tarefas = [
+        asyncio.create_task(every("scrape", SCRAPE_SECONDS, stage_scrape_insert, stop)),
+        asyncio.create_task(every("resultados", RESULTS_SECONDS, stage_results, stop)),
+    ]
+    for lead in regras.leads():  # um heap de kickoffs por antecedência das regras
+        regras_lead = regras.for_lead(lead)
+        tarefas.append(asyncio.create_task(asyncio.to_thread(
+            run_kickoff_scheduler, lead, _alert_callback(regras_lead),
+            select=regras_lead.select, offset_hours=HORARIO_OFFSET_HORAS,
+            stop_event=stop_threads, log=log,
+        )))
+    log(f"Daemon iniciado: scrape {SCRAPE_SECONDS}s, resultados {RESULTS_SECONDS}s, alertas por kickoff.")
+
+    await asyncio.gather(*tarefas, return_exceptions=True)
+    worker.stop()
+    await asyncio.to_thread(worker.join, 30)
+    log("Daemon encerrado.")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_daemon())
@@ -0,0 +1,190 @@
+# src/alert_outbox.py
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from src.telegram_sender import send_all, SendReport
+
+# Outbox durável dos alertas: cada (game_id, chat_id) vira uma linha antes de qualquer envio.
+# Um worker drena as pendentes, marca entregas por destinatário e reagenda falhas com backoff
+# exponencial. A chave primária torna o enfileiramento idempotente (reenfileirar não duplica).
+OUTBOX_PATH = os.getenv("ALERT_OUTBOX_PATH", "data/alert_outbox.sqlite")
+MAX_ATTEMPTS = int(os.getenv("ALERT_OUTBOX_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE_SECONDS = float(os.getenv("ALERT_OUTBOX_BACKOFF_BASE", "30"))
+BACKOFF_MAX_SECONDS = float(os.getenv("ALERT_OUTBOX_BACKOFF_MAX", "3600"))
+CLAIM_TIMEOUT_SECONDS = 600  # linhas 'sending' de um worker que morreu voltam para 'pending'
+DRAIN_INTERVAL_SECONDS = float(os.getenv("ALERT_OUTBOX_INTERVAL", "15"))
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS outbox ("
+    " game_id TEXT NOT NULL, chat_id INTEGER NOT NULL, message TEXT NOT NULL,"
+    " state TEXT NOT NULL DEFAULT 'pending',"  # pending | sending | sent | dead
+    " attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL,"
+    " claimed_at REAL, last_error TEXT, created_at REAL NOT NULL, sent_at REAL,"
+    " PRIMARY KEY (game_id, chat_id))",
+    "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (state, next_attempt_at)",
+)
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
+
+
+@contextmanager
+def _transaction(path: str = OUTBOX_PATH):
+    with _init_lock:
+        if path not in _initialized:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            db = sqlite3.connect(path, timeout=30)
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                for ddl in _SCHEMA:
+                    db.execute(ddl)
+                db.commit()
+            finally:
+                db.close()
+            _initialized.add(path)
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    finally:
+        db.close()
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def enqueue(messages: list[tuple], path: str = OUTBOX_PATH) -> int:
+    """`messages`: [(game_id, chat_id, texto)]. Retorna quantas linhas novas entraram."""
+    agora = time.time()
+    with _transaction(path) as db:
+        antes = db.total_changes
+        db.executemany(
+            "INSERT OR IGNORE INTO outbox (game_id, chat_id, message, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(str(g), int(c), m, agora, agora) for g, c, m in messages],
+        )
+        return db.total_changes - antes
+
+
+def _claim(limit: int, path: str) -> list[tuple]:
+    agora = time.time()
+    with _transaction(path) as db:
+        db.execute(
+            "UPDATE outbox SET state = 'pending' WHERE state = 'sending' AND claimed_at < ?",
+            (agora - CLAIM_TIMEOUT_SECONDS,),
+        )
+        rows = db.execute(
+            "SELECT game_id, chat_id, message, attempts FROM outbox "
+            "WHERE state = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (agora, limit),
+        ).fetchall()
+        db.executemany(
+            "UPDATE outbox SET state = 'sending', claimed_at = ? WHERE game_id = ? AND chat_id = ?",
+            [(agora, g, c) for g, c, _, _ in rows],
+        )
+    return rows
+
+
+def drain(token: str, limit: int = 500, path: str = OUTBOX_PATH) -> SendReport:
+    """Envia as linhas vencidas e grava o resultado de cada destinatário."""
+    rows = _claim(limit, path)
+    if not rows:
+        return SendReport(0, 0, 0, [])
+
+    tentativas = {(g, c): a for g, c, _, a in rows}
+    relatorio = send_all([((g, c), c, m) for g, c, m, _ in rows], token)
+
+    agora = time.time()
+    with _transaction(path) as db:
+        for d in relatorio.deliveries:
+            game_id, chat_id = d.key
+            if d.ok:
+                db.execute(
+                    "UPDATE outbox SET state = 'sent', sent_at = ?, attempts = attempts + 1, last_error = NULL "
+                    "WHERE game_id = ? AND chat_id = ?",
+                    (agora, game_id, chat_id),
+                )
+                continue
+            n = tentativas[(game_id, chat_id)] + 1
+            db.execute(
+                "UPDATE outbox SET state = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE game_id = ? AND chat_id = ?",
+                ('dead' if n >= MAX_ATTEMPTS else 'pending', n, agora + backoff_seconds(n), d.error,
+                 game_id, chat_id),
+            )
+    return relatorio
+
+
+def stats(path: str = OUTBOX_PATH) -> dict[str, int]:
+    with _transaction(path) as db:
+        return dict(db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall())
+
+
+def purge_sent(older_than_days: int = 7, path: str = OUTBOX_PATH) -> int:
+    with _transaction(path) as db:
+        cur = db.execute("DELETE FROM outbox WHERE state = 'sent' AND sent_at < ?",
+                         (time.time() - older_than_days * 86400,))
+        return cur.rowcount
+
+
+class OutboxWorker(threading.Thread):
+    """Drena a outbox em segundo plano a cada `interval` segundos até stop()."""
+
+    def __init__(self, token: str, interval: float = DRAIN_INTERVAL_SECONDS, path: str = OUTBOX_PATH):
+        super().__init__(name="alert-outbox", daemon=True)
+        self.token = token
+        self.interval = interval
+        self.path = path
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+
+    def notify(self) -> None:
+        """Acorda o worker logo após um enfileiramento."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                relatorio = drain(self.token, path=self.path)
+                if relatorio.deliveries:
+                    print(f"[outbox] {relatorio}")
+            except Exception as e:
+                print(f"[outbox] Erro ao drenar: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_worker: OutboxWorker | None = None
+
+
+def start_worker(token: str, interval: float = DRAIN_INTERVAL_SECONDS) -> OutboxWorker:
+    """Inicia (uma vez por processo) o worker de segundo plano."""
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = OutboxWorker(token, interval)
+        _worker.start()
+    return _worker
+
+
+def running_worker() -> OutboxWorker | None:
+    return _worker if _worker is not None and _worker.is_alive() else None
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    worker = OutboxWorker(os.getenv("TELEGRAM_TOKEN"))
+    print(f"[outbox] Estado: {stats()}")
+    worker.run()
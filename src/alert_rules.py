@@ -0,0 +1,216 @@
+# src/alert_rules.py
+import os
+import json
+import threading
+from datetime import datetime
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from src.kickoff_time import window_mask
+
+# Regras de alerta declarativas (config/alert_rules.json), compiladas uma vez em condições
+# (coluna, operador, valor) e avaliadas todas juntas sobre o DataFrame de jogos: cada coluna é
+# convertida uma única vez e cada condição distinta vira um só array booleano, compartilhado entre regras.
+# Seções: "alerts" (bot do Telegram) e "painel" (filtros do app.py).
+ALERT_RULES_PATH = os.getenv("ALERT_RULES_PATH", "config/alert_rules.json")
+DEFAULT_RECIPIENTS = "env:TELEGRAM_USERS"
+
+_OPS = {
+    '>=': np.greater_equal, '>': np.greater,
+    '<=': np.less_equal, '<': np.less,
+    '==': np.equal, '!=': np.not_equal,
+}
+_config_cache: dict[str, tuple[float, dict]] = {}
+_config_lock = threading.Lock()
+
+
+class Condition(NamedTuple):
+    columns: tuple[str, ...]  # usa a primeira presente no DataFrame; nenhuma presente: aviso e a condição falha
+    op: str
+    value: float
+
+
+class Rule(NamedTuple):
+    name: str
+    label: str
+    all: tuple[Condition, ...] = ()
+    any: tuple[Condition, ...] = ()
+    lead_minutes: float | None = None   # janela antes do kickoff (scheduler / avaliação com `now`)
+    tipo_alerta: str | None = None
+    recipients: tuple[int, ...] = ()
+    sort_by: str | None = None
+    ascending: bool = True
+    enabled: bool = True
+    params: frozenset = frozenset()     # parâmetros ($nome) usados nas condições da própria regra
+
+
+class RuleHit(NamedTuple):
+    rule: Rule
+    games: pd.DataFrame
+    recipients: tuple[int, ...]
+
+
+def _load_config(path: str) -> dict:
+    """Lê o JSON de regras, relendo só quando o arquivo muda."""
+    mtime = os.path.getmtime(path)
+    with _config_lock:
+        cached = _config_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = (mtime, json.load(f))
+            _config_cache[path] = cached
+        return cached[1]
+
+
+def _resolve_recipients(spec) -> tuple[int, ...]:
+    """Lista de chat ids, ou "env:VAR" com ids separados por vírgula."""
+    if isinstance(spec, str):
+        if not spec.startswith("env:"):
+            raise ValueError(f"Destinatários inválidos: {spec!r} (use uma lista de ids ou 'env:VAR')")
+        spec = [x for x in os.getenv(spec[4:], "").split(",") if x.strip()]
+    return tuple(int(x) for x in spec)
+
+
+def _compile_condition(raw: dict, params: dict, rule_name: str) -> tuple[Condition, str | None]:
+    op = raw.get("op", ">=")
+    if op not in _OPS:
+        raise ValueError(f"Regra '{rule_name}': operador desconhecido {op!r}")
+    colunas = raw["column"]
+    colunas = (colunas,) if isinstance(colunas, str) else tuple(colunas)
+    valor, param = raw["value"], None
+    if isinstance(valor, str) and valor.startswith("$"):
+        param = valor[1:]
+        if param not in params:
+            raise ValueError(f"Regra '{rule_name}': parâmetro '{param}' sem valor")
+        valor = params[param]
+    return Condition(colunas, op, float(valor)), param
+
+
+def _compile_list(raws: list[dict], params: dict, rule_name: str) -> tuple[tuple[Condition, ...], set[str]]:
+    conds, usados = [], set()
+    for raw in raws:
+        cond, param = _compile_condition(raw, params, rule_name)
+        conds.append(cond)
+        if param is not None:
+            usados.add(param)
+    return tuple(conds), usados
+
+
+def compile_rules(section: dict, params: dict | None = None) -> list[Rule]:
+    """Compila uma seção do JSON. `params` sobrescreve os padrões da seção e de cada regra."""
+    regras = []
+    for raw in section.get("rules", []):
+        nome = raw["name"]
+        valores = {**section.get("params", {}), **raw.get("params", {}), **(params or {})}
+        base, _ = _compile_list(section.get("all", []), valores, nome)  # comum a todas as regras da seção
+        todas, usados_all = _compile_list(raw.get("all", []), valores, nome)
+        alguma, usados_any = _compile_list(raw.get("any", []), valores, nome)
+        regras.append(Rule(
+            name=nome,
+            label=raw.get("label", nome),
+            all=base + todas,
+            any=alguma,
+            lead_minutes=raw.get("lead_minutes"),
+            tipo_alerta=raw.get("tipo_alerta"),
+            recipients=_resolve_recipients(raw.get("recipients", DEFAULT_RECIPIENTS)),
+            sort_by=raw.get("sort_by"),
+            ascending=raw.get("ascending", True),
+            enabled=raw.get("enabled", True),
+            params=frozenset(usados_all | usados_any),
+        ))
+    return regras
+
+
+class RuleSet:
+    """Conjunto de regras compiladas, avaliadas numa única passada sobre o DataFrame."""
+
+    def __init__(self, rules: list[Rule]):
+        nomes = [r.name for r in rules]
+        if len(set(nomes)) != len(nomes):
+            raise ValueError(f"Nomes de regra repetidos: {nomes}")
+        self.rules = list(rules)
+
+    @classmethod
+    def from_file(cls, section: str = "alerts", names: list[str] | None = None, params: dict | None = None,
+                  path: str = ALERT_RULES_PATH) -> "RuleSet":
+        """Regras habilitadas da seção; com `names`, exatamente essas (mesmo desabilitadas)."""
+        regras = compile_rules(_load_config(path).get(section, {}), params)
+        if names is None:
+            return cls([r for r in regras if r.enabled])
+        por_nome = {r.name: r for r in regras}
+        faltando = [n for n in names if n not in por_nome]
+        if faltando:
+            raise ValueError(f"Regras inexistentes na seção '{section}': {faltando}")
+        return cls([por_nome[n] for n in names])
+
+    def get(self, name: str) -> Rule:
+        return next(r for r in self.rules if r.name == name)
+
+    def leads(self) -> list[float]:
+        """Antecedências distintas (um scheduler de kickoff por antecedência)."""
+        return sorted({r.lead_minutes for r in self.rules if r.lead_minutes is not None})
+
+    def for_lead(self, lead_minutes: float) -> "RuleSet":
+        return RuleSet([r for r in self.rules if r.lead_minutes == lead_minutes])
+
+    def evaluate(self, df: pd.DataFrame, now: datetime | None = None) -> pd.DataFrame:
+        """Matriz booleana jogos x regras. Com `now`, aplica também a janela `lead_minutes` de cada regra."""
+        valores: dict[tuple, np.ndarray] = {}
+        condicoes: dict[Condition, np.ndarray] = {}
+        janelas: dict[float, np.ndarray] = {}
+
+        def coluna(cols: tuple[str, ...]) -> np.ndarray | None:
+            if cols not in valores:
+                presente = next((c for c in cols if c in df.columns), None)
+                if presente is None:
+                    if not df.empty:
+                        print(f"[alert_rules] Coluna inexistente no DataFrame: {' / '.join(cols)} "
+                              f"(condição nunca satisfeita)")
+                    valores[cols] = None
+                else:
+                    valores[cols] = np.nan_to_num(pd.to_numeric(df[presente], errors='coerce').to_numpy(dtype=float, na_value=np.nan))
+            return valores[cols]
+
+        def condicao(c: Condition) -> np.ndarray:
+            if c not in condicoes:
+                valores_col = coluna(c.columns)
+                condicoes[c] = (np.zeros(len(df), dtype=bool) if valores_col is None
+                                else _OPS[c.op](valores_col, c.value))
+            return condicoes[c]
+
+        matriz = {}
+        for r in self.rules:
+            mask = np.ones(len(df), dtype=bool)
+            for c in r.all:
+                mask &= condicao(c)
+            if r.any:
+                mask &= np.logical_or.reduce([condicao(c) for c in r.any])
+            if now is not None and r.lead_minutes is not None:
+                if r.lead_minutes not in janelas:
+                    janelas[r.lead_minutes] = window_mask(df, r.lead_minutes, now).to_numpy(dtype=bool)
+                mask &= janelas[r.lead_minutes]
+            matriz[r.name] = mask
+        return pd.DataFrame(matriz, index=df.index, columns=[r.name for r in self.rules], dtype=bool)
+
+    def select(self, df: pd.DataFrame, now: datetime | None = None) -> pd.DataFrame:
+        """Jogos que disparam ao menos uma regra, ordenados pelo `sort_by` da primeira regra (se houver)."""
+        if df.empty or not self.rules:
+            return df.iloc[0:0]
+        out = df[self.evaluate(df, now).any(axis=1)]
+        primeira = self.rules[0]
+        if primeira.sort_by and primeira.sort_by in out.columns:
+            out = out.sort_values(by=primeira.sort_by, ascending=primeira.ascending)
+        return out
+
+    def fire(self, df: pd.DataFrame, now: datetime | None = None) -> list[RuleHit]:
+        """Para cada regra com jogos: (regra, jogos, destinatários), na ordem do arquivo."""
+        if df.empty:
+            return []
+        matriz = self.evaluate(df, now)
+        return [
+            RuleHit(r, df[matriz[r.name]], r.recipients)
+            for r in self.rules
+            if matriz[r.name].any()
+        ]
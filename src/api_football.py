@@ -0,0 +1,127 @@
+# src/api_football.py
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+import requests
+
+from src import quota
+
+# Cache em disco das respostas JSON da API-Football:
+#   data/api_cache/<endpoint>/<sha1(endpoint+params)>.json
+#     -> {endpoint, params, fetched_at, ttl, response}
+# Modo replay (API_FOOTBALL_REPLAY=1): serve só o que foi gravado, sem rede e sem gastar cota.
+BASE_URL = "https://v3.football.api-sports.io/"
+API_CACHE_DIR = os.getenv("API_CACHE_DIR", "data/api_cache")
+REQUEST_TIMEOUT = float(os.getenv("API_FOOTBALL_TIMEOUT", "20"))
+
+# TTLs (segundos) conforme o status dos jogos na resposta
+TTL_LIVE = int(os.getenv("API_CACHE_TTL_LIVE", "60"))
+TTL_SCHEDULED = int(os.getenv("API_CACHE_TTL_SCHEDULED", "900"))
+TTL_FINISHED = int(os.getenv("API_CACHE_TTL_FINISHED", str(30 * 24 * 3600)))
+TTL_DEFAULT = int(os.getenv("API_CACHE_TTL_DEFAULT", "3600"))
+
+LIVE_STATUSES = frozenset({'1H', 'HT', '2H', 'ET', 'BT', 'P', 'SUSP', 'INT', 'LIVE'})
+TERMINAL_STATUSES = frozenset({'FT', 'AET', 'PEN', 'PST', 'CANC', 'ABD', 'AWD', 'WO'})
+
+
+class ReplayMiss(RuntimeError):
+    """Resposta não gravada no cache durante o modo replay."""
+
+
+def replay_enabled() -> bool:
+    return os.getenv("API_FOOTBALL_REPLAY", "0") == "1"
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    canon = json.dumps({"endpoint": endpoint, "params": {k: str(v) for k, v in params.items()}}, sort_keys=True)
+    return hashlib.sha1(canon.encode("utf-8")).hexdigest()
+
+
+def _cache_path(endpoint: str, params: dict) -> str:
+    return os.path.join(API_CACHE_DIR, endpoint.strip("/").replace("/", "_"), f"{cache_key(endpoint, params)}.json")
+
+
+def ttl_for(endpoint: str, response: list) -> int:
+    """Jogos ao vivo expiram rápido; dia todo encerrado praticamente não expira."""
+    if endpoint.strip("/") != "fixtures":
+        return TTL_DEFAULT
+    status = {((f.get('fixture') or {}).get('status') or {}).get('short') for f in response}
+    if status & LIVE_STATUSES:
+        return TTL_LIVE
+    if response and status <= TERMINAL_STATUSES:
+        return TTL_FINISHED
+    return TTL_SCHEDULED
+
+
+def load_cached(endpoint: str, params: dict) -> dict | None:
+    path = _cache_path(endpoint, params)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _store(endpoint: str, params: dict, response: list) -> None:
+    path = _cache_path(endpoint, params)
+    dir_ = os.path.dirname(path)
+    os.makedirs(dir_, exist_ok=True)
+    entry = {
+        "endpoint": endpoint,
+        "params": params,
+        "fetched_at": time.time(),
+        "ttl": ttl_for(endpoint, response),
+        "response": response,
+    }
+    fd, tmp = tempfile.mkstemp(dir=dir_, suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def fetch(endpoint: str, params: dict, headers: dict, replay: bool | None = None,
+          before_request=None, max_age: int | None = None) -> list[dict]:
+    """GET em `endpoint` com cache. `before_request()` só roda quando há chamada de rede; se devolver
+    o id de uma reserva de cota (src.quota.reserve), ela é confirmada no sucesso e liberada se a
+    requisição não chegar à API. `max_age` sobrepõe o TTL gravado (0 força a chamada)."""
+    replay = replay_enabled() if replay is None else replay
+    entry = load_cached(endpoint, params)
+
+    if replay:
+        if entry is None:
+            raise ReplayMiss(f"Sem resposta gravada para {endpoint} {params} em {API_CACHE_DIR}")
+        return entry["response"]
+
+    if entry is not None:
+        ttl = entry.get("ttl", TTL_DEFAULT) if max_age is None else max_age
+        if time.time() - entry.get("fetched_at", 0) < ttl:
+            return entry["response"]
+
+    reserva = before_request() if before_request is not None else None
+    try:
+        resp = requests.get(BASE_URL + endpoint.strip("/"), headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        if reserva is not None:
+            quota.release(reserva)
+        raise RuntimeError(f"Erro na requisição à API: {e}")
+    if reserva is not None:
+        quota.commit(reserva)  # a API conta a chamada mesmo com status de erro
+
+    try:
+        resp.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise RuntimeError(f"Erro na requisição à API: {e}")
+
+    response = resp.json().get('response', [])
+    _store(endpoint, params, response)
+    return response
@@ -1,111 +1,44 @@
 import os
 import pytz
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
-import re
+import time
+import logging
+import threading
+from contextlib import contextmanager
 
 # Preferência: mysql.connector
-import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
 
 # Raspagem existente
-from src.scraper_soccerstats import get_today_games
+from src.scraper_soccerstats import get_today_games, get_games_for_range
+from src.fixture_store import save_fixtures, fixtures_mtime
+from src.frame_memo import load_processed
+from src.features import limpar_e_converter_dados, calcular_probabilidades, arredondar_features
+from src.team_matcher import stopwords, build_like_patterns, TeamMatchIndex
+from src.team_aliases import AliasStore, get_alias_store, ALIAS_LEARN_MIN_SCORE
 
 TIMEZONE_TARGET = 'America/Sao_Paulo'
-EXCEL_PATH = "data/Jogos_de_Hoje.xlsx"
-STOPWORDS_PREFIXES = {
-    'fc', 'club', 'cf', 'ac', 'sc', 'sd', 'cd', 'ud', 'fk', 'sk',
-    'al', 'el', 'de', 'da', 'do', 'la', 'las', 'los', 'sv', 'if', 'afc'
-}
-# Sufixos ou marcadores de gênero comuns
-STOPWORDS_SUFFIXES = {
-    'w', 'women', 'fem', 'femenino', 'ladies'
-}
-# Categorias por idade / times B/II comumente geram variações
-CATEGORY_TOKENS = {
-    'u15', 'u16', 'u17', 'u18', 'u19', 'u20', 'u21', 'u23',
-    'reserves', 'reserve', 'b', 'ii'
-}
+logger = logging.getLogger(__name__)
 
 # -------------------------------------------------------------
-# Funções replicadas de processamento (sem Streamlit)
-# -------------------------------------------------------------
-
-def limpar_e_converter_dados(df: pd.DataFrame) -> pd.DataFrame:
-    """Limpa '%' das colunas de porcentagem, converte vírgula para ponto e padroniza para float."""
-    perc_cols = [
-        col for col in df.columns
-        if col.startswith(('Over', 'BTTS')) and ('H' in col or 'A' in col)
-    ]
-
-    # Remove '%' das colunas de porcentagem
-    for col in perc_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace('%', '', regex=False)
-
-    # Lista de colunas que podem ter decimais com vírgula
-    num_cols = set(perc_cols + [
-        'Media_Gols_Casa', 'MediaGols_Fora', 'PPG_Casa', 'PPG_Fora',
-        'Gols_Marcados_Casa', 'Gols_Marcados_Fora',
-        'Vitorias_A', 'Vitorias_H'
-    ])
-
-    # Converte vírgula para ponto e transforma em numérico
-    for col in num_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace(',', '.', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    # Remove linhas com NaN nas colunas de porcentagem após conversão
-    df.dropna(subset=[c for c in perc_cols if c in df.columns], inplace=True)
-    return df
-
-
-def calcular_probabilidades(df: pd.DataFrame) -> pd.DataFrame:
-    """Adiciona colunas com probabilidade de Over 1.5, Over 2.5 e BTTS, e MÉDIA_PROB."""
-    # 1. Cálculos de Médias Simples
-    if 'Over15_H' in df.columns and 'Over15_A' in df.columns:
-        df['Prob_Over1.5'] = ((df['Over15_H'] + df['Over15_A']) / 2).round(2)
-        df['Over15_MEDIA'] = df['Prob_Over1.5']
-    if 'Over25_H' in df.columns and 'Over25_A' in df.columns:
-        df['Prob_Over2.5'] = ((df['Over25_H'] + df['Over25_A']) / 2).round(2)
-        df['Over25_MEDIA'] = df['Prob_Over2.5']
-    if 'BTTS_H' in df.columns and 'BTTS_A' in df.columns:
-        df['Prob_BTTS'] = ((df['BTTS_H'] + df['BTTS_A']) / 2).round(2)
-        df['Over_BOTH'] = df['Prob_BTTS']
-
-    # 2. Cálculo da MÉDIA_PROB
-    perc_cols = ['Over15_H', 'Over25_H', 'BTTS_H', 'Over15_A', 'Over25_A', 'BTTS_A']
-    colunas_para_media = [col for col in perc_cols if col in df.columns and pd.api.types.is_numeric_dtype(df[col])]
-
-    if len(colunas_para_media) == 6:
-        df['MÉDIA_PROB'] = df[colunas_para_media].sum(axis=1) / 6
-        df['MÉDIA_PROB'] = df['MÉDIA_PROB'].round(2)
-    else:
-        df['MÉDIA_PROB'] = 0
-
-    return df
-
-
-# -------------------------------------------------------------
-# Carregamento de dados (cache simples via Excel, sem Streamlit)
+# Carregamento de dados (cache Parquet, sem Streamlit)
 # -------------------------------------------------------------
 
 def load_and_process_data_cli() -> pd.DataFrame:
     tz_target = pytz.timezone(TIMEZONE_TARGET)
     data_de_hoje = datetime.now(tz_target).date()
 
-    # 1) Tenta carregar do Excel se for de hoje
-    if os.path.exists(EXCEL_PATH):
-        data_modificacao_timestamp = os.path.getmtime(EXCEL_PATH)
+    # 1) Tenta carregar do cache se for de hoje
+    data_modificacao_timestamp = fixtures_mtime()
+    if data_modificacao_timestamp is not None:
         data_modificacao = datetime.fromtimestamp(data_modificacao_timestamp).date()
         if data_modificacao == data_de_hoje:
-            df = pd.read_excel(EXCEL_PATH)
+            # Memo: só reprocessa se o arquivo mudou desde a última leitura
+            df = load_processed()
             if not df.empty:
-                # Garante o processamento
-                df = limpar_e_converter_dados(df)
-                df = calcular_probabilidades(df)
                 return df
 
     # 2) Caso contrário, raspa novamente
@@ -113,10 +46,8 @@ def load_and_process_data_cli() -> pd.DataFrame:
     df = limpar_e_converter_dados(df)
     df = calcular_probabilidades(df)
 
-    # 3) Salva para reuso rápido
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    df.to_excel(EXCEL_PATH, index=False)
+    # 3) Salva para reuso rápido (já processado, com dtypes)
+    save_fixtures(df)
 
     return df
 
@@ -129,7 +60,7 @@ def prepare_df_for_insertion(df: pd.DataFrame) -> pd.DataFrame:
     tz_target = pytz.timezone(TIMEZONE_TARGET)
     data_de_hoje = datetime.now(tz_target).date()
 
-    df_prep = df.copy()
+    df_prep = arredondar_features(df.copy())  # float32 -> 2 casas (sem 56.669998 no banco)
 
     # Se vier uma DATA_JOGO do scraper, usa; caso contrário, data de hoje
     if 'DATA_JOGO' in df_prep.columns:
@@ -192,42 +123,245 @@ def prepare_df_for_insertion(df: pd.DataFrame) -> pd.DataFrame:
 # Conexão MySQL e Inserção
 # -------------------------------------------------------------
 
-def get_mysql_connection():
-    load_dotenv()
-    host = os.getenv('MYSQL_HOST', 'localhost')
-    user = os.getenv('MYSQL_USER', 'SEU_USUARIO_MYSQL')
-    password = os.getenv('MYSQL_PASSWORD', 'SUA_SENHA_MYSQL')
-    database = os.getenv('MYSQL_DB', 'simulador-apostas')
+# Pool de conexões do processo (workflows, app e páginas do Streamlit)
+MYSQL_POOL_NAME = "robobet"
+MYSQL_POOL_SIZE = min(32, max(1, int(os.getenv("MYSQL_POOL_SIZE", "5"))))  # limite do conector: 32
+MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "10"))  # espera por conexão livre (s)
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+_dotenv_loaded = False
+
+
+def _mysql_config() -> dict:
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
+    return {
+        'host': os.getenv('MYSQL_HOST', 'localhost'),
+        'user': os.getenv('MYSQL_USER', 'SEU_USUARIO_MYSQL'),
+        'password': os.getenv('MYSQL_PASSWORD', 'SUA_SENHA_MYSQL'),
+        'database': os.getenv('MYSQL_DB', 'simulador-apostas'),
+    }
+
+
+def get_mysql_pool() -> pooling.MySQLConnectionPool:
+    """Cria (uma vez por processo) o pool de conexões. Recria se as variáveis MYSQL_* mudarem."""
+    global _pool, _pool_config
+    config = _mysql_config()
+    with _pool_lock:
+        if _pool is None or config != _pool_config:
+            try:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=MYSQL_POOL_NAME,
+                    pool_size=MYSQL_POOL_SIZE,
+                    pool_reset_session=True,
+                    autocommit=False,
+                    **config,
+                )
+            except Error as e:
+                raise RuntimeError(f"Erro ao conectar no MySQL: {e}")
+            _pool_config = config
+        return _pool
+
 
+def get_mysql_connection():
+    """Empresta uma conexão do pool (conn.close() a devolve). Espera até MYSQL_POOL_TIMEOUT
+    segundos se o pool estiver esgotado e reconecta conexões derrubadas pelo servidor."""
+    pool = get_mysql_pool()
+    limite = time.monotonic() + MYSQL_POOL_TIMEOUT
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except PoolError:
+            if time.monotonic() >= limite:
+                raise RuntimeError(f"Pool MySQL esgotado ({MYSQL_POOL_SIZE} conexões em uso).")
+            time.sleep(0.05)
+        except Error as e:
+            raise RuntimeError(f"Erro ao conectar no MySQL: {e}")
+
+    # Health check: conexões ociosas podem ter caído (wait_timeout do servidor)
     try:
-        conn = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database,
-            autocommit=False,
-        )
-        return conn
+        conn.ping(reconnect=True, attempts=2, delay=1)
     except Error as e:
+        conn.close()
         raise RuntimeError(f"Erro ao conectar no MySQL: {e}")
+    return conn
 
 
-def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = None) -> int:
-    """Insere linhas do DataFrame na tabela `jogos`. Retorna o número de registros inseridos."""
-    if df is None or df.empty:
-        return 0
+@contextmanager
+def mysql_connection():
+    """with mysql_connection() as conn: ... — devolve a conexão ao pool ao sair."""
+    conn = get_mysql_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# -------------------------------------------------------------
+# Registro de schema (SHOW COLUMNS e SQL montado, uma vez por pool)
+# -------------------------------------------------------------
+
+ER_BAD_FIELD_ERROR = 1054  # coluna desconhecida: schema mudou sem avisar
+
+_schema_lock = threading.Lock()
+_schema_cols: dict[str, frozenset[str]] = {}
+_sql_cache: dict[tuple, str] = {}
+_schema_owner = None
+
+
+def _check_schema_owner() -> None:
+    """Invalida o registro quando o pool é recriado ou DB_SCHEMA_VERSION muda."""
+    global _schema_owner
+    owner = (id(_pool), os.getenv("DB_SCHEMA_VERSION", "1"))
+    if owner != _schema_owner:
+        _schema_cols.clear()
+        _sql_cache.clear()
+        _schema_owner = owner
+
+
+def invalidate_schema_cache() -> None:
+    """Descarta colunas e SQL em cache (ex.: após um ALTER TABLE)."""
+    with _schema_lock:
+        _schema_cols.clear()
+        _sql_cache.clear()
+
+
+def get_table_columns(conn, table: str) -> frozenset[str]:
+    """Colunas da tabela; SHOW COLUMNS só roda na primeira chamada de cada pool/versão."""
+    with _schema_lock:
+        _check_schema_owner()
+        if table in _schema_cols:
+            return _schema_cols[table]
+
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SHOW COLUMNS FROM {table}")
+        cols = frozenset(row[0] for row in cur.fetchall())
+    finally:
+        cur.close()
+
+    with _schema_lock:
+        _schema_cols[table] = cols
+    return cols
+
+
+def cached_sql(key: tuple, build) -> str:
+    """Devolve o SQL montado por `build()` para `key`, montando só na primeira vez."""
+    with _schema_lock:
+        _check_schema_owner()
+        sql = _sql_cache.get(key)
+        if sql is None:
+            sql = _sql_cache[key] = build()
+        return sql
+
+
+def _on_db_error(e: Error) -> None:
+    if getattr(e, 'errno', None) == ER_BAD_FIELD_ERROR:
+        invalidate_schema_cache()
+
+
+# Tamanho padrão dos lotes do executemany no caminho em massa
+BULK_CHUNK_SIZE = int(os.getenv("MYSQL_BULK_CHUNK_SIZE", "500"))
+DECIMAL_DESTS = ('MEDIA_HOME', 'MEDIA_AWAY', 'PROB_OVER_1_5', 'PROB_OVER_2_5', 'PROB_BTTS', 'MEDIA_PROB')
+INT_DESTS = ('CONT_HOME', 'CONT_AWAY')
+UPDATABLE_DESTS = [
+    'PAIS', 'MEDIA_PROB', 'PROB_OVER_1_5', 'PROB_OVER_2_5', 'PROB_BTTS',
+    'MEDIA_HOME', 'MEDIA_AWAY', 'CONT_HOME', 'CONT_AWAY', 'LIGA'
+]
+
+
+def _column_values(df: pd.DataFrame, dest: str, candidates: list[str]) -> list:
+    """Valores prontos para o driver (tipos Python, None no lugar de NaN) de uma coluna de destino,
+    com as mesmas regras do caminho linha a linha, mas aplicadas à coluna inteira."""
+    src = next((c for c in candidates if c in df.columns), None)
+    hoje = datetime.now(pytz.timezone(TIMEZONE_TARGET)).date()
+
+    if dest == 'DATA_JOGO':
+        if src is None:
+            return [hoje] * len(df)
+        datas = pd.to_datetime(df[src], errors='coerce').dt.date
+        return datas.where(datas.notna(), hoje).tolist()
+
+    if src is None:
+        return [None] * len(df)
+
+    serie = df[src]
+    if dest in DECIMAL_DESTS:
+        serie = pd.to_numeric(serie, errors='coerce').astype('float64').round(2)
+    elif dest in INT_DESTS:
+        serie = pd.to_numeric(serie, errors='coerce').round().astype('Int64')
+    elif serie.dtype == object:
+        serie = serie.where(serie.isna(), serie.astype(str).str.strip())
+
+    serie = serie.astype(object)
+    return serie.where(serie.notna(), None).tolist()
+
+
+def _bulk_upsert(df: pd.DataFrame, conn, table: str, insert_cols: list[str],
+                 dest_candidates: dict[str, list[str]], chunk_size: int, log_f=None) -> int:
+    """INSERT ... ON DUPLICATE KEY UPDATE em lotes via executemany. Retorna o número de linhas novas."""
+    colunas = [_column_values(df, col, dest_candidates.get(col, [col])) for col in insert_cols]
+    rows = list(zip(*colunas))
+
+    def build_upsert() -> str:
+        update_fields = [f"{f} = VALUES({f})" for f in UPDATABLE_DESTS if f in insert_cols]
+        columns_sql = ', '.join(insert_cols)
+        placeholders = ', '.join(['%s'] * len(insert_cols))
+        if update_fields:
+            return (f"INSERT INTO {table} ({columns_sql}) VALUES ({placeholders}) "
+                    f"ON DUPLICATE KEY UPDATE {', '.join(update_fields)}")
+        return f"INSERT IGNORE INTO {table} ({columns_sql}) VALUES ({placeholders})"
+
+    sql = cached_sql(('upsert', table, tuple(insert_cols)), build_upsert)
+
+    # Linhas novas = diferença de contagem nas datas afetadas (ON DUPLICATE KEY não separa insert/update)
+    datas = sorted({r[insert_cols.index('DATA_JOGO')] for r in rows})
+    count_sql = cached_sql(
+        ('count_dates', table, len(datas)),
+        lambda: f"SELECT COUNT(*) FROM {table} WHERE DATA_JOGO IN ({', '.join(['%s'] * len(datas))})",
+    )
 
     cursor = conn.cursor()
+    try:
+        cursor.execute(count_sql, tuple(datas))
+        antes = cursor.fetchone()[0]
 
-    def get_table_columns(connection, table: str) -> set[str]:
-        cur = connection.cursor()
-        try:
-            cur.execute(f"SHOW COLUMNS FROM {table}")
-            return {row[0] for row in cur.fetchall()}
-        finally:
-            cur.close()
+        for inicio in range(0, len(rows), chunk_size):
+            lote = rows[inicio:inicio + chunk_size]
+            cursor.executemany(sql, lote)
+            if log_f:
+                log_f.write(f"-- LOTE {inicio}-{inicio + len(lote) - 1}: rows={cursor.rowcount}\n")
+
+        cursor.execute(count_sql, tuple(datas))
+        inserted = cursor.fetchone()[0] - antes
+        conn.commit()
+        return inserted
+    except Error as e:
+        conn.rollback()
+        _on_db_error(e)
+        if log_f:
+            log_f.write(f"-- ERRO NO INSERT EM LOTE: {str(e)}\n")
+        raise RuntimeError(f"Erro ao inserir dados: {e}")
+    finally:
+        cursor.close()
+        if log_f:
+            log_f.write(f"-- Fim inserção (lote): tentadas={len(rows)}, chunk={chunk_size}\n\n")
 
-    schema_cols = get_table_columns(conn, "jogos")
+
+def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = None,
+                         bulk: bool = True, chunk_size: int = BULK_CHUNK_SIZE, table: str = "jogos") -> int:
+    """Insere linhas do DataFrame na tabela `jogos`. Retorna o número de registros inseridos.
+    Por padrão usa o caminho em massa (executemany + ON DUPLICATE KEY UPDATE em lotes de `chunk_size`);
+    bulk=False mantém o INSERT IGNORE + UPDATE linha a linha."""
+    if df is None or df.empty:
+        return 0
+
+    schema_cols = get_table_columns(conn, table)
 
     dest_candidates: dict[str, list[str]] = {
         # DATA_JOGO deve vir da coluna DATA_JOGO (não usar Horário)
@@ -258,7 +392,10 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
 
     placeholders = ', '.join(['%s'] * len(insert_cols))
     columns_sql = ', '.join(insert_cols)
-    sql = f"INSERT IGNORE INTO jogos ({columns_sql}) VALUES ({placeholders})"
+    sql = cached_sql(
+        ('insert_ignore', table, tuple(insert_cols)),
+        lambda: f"INSERT IGNORE INTO {table} ({columns_sql}) VALUES ({placeholders})",
+    )
 
     # Inicializa log de inserção
     log_f = None
@@ -271,10 +408,19 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
             log_f.write(f"-- Início inserção: {datetime.now().isoformat()}\n")
             log_f.write(f"-- Schema cols: {sorted(schema_cols)}\n")
             log_f.write(f"-- Insert cols({len(insert_cols)}): {insert_cols}\n")
-            log_f.write(f"INSERT INTO jogos ({columns_sql}) VALUES ({placeholders});\n")
+            log_f.write(f"INSERT INTO {table} ({columns_sql}) VALUES ({placeholders});\n")
         except Exception:
             log_f = None  # fallback silencioso se não conseguir abrir
 
+    if bulk:
+        try:
+            return _bulk_upsert(df, conn, table, insert_cols, dest_candidates, chunk_size, log_f)
+        finally:
+            if log_f:
+                log_f.close()
+
+    cursor = conn.cursor()
+
     def pick_from_row(row: pd.Series, dest: str):
         candidates = dest_candidates.get(dest, [dest])
         for src in candidates:
@@ -354,6 +500,7 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
                     # Opcional: logar sucesso resumido
                     log_f.write(f"-- OK linha {idx}: rows={cursor.rowcount}\n")
             except Error as e:
+                _on_db_error(e)
                 if log_f:
                     log_f.write("-- ERRO NO INSERT (execute falhou)\n")
                     log_f.write(f"-- Linha DF: {idx}\n")
@@ -366,19 +513,18 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
             if cursor.rowcount > 0:
                 inserted += cursor.rowcount
             else:
-                updatable = [
-                    'PAIS', 'MEDIA_PROB', 'PROB_OVER_1_5', 'PROB_OVER_2_5', 'PROB_BTTS',
-                    'MEDIA_HOME', 'MEDIA_AWAY', 'CONT_HOME', 'CONT_AWAY', 'LIGA'
-                ]
                 update_fields = []
                 update_params = []
-                for field in updatable:
+                for field in UPDATABLE_DESTS:
                     if field in insert_cols:
                         update_fields.append(f"{field} = %s")
                         update_params.append(pick_from_row(row, field))
 
                 if update_fields:
-                    update_sql = f"UPDATE jogos SET {', '.join(update_fields)} WHERE DATA_JOGO = %s AND TIME_CASA = %s AND TIME_FORA = %s"
+                    update_sql = cached_sql(
+                        ('update_dup', table, tuple(update_fields)),
+                        lambda: f"UPDATE {table} SET {', '.join(update_fields)} WHERE DATA_JOGO = %s AND TIME_CASA = %s AND TIME_FORA = %s",
+                    )
                     dt_val = values[insert_cols.index('DATA_JOGO')]
                     casa_val = values[insert_cols.index('TIME_CASA')]
                     fora_val = values[insert_cols.index('TIME_FORA')]
@@ -390,6 +536,7 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
         return inserted
     except Error as e:
         conn.rollback()
+        _on_db_error(e)
         raise RuntimeError(f"Erro ao inserir dados: {e}")
     finally:
         cursor.close()
@@ -402,17 +549,35 @@ def insert_df_into_mysql(df: pd.DataFrame, conn, log_file_path: str | None = Non
 # Execução completa (modular)
 # -------------------------------------------------------------
 
-def run_insertion_workflow(log_file_path: str | None = None) -> int:
-    """Executa: carregar/raspar, processar, preparar e inserir no MySQL. Retorna total inserido."""
+def run_insertion_workflow(log_file_path: str | None = None, days_ahead: int = 0) -> int:
+    """Executa: carregar/raspar, processar, preparar e inserir no MySQL. Retorna total inserido.
+    Com days_ahead > 0, também pré-carrega os jogos de amanhã (o soccerstats não lista dias além disso)."""
     df = load_and_process_data_cli()
     df_ready = prepare_df_for_insertion(df)
 
-    conn = get_mysql_connection()
-    try:
+    with mysql_connection() as conn:
         total = insert_df_into_mysql(df_ready, conn, log_file_path=log_file_path)
-        return total
-    finally:
-        conn.close()
+
+    if days_ahead > 0:
+        hoje = datetime.now(pytz.timezone(TIMEZONE_TARGET)).date()
+        total += run_range_insertion_workflow(
+            hoje + timedelta(days=1), hoje + timedelta(days=days_ahead), log_file_path=log_file_path
+        )
+    return total
+
+
+def run_range_insertion_workflow(start: date, end: date, log_file_path: str | None = None) -> int:
+    """Raspa um intervalo de datas (pré-carga de dias futuros ou replay de dias gravados)
+    e insere tudo no MySQL com a DATA_JOGO de cada dia. Retorna total inserido."""
+    df = get_games_for_range(start, end)
+    if df.empty:
+        return 0
+    df = limpar_e_converter_dados(df)
+    df = calcular_probabilidades(df)
+    df_ready = prepare_df_for_insertion(df)
+
+    with mysql_connection() as conn:
+        return insert_df_into_mysql(df_ready, conn, log_file_path=log_file_path)
 
 
 def run_results_update_workflow(
@@ -421,11 +586,13 @@ def run_results_update_workflow(
     fallback_like: bool = True,
     remove_prefixes: bool = True,
     remove_suffixes: bool = True,
-    remove_categories: bool = True
+    remove_categories: bool = True,
+    matcher: str = "memory",
+    applied_ids: set | None = None
 ) -> int:
-    """Abre conexão e roda o UPDATE de resultados a partir de um CSV local, com fallback por LIKE e normalização configuráveis."""
-    conn = get_mysql_connection()
-    try:
+    """Empresta conexão do pool e roda o UPDATE de resultados a partir de um CSV local, com fallback (índice em memória ou LIKE) e normalização configuráveis.
+    `applied_ids` (opcional) recebe, após o commit, os Fixture_ID do CSV que casaram com um jogo."""
+    with mysql_connection() as conn:
         return upsert_results_from_csv(
             csv_path,
             conn,
@@ -433,10 +600,59 @@ def run_results_update_workflow(
             fallback_like=fallback_like,
             remove_prefixes=remove_prefixes,
             remove_suffixes=remove_suffixes,
-            remove_categories=remove_categories
+            remove_categories=remove_categories,
+            matcher=matcher,
+            applied_ids=applied_ids
         )
+
+
+RESULTS_STAGE_TABLE = "jogos_resultados_stage"
+
+
+def _stage_exact_results(cursor, stage: pd.DataFrame, has_liga: bool, chunk_size: int = BULK_CHUNK_SIZE) -> set[int]:
+    """Carrega `stage` (SEQ, DATA_JOGO, TIME_CASA, TIME_FORA, GOLS_CASA, GOLS_FORA[, LIGA]) numa tabela
+    temporária e aplica todos os matches exatos com um único UPDATE ... JOIN.
+    Retorna os SEQ que casaram; o restante segue para o fallback."""
+    cols = ["DATA_JOGO", "TIME_CASA", "TIME_FORA", "GOLS_CASA", "GOLS_FORA"] + (["LIGA"] if has_liga else [])
+    # Declarada num único CREATE TEMPORARY TABLE (sem ALTER: não há commit implícito no meio da
+    # transação) e sem NOT NULL nas colunas do CSV. A collation dos nomes vem de `jogos`, para o JOIN
+    # não dar "Illegal mix of collations".
+    cursor.execute(
+        "SELECT COLLATION_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jogos' AND COLUMN_NAME = 'TIME_CASA'"
+    )
+    row = cursor.fetchone()
+    texto = f"VARCHAR(100) COLLATE {row[0]}" if row and row[0] else "VARCHAR(100)"
+    tipos = {"DATA_JOGO": "DATE", "TIME_CASA": texto, "TIME_FORA": texto,
+             "GOLS_CASA": "INT", "GOLS_FORA": "INT", "LIGA": texto}
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {RESULTS_STAGE_TABLE}")
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE {RESULTS_STAGE_TABLE} ("
+        "SEQ INT NOT NULL, "
+        + "".join(f"{c} {tipos[c]} NULL, " for c in cols)
+        + "INDEX idx_stage_key (DATA_JOGO, TIME_CASA, TIME_FORA))"
+    )
+    try:
+        sql_ins = cached_sql(
+            ('results_stage_insert', has_liga),
+            lambda: f"INSERT INTO {RESULTS_STAGE_TABLE} (SEQ, {', '.join(cols)}) "
+                    f"VALUES ({', '.join(['%s'] * (len(cols) + 1))})",
+        )
+        valores = [_column_values(stage, "SEQ", ["SEQ"])] + [_column_values(stage, c, [c]) for c in cols]
+        linhas = list(zip(*valores))
+        for i in range(0, len(linhas), chunk_size):
+            cursor.executemany(sql_ins, linhas[i:i + chunk_size])
+
+        join = ("s.DATA_JOGO = j.DATA_JOGO AND s.TIME_CASA = j.TIME_CASA AND s.TIME_FORA = j.TIME_FORA")
+        sets = ["j.GOLS_CASA = s.GOLS_CASA", "j.GOLS_FORA = s.GOLS_FORA"]
+        if has_liga:
+            sets.append("j.LIGA = COALESCE(s.LIGA, j.LIGA)")
+        cursor.execute(f"UPDATE jogos j JOIN {RESULTS_STAGE_TABLE} s ON {join} SET {', '.join(sets)}")
+
+        cursor.execute(f"SELECT DISTINCT s.SEQ FROM {RESULTS_STAGE_TABLE} s JOIN jogos j ON {join}")
+        return {int(r[0]) for r in cursor.fetchall()}
     finally:
-        conn.close()
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {RESULTS_STAGE_TABLE}")
 
 
 def upsert_results_from_csv(
@@ -446,11 +662,22 @@ def upsert_results_from_csv(
     fallback_like: bool = True,
     remove_prefixes: bool = True,
     remove_suffixes: bool = True,
-    remove_categories: bool = True
+    remove_categories: bool = True,
+    matcher: str = "memory",
+    use_aliases: bool = True,
+    aliases: AliasStore | None = None,
+    set_based: bool = True,
+    applied_ids: set | None = None
 ) -> int:
     """Atualiza resultados (gols) do CSV na tabela `jogos` usando UPDATE.
-    Fluxo: tenta UPDATE exato; se rows=0 e fallback_like=True, tenta localizar match único via LIKE e atualiza por ID.
-    A normalização pode remover prefixos (FC/Club), sufixos (W/Women) e categorias (U17/U19/U23) para aumentar match."""
+    Fluxo: traduz os nomes pelo dicionário de aliases (src.team_aliases) e tenta UPDATE exato; se rows=0 e fallback_like=True, localiza o jogo e atualiza por ID.
+    matcher='memory' (padrão) carrega os jogos das datas do CSV uma única vez e casa os nomes em memória
+    (tokens + índice invertido, com score e relatório de ambiguidades); matcher='like' mantém as consultas LIKE.
+    A normalização pode remover prefixos (FC/Club), sufixos (W/Women) e categorias (U17/U19/U23) para aumentar match.
+    Match do fallback com score >= ALIAS_LEARN_MIN_SCORE vira alias; os demais (e os do LIKE) ficam pendentes.
+    set_based=True carrega o CSV numa tabela temporária e aplica os matches exatos com um único
+    UPDATE ... JOIN; só as sobras passam, linha a linha, pelo fallback.
+    Se o CSV tiver Fixture_ID e `applied_ids` for dado, ele recebe (só após o commit) os ids que casaram."""
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"CSV não encontrado: {csv_path}")
 
@@ -469,7 +696,7 @@ def upsert_results_from_csv(
     status_col = df.get('STATUS')
     if status_col is not None:
         df['STATUS'] = status_col.astype(str).str.upper()
-        df = df[df['STATUS'].isin(['FT', 'FINAL', 'FULL', 'AET', 'AP'])]
+        df = df[df['STATUS'].isin(['FT', 'FINAL', 'FULL', 'AET', 'AP', 'PEN'])]
 
     # Converter tipos
     df['DATA_JOGO'] = pd.to_datetime(df['DATA_JOGO'], errors='coerce').dt.date
@@ -482,65 +709,25 @@ def upsert_results_from_csv(
     if df.empty:
         return 0
 
-    # Descobrir se a coluna LIGA existe no schema do banco
-    has_liga = False
+    # Descobrir se a coluna LIGA existe no schema do banco (registro em cache)
     try:
-        tmp_cur = conn.cursor()
-        tmp_cur.execute("SHOW COLUMNS FROM jogos")
-        schema_cols = {row[0] for row in tmp_cur.fetchall()}
-        has_liga = ('LIGA' in schema_cols)
+        has_liga = 'LIGA' in get_table_columns(conn, "jogos")
     except Exception:
         has_liga = False
-    finally:
-        try:
-            tmp_cur.close()
-        except Exception:
-            pass
-
-    # Helpers de normalização e padrões LIKE (replicando lógica de tokens)
-    def _normalize_keep_diacritics(name: str) -> str:
-        s = str(name).lower().strip()
-        # mantém diacríticos, espaços e separadores comuns, remove símbolos estranhos
-        s = re.sub(r'[^0-9a-zA-ZÀ-ÿ\s/.\-]', ' ', s)
-        s = re.sub(r'\s+', ' ', s).strip()
-        return s
-
-    def _tokenize_filtered(name: str) -> tuple[list[str], str]:
-        base = _normalize_keep_diacritics(name)
-        tokens = [t for t in re.split(r'[\s/.\-]+', base) if t]
-        to_remove = set()
-        if remove_prefixes:
-            to_remove |= STOPWORDS_PREFIXES
-        if remove_suffixes:
-            to_remove |= STOPWORDS_SUFFIXES
-        if remove_categories:
-            to_remove |= CATEGORY_TOKENS
-        filtered = [t for t in tokens if t not in to_remove]
-        return filtered, base
-
-    def _build_like_patterns(name: str) -> list[str]:
-        filtered_tokens, base = _tokenize_filtered(name)
-
-        patterns = []
-        # Padrão com a string completa (como veio)
-        if base:
-            patterns.append(f"%{base}%")
-        # Padrão com tokens filtrados (sem prefixos/sufixos/categorias)
-        if filtered_tokens:
-            name_filtered = ' '.join(filtered_tokens)
-            patterns.append(f"%{name_filtered}%")
-        # Padrão com coringa entre tokens filtrados
-        if len(filtered_tokens) > 1:
-            patterns.append('%' + '%'.join(filtered_tokens) + '%')
-
-        # Deduplicar mantendo ordem
-        return list(dict.fromkeys(patterns))
-
-    def _find_unique_match_id(cur, dt, casa, fora, logf=None) -> int | None:
-        patterns_casa = _build_like_patterns(casa)
-        patterns_fora = _build_like_patterns(fora)
-
-        def _run_like(p_tc: str, p_tf: str, reversed_order: bool = False) -> int | None:
+
+    to_remove = stopwords(remove_prefixes, remove_suffixes, remove_categories)
+    match_opts = dict(remove_prefixes=remove_prefixes, remove_suffixes=remove_suffixes,
+                      remove_categories=remove_categories)
+    index: TeamMatchIndex | None = None  # construído só no primeiro UPDATE exato sem match
+    if aliases is None and use_aliases:
+        aliases = get_alias_store()
+    learned = pending = 0
+
+    def _find_unique_match(cur, dt, casa, fora, logf=None) -> tuple | None:
+        patterns_casa = build_like_patterns(casa, to_remove)
+        patterns_fora = build_like_patterns(fora, to_remove)
+
+        def _run_like(p_tc: str, p_tf: str, reversed_order: bool = False) -> tuple | None:
             sql_sel = (
                 "SELECT ID, TIME_CASA, TIME_FORA "
                 "FROM jogos "
@@ -553,21 +740,21 @@ def upsert_results_from_csv(
                 ordem = "" if not reversed_order else " (reversed)"
                 logf.write(f"-- Fallback LIKE{ordem}: DATA_JOGO='{dt}', TC LIKE '{p_tc}', TF LIKE '{p_tf}'; matches={matches}\n")
             if matches == 1:
-                return rows[0][0]  # ID
+                return (*rows[0], reversed_order)  # (ID, TIME_CASA, TIME_FORA, reversed)
             return None
 
         # Ordem normal
         for p_tc in patterns_casa:
             for p_tf in patterns_fora:
-                id_ = _run_like(p_tc, p_tf, reversed_order=False)
-                if id_ is not None:
-                    return id_
+                found = _run_like(p_tc, p_tf, reversed_order=False)
+                if found is not None:
+                    return found
         # Ordem invertida (casos em que CSV troca mandante/visitante)
         for p_tc in patterns_fora:
             for p_tf in patterns_casa:
-                id_ = _run_like(p_tc, p_tf, reversed_order=True)
-                if id_ is not None:
-                    return id_
+                found = _run_like(p_tc, p_tf, reversed_order=True)
+                if found is not None:
+                    return found
         return None
 
     # Inicializa log (opcional)
@@ -579,67 +766,146 @@ def upsert_results_from_csv(
                 os.makedirs(dir_, exist_ok=True)
             log_f = open(log_file_path, "a", encoding="utf-8")
             log_f.write(f"-- Início UPDATE resultados: {datetime.now().isoformat()}\n")
-            log_f.write(f"-- CSV: {csv_path}; fallback_like={fallback_like}; remove_prefixes={remove_prefixes}; remove_suffixes={remove_suffixes}; remove_categories={remove_categories}\n")
+            log_f.write(f"-- CSV: {csv_path}; fallback_like={fallback_like}; matcher={matcher}; remove_prefixes={remove_prefixes}; remove_suffixes={remove_suffixes}; remove_categories={remove_categories}\n")
         except Exception:
             log_f = None  # fallback silencioso
 
+    # Nomes já confirmados em ciclos anteriores (lookup O(1) no dicionário de aliases)
+    df = df.reset_index(drop=True)
+    df['TIME_CASA'] = df['TIME_CASA'].astype(str).str.strip()
+    df['TIME_FORA'] = df['TIME_FORA'].astype(str).str.strip()
+    if aliases is not None:
+        df['TC_DB'] = [aliases.get(n) or n for n in df['TIME_CASA']]
+        df['TF_DB'] = [aliases.get(n) or n for n in df['TIME_FORA']]
+    else:
+        df['TC_DB'] = df['TIME_CASA']
+        df['TF_DB'] = df['TIME_FORA']
+
     cursor = conn.cursor()
     processed = 0
+    casados_seq: list[int] = []  # SEQ (índice do df) das linhas que casaram com um jogo
     try:
-        for _, row in df.iterrows():
+        pendentes = df
+        if set_based:
+            stage = pd.DataFrame({
+                'SEQ': df.index, 'DATA_JOGO': df['DATA_JOGO'],
+                'TIME_CASA': df['TC_DB'], 'TIME_FORA': df['TF_DB'],
+                'GOLS_CASA': df['GOLS_CASA'].astype(int), 'GOLS_FORA': df['GOLS_FORA'].astype(int),
+            })
+            if has_liga:
+                stage['LIGA'] = df['LIGA'].astype(str).str.strip().where(df['LIGA'].notna()) if 'LIGA' in df.columns else None
+            casados = _stage_exact_results(cursor, stage, has_liga)
+            pendentes = df[~df.index.isin(casados)]
+            casados_seq.extend(casados)
+            processed += len(casados)
+            if log_f:
+                log_f.write(f"-- UPDATE jogos JOIN {RESULTS_STAGE_TABLE}: staged={len(stage)}; exatos={len(casados)}; sobras={len(pendentes)}\n")
+
+        for seq, row in pendentes.iterrows():
             dt = row['DATA_JOGO']
-            tc = str(row['TIME_CASA']).strip()
-            tf = str(row['TIME_FORA']).strip()
+            tc = row['TIME_CASA']
+            tf = row['TIME_FORA']
+            tc_db = row['TC_DB']
+            tf_db = row['TF_DB']
             gc = int(row['GOLS_CASA'])
             gf = int(row['GOLS_FORA'])
             liga_val = None
             if 'LIGA' in df.columns and pd.notna(row.get('LIGA')):
                 liga_val = str(row['LIGA']).strip()
 
-            # 1) Tenta UPDATE exato (inclui LIGA se existir no schema e vier no CSV)
+            # 1) Tenta UPDATE exato (inclui LIGA se existir no schema e vier no CSV);
+            #    no modo set_based ele já foi feito pelo UPDATE ... JOIN
             update_fields = ["GOLS_CASA = %s", "GOLS_FORA = %s"]
             params = [gc, gf]
             if has_liga and liga_val is not None:
                 update_fields.append("LIGA = %s")
                 params.append(liga_val)
 
-            sql_exact = f"UPDATE jogos SET {', '.join(update_fields)} WHERE DATA_JOGO = %s AND TIME_CASA = %s AND TIME_FORA = %s"
-            cursor.execute(sql_exact, tuple(params + [dt, tc, tf]))
-            rows_affected = cursor.rowcount
-            if log_f:
+            rows_affected = 0
+            if not set_based:
+                sql_exact = cached_sql(
+                    ('results_exact', tuple(update_fields)),
+                    lambda: f"UPDATE jogos SET {', '.join(update_fields)} WHERE DATA_JOGO = %s AND TIME_CASA = %s AND TIME_FORA = %s",
+                )
+                cursor.execute(sql_exact, tuple(params + [dt, tc_db, tf_db]))
+                rows_affected = cursor.rowcount
+                if rows_affected > 0:
+                    casados_seq.append(seq)
+            if log_f and not set_based:
                 base_log = f"UPDATE jogos SET GOLS_CASA = {gc}, GOLS_FORA = {gf}"
                 if has_liga and liga_val is not None:
                     base_log += f", LIGA = '{liga_val}'"
                 log_f.write(
-                    f"{base_log} WHERE DATA_JOGO = '{dt}' AND TIME_CASA = '{tc}' AND TIME_FORA = '{tf}'; -- rows={rows_affected}\n"
+                    f"{base_log} WHERE DATA_JOGO = '{dt}' AND TIME_CASA = '{tc_db}' AND TIME_FORA = '{tf_db}'; -- rows={rows_affected}\n"
                 )
 
-            # 2) Fallback via LIKE procurando match único e atualizando por ID
+            # 2) Fallback: localiza match único (em memória ou via LIKE) e atualiza por ID
             if rows_affected == 0 and fallback_like:
-                match_id = _find_unique_match_id(cursor, dt, tc, tf, logf=log_f)
-                if match_id is not None:
-                    sql_by_id = f"UPDATE jogos SET {', '.join(update_fields)} WHERE ID = %s"
+                found, score = None, None  # o LIKE não tem score: aliases dele ficam pendentes
+                if matcher == "like":
+                    found = _find_unique_match(cursor, dt, tc, tf, logf=log_f)
+                else:
+                    if index is None:
+                        index = TeamMatchIndex.from_db(conn, df['DATA_JOGO'].unique(), **match_opts)
+                    res = index.match(dt, tc, tf)
+                    if res.status == 'ok':
+                        _, _, rev, db_casa, db_fora = res.candidates[0]
+                        found, score = (res.match_id, db_casa, db_fora, rev), res.score
+                    if log_f:
+                        ordem = " (reversed)" if res.reversed else ""
+                        log_f.write(f"-- Match em memória{ordem}: '{tc}' vs '{tf}' em {dt}; status={res.status}; score={res.score}\n")
+                        if res.status == 'ambiguous':
+                            for cid, cscore, _, ccasa, cfora in res.candidates:
+                                log_f.write(f"--   candidato ID={cid} score={cscore}: '{ccasa}' vs '{cfora}'\n")
+                if found is not None:
+                    match_id, db_casa, db_fora, rev = found
+                    sql_by_id = cached_sql(
+                        ('results_by_id', tuple(update_fields)),
+                        lambda: f"UPDATE jogos SET {', '.join(update_fields)} WHERE ID = %s",
+                    )
                     cursor.execute(sql_by_id, tuple(params + [match_id]))
                     rows_affected = cursor.rowcount
+                    casados_seq.append(seq)
                     if log_f:
                         base_log = f"UPDATE jogos SET GOLS_CASA = {gc}, GOLS_FORA = {gf}"
                         if has_liga and liga_val is not None:
                             base_log += f", LIGA = '{liga_val}'"
                         log_f.write(f"{base_log} WHERE ID = {match_id}; -- rows={rows_affected}\n")
+                    # Confirma o mapeamento para os próximos ciclos caírem no UPDATE exato; matches de
+                    # score baixo ficam pendentes até confirmação manual (python -m src.team_aliases confirm)
+                    if aliases is not None:
+                        api_casa, api_fora = (tf, tc) if rev else (tc, tf)
+                        if score is not None and score >= ALIAS_LEARN_MIN_SCORE:
+                            learned += aliases.learn(api_casa, db_casa)
+                            learned += aliases.learn(api_fora, db_fora)
+                        else:
+                            pending += aliases.suggest(api_casa, db_casa)
+                            pending += aliases.suggest(api_fora, db_fora)
                 else:
                     if log_f:
                         log_f.write(
-                            f"-- Nenhum match unívoco por LIKE para: '{tc}' vs '{tf}' na data {dt}\n"
+                            f"-- Nenhum match unívoco ({matcher}) para: '{tc}' vs '{tf}' na data {dt}\n"
                         )
 
             processed += 1
 
         conn.commit()
+        if applied_ids is not None and 'Fixture_ID' in df.columns:
+            applied_ids.update(int(f) for f in df.loc[casados_seq, 'Fixture_ID'].dropna())
+        if learned:
+            logger.info("%d alias(es) de time aprendido(s).", learned)
+        if pending:
+            logger.info("%d alias(es) pendente(s) de confirmação (python -m src.team_aliases list --pendentes).", pending)
+        if index is not None and index.ambiguities:
+            logger.warning("%d jogo(s) ambíguo(s) não atualizado(s); ver log para candidatos.", len(index.ambiguities))
         if log_f:
+            if index is not None:
+                log_f.write(f"-- Ambiguidades: {len(index.ambiguities)}\n")
             log_f.write(f"-- Fim UPDATE: processadas={processed}\n\n")
         return processed
     except Error as e:
         conn.rollback()
+        _on_db_error(e)
         if log_f:
             log_f.write(f"-- ERRO UPDATE: {str(e)}\n\n")
         raise RuntimeError(f"Erro ao atualizar resultados: {e}")
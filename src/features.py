@@ -0,0 +1,133 @@
+# src/features.py
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------
+# Schema das colunas de features (única fonte para raspagem, alertas, DB e UI)
+# -------------------------------------------------------------
+
+# Porcentagens vindas do soccerstats como texto ('70%'); pares (H, A) na ordem usada pelas médias
+PERCENT_PAIRS = [
+    ('Over15_H', 'Over15_A'),
+    ('Over25_H', 'Over25_A'),
+    ('BTTS_H', 'BTTS_A'),
+]
+PERCENT_COLUMNS = [col for par in PERCENT_PAIRS for col in par]
+
+# Numéricos que podem vir com vírgula decimal
+DECIMAL_COLUMNS = [
+    'Media_Gols_Casa', 'MediaGols_Fora', 'PPG_Casa', 'PPG_Fora',
+    'Gols_Marcados_Casa', 'Gols_Marcados_Fora', 'Gols_Sofridos_Casa', 'Gols_Sofridos_Fora',
+    'Vitorias_A', 'Vitorias_H',
+]
+
+# Colunas derivadas: nome -> par de origem (média simples do par)
+DERIVED_PAIR_MEANS = {
+    'Prob_Over1.5': ('Over15_H', 'Over15_A'),
+    'Prob_Over2.5': ('Over25_H', 'Over25_A'),
+    'Prob_BTTS': ('BTTS_H', 'BTTS_A'),
+}
+# Nomes antigos mantidos por compatibilidade (filtros, mensagens do Telegram)
+DERIVED_ALIASES = {
+    'Over15_MEDIA': 'Prob_Over1.5',
+    'Over25_MEDIA': 'Prob_Over2.5',
+    'Over_BOTH': 'Prob_BTTS',  # Ambas Marcam (BTTS)
+}
+
+FEATURE_DTYPE = np.float32
+DISPLAY_DECIMALS = 2  # float32 -> float64 arredondado antes de exibir/persistir (56.67, não 56.669998)
+FEATURE_SCHEMA = {
+    **{col: FEATURE_DTYPE for col in PERCENT_COLUMNS + DECIMAL_COLUMNS},
+    **{col: FEATURE_DTYPE for col in DERIVED_PAIR_MEANS},
+    **{col: FEATURE_DTYPE for col in DERIVED_ALIASES},
+    'MÉDIA_PROB': FEATURE_DTYPE,
+}
+
+
+def _colunas_percentuais(df: pd.DataFrame) -> list[str]:
+    """PERCENT_COLUMNS presentes + qualquer outra coluna Over*/BTTS* com H ou A no nome (ex.: Over35_H),
+    como na limpeza original; as colunas derivadas ficam de fora."""
+    derivadas = set(DERIVED_PAIR_MEANS) | set(DERIVED_ALIASES)
+    extras = [
+        c for c in df.columns
+        if isinstance(c, str) and c not in PERCENT_COLUMNS and c not in derivadas
+        and c.startswith(('Over', 'BTTS')) and ('H' in c or 'A' in c)
+    ]
+    return [c for c in PERCENT_COLUMNS if c in df.columns] + extras
+
+
+def _converter_bloco(df: pd.DataFrame, cols: list[str]) -> None:
+    """Converte, numa única passada vetorizada, todas as colunas de texto em `cols` para float32.
+    Remove '%' e troca vírgula por ponto. Colunas já numéricas só mudam de dtype."""
+    numericas = [c for c in cols if pd.api.types.is_numeric_dtype(df[c])]
+    texto = [c for c in cols if c not in numericas]
+
+    if numericas:
+        df[numericas] = df[numericas].astype(FEATURE_DTYPE)
+    if not texto:
+        return
+
+    valores = pd.Series(df[texto].to_numpy(dtype=object).ravel(order='F')).astype(str)
+    valores = valores.str.replace('%', '', regex=False).str.replace(',', '.', regex=False).str.strip()
+    convertido = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=FEATURE_DTYPE)
+    matriz = convertido.reshape((len(df), len(texto)), order='F')
+    for i, col in enumerate(texto):
+        df[col] = matriz[:, i]
+
+
+def limpar_e_converter_dados(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpa '%' das colunas de porcentagem, converte vírgula para ponto e padroniza para float32."""
+    perc_cols = _colunas_percentuais(df)
+    num_cols = perc_cols + [c for c in DECIMAL_COLUMNS if c in df.columns]
+    if num_cols:
+        _converter_bloco(df, num_cols)
+
+    if 'Partidas' in df.columns and not pd.api.types.is_numeric_dtype(df['Partidas']):
+        df['Partidas'] = pd.to_numeric(df['Partidas'], errors='coerce')
+
+    # Remove linhas com NaN nas colunas de porcentagem após conversão
+    if perc_cols:
+        df.dropna(subset=perc_cols, inplace=True)
+    return df
+
+
+def calcular_probabilidades(df: pd.DataFrame) -> pd.DataFrame:
+    """Adiciona Prob_Over1.5, Prob_Over2.5, Prob_BTTS (e aliases antigos) e MÉDIA_PROB, de uma vez."""
+    presentes = [c for c in PERCENT_COLUMNS if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+    if not presentes:
+        df['MÉDIA_PROB'] = 0
+        return df
+
+    matriz = df[presentes].to_numpy(dtype=FEATURE_DTYPE)
+    pos = {col: i for i, col in enumerate(presentes)}
+
+    # 1. Médias simples de cada par (H, A)
+    for destino, (h, a) in DERIVED_PAIR_MEANS.items():
+        if h in pos and a in pos:
+            df[destino] = np.round((matriz[:, pos[h]] + matriz[:, pos[a]]) / 2, 2)
+    for alias, origem in DERIVED_ALIASES.items():
+        if origem in df.columns:
+            df[alias] = df[origem]
+
+    # 2. MÉDIA_PROB: média das seis porcentagens
+    if len(presentes) == len(PERCENT_COLUMNS):
+        df['MÉDIA_PROB'] = np.round(matriz.mean(axis=1, dtype=FEATURE_DTYPE), 2)
+    else:
+        df['MÉDIA_PROB'] = 0
+
+    return df
+
+
+def arredondar_features(df: pd.DataFrame, casas: int = DISPLAY_DECIMALS) -> pd.DataFrame:
+    """Converte as colunas float32 de features para float64 arredondado (no próprio df).
+    Chamar antes de formatar mensagens ou gravar no banco."""
+    cols = [c for c in df.columns if isinstance(c, str) and (c in FEATURE_SCHEMA or c.startswith(('Over', 'BTTS')))
+            and df[c].dtype == FEATURE_DTYPE]
+    if cols:
+        df[cols] = df[cols].astype(np.float64).round(casas)
+    return df
+
+
+def processar_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Limpeza + probabilidades (o que todos os consumidores precisam)."""
+    return calcular_probabilidades(limpar_e_converter_dados(df))
@@ -0,0 +1,89 @@
+# src/fixture_store.py
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Cache colunar dos jogos do dia (substitui data/Jogos_de_Hoje.xlsx)
+FIXTURES_PATH = os.getenv("FIXTURES_PATH", "data/Jogos_de_Hoje.parquet")
+LEGACY_EXCEL_PATH = "data/Jogos_de_Hoje.xlsx"
+
+# Incrementar quando o layout/tipos das colunas mudarem: caches antigos passam a ser ignorados
+SCHEMA_VERSION = 1
+_META_KEY = b"robobet.schema_version"
+
+
+def _normalize_for_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas object com tipos misturados (ex.: str + int) viram texto; o resto mantém o dtype."""
+    out = df
+    for col in df.columns:
+        if df[col].dtype == object:
+            inferido = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferido.startswith("mixed"):
+                if out is df:
+                    out = df.copy()
+                out[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return out
+
+
+def save_fixtures(df: pd.DataFrame, path: str = FIXTURES_PATH) -> None:
+    """Grava o DataFrame em Parquet de forma atômica (arquivo temporário + rename)."""
+    dir_ = os.path.dirname(path) or "."
+    os.makedirs(dir_, exist_ok=True)
+
+    table = pa.Table.from_pandas(_normalize_for_arrow(df), preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[_META_KEY] = str(SCHEMA_VERSION).encode()
+    table = table.replace_schema_metadata(meta)
+
+    fd, tmp = tempfile.mkstemp(dir=dir_, suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> pd.DataFrame:
+    """Lê o cache (memory-mapped) com os dtypes preservados.
+    Retorna DataFrame vazio se não houver cache ou se ele for de outra versão de schema.
+    Se só existir o Excel antigo, ele é lido uma vez e migrado para Parquet."""
+    if os.path.exists(path):
+        table = pq.read_table(path, memory_map=True)
+        versao = (table.schema.metadata or {}).get(_META_KEY, b"0").decode()
+        if versao != str(SCHEMA_VERSION):
+            print(f"[fixture_store] Cache '{path}' com schema v{versao} (esperado v{SCHEMA_VERSION}); ignorado.")
+            return pd.DataFrame()
+        return table.to_pandas()
+
+    if path == FIXTURES_PATH and os.path.exists(LEGACY_EXCEL_PATH):
+        df = pd.read_excel(LEGACY_EXCEL_PATH)
+        if not df.empty:
+            save_fixtures(df, path)
+        return df
+
+    return pd.DataFrame()
+
+
+def fixtures_mtime(path: str = FIXTURES_PATH) -> float | None:
+    """mtime do cache (ou do Excel antigo, enquanto não houver migração). None se não existir."""
+    if os.path.exists(path):
+        return os.path.getmtime(path)
+    if path == FIXTURES_PATH and os.path.exists(LEGACY_EXCEL_PATH):
+        return os.path.getmtime(LEGACY_EXCEL_PATH)
+    return None
+
+
+def remove_fixtures(path: str = FIXTURES_PATH) -> list[str]:
+    """Apaga o cache (e o Excel antigo). Retorna os caminhos removidos."""
+    removidos = []
+    for p in (path, LEGACY_EXCEL_PATH):
+        if os.path.exists(p):
+            os.remove(p)
+            removidos.append(p)
+    return removidos
@@ -0,0 +1,95 @@
+# src/frame_memo.py
+import os
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytz
+
+from src.features import processar_features
+from src.fixture_store import FIXTURES_PATH, load_fixtures, save_fixtures
+
+# Memo do DataFrame já processado, por arquivo de origem, função de processamento e impressão digital.
+#   em memória: {(caminho, processo, fingerprint): DataFrame}
+#   em disco:   data/processed/<YYYY-MM-DD>/<sha1(caminho, processo, fingerprint)>.parquet
+MEMO_DIR = os.getenv("PROCESSED_MEMO_DIR", "data/processed")
+MEMO_KEEP_DAYS = int(os.getenv("PROCESSED_MEMO_KEEP_DAYS", "3"))
+TIMEZONE = 'America/Sao_Paulo'
+
+_memo: dict[tuple[str, str, str], pd.DataFrame] = {}
+_lock = threading.Lock()
+
+
+def source_fingerprint(path: str, by_content: bool = False) -> str | None:
+    """mtime+tamanho (barato) ou sha1 do conteúdo. None se o arquivo não existir."""
+    if not os.path.exists(path):
+        return None
+    if by_content:
+        h = hashlib.sha1()
+        with open(path, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        return h.hexdigest()
+    st = os.stat(path)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def _process_id(process) -> str:
+    """Identidade estável da função de processamento (igual entre processos)."""
+    return f"{getattr(process, '__module__', '')}.{getattr(process, '__qualname__', repr(process))}"
+
+
+def _today_str() -> str:
+    return datetime.now(pytz.timezone(TIMEZONE)).strftime("%Y-%m-%d")
+
+
+def evict_old_days(keep_days: int = MEMO_KEEP_DAYS) -> None:
+    """Remove do disco os memos de dias mais antigos que `keep_days`."""
+    if not os.path.isdir(MEMO_DIR):
+        return
+    limite = (datetime.now(pytz.timezone(TIMEZONE)) - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    for nome in os.listdir(MEMO_DIR):
+        caminho = os.path.join(MEMO_DIR, nome)
+        if os.path.isdir(caminho) and nome < limite:
+            shutil.rmtree(caminho, ignore_errors=True)
+
+
+def load_processed(path: str = FIXTURES_PATH, process=processar_features,
+                   by_content: bool = False) -> pd.DataFrame:
+    """Carrega `path` já processado. Só relê e reprocessa quando o arquivo muda;
+    caso contrário devolve a cópia em memória (ou o memo em disco, entre processos)."""
+    fp = source_fingerprint(path, by_content=by_content)
+    if fp is None:
+        # Sem arquivo: load_fixtures ainda pode migrar o Excel antigo
+        df = load_fixtures(path)
+        return process(df) if not df.empty else df
+
+    chave = (os.path.abspath(path), _process_id(process), fp)
+    with _lock:
+        if chave in _memo:
+            return _memo[chave].copy()
+
+    nome = hashlib.sha1("\0".join(chave).encode("utf-8")).hexdigest()
+    disco = os.path.join(MEMO_DIR, _today_str(), f"{nome}.parquet")
+    df = load_fixtures(disco) if os.path.exists(disco) else pd.DataFrame()
+    if df.empty:
+        df = load_fixtures(path)
+        if df.empty:
+            return df
+        df = process(df)
+        save_fixtures(df, disco)
+        evict_old_days()
+
+    with _lock:
+        # Só a versão mais recente de cada (arquivo, processo) fica em memória
+        for antiga in [k for k in _memo if k[:2] == chave[:2]]:
+            del _memo[antiga]
+        _memo[chave] = df
+    return df.copy()
+
+
+def clear_memo() -> None:
+    with _lock:
+        _memo.clear()
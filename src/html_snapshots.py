@@ -0,0 +1,149 @@
+# src/html_snapshots.py
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytz
+
+# Estrutura em disco:
+#   data/snapshots/objects/<sha256>.html      -> corpo bruto (endereçado por conteúdo)
+#   data/snapshots/<YYYY-MM-DD>/index.json    -> {url: {sha256, etag, last_modified, fetched_at}}
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "data/snapshots")
+TIMEZONE = 'America/Sao_Paulo'
+
+# O índice do dia é lido-alterado-regravado por várias threads (fetch_pages, get_games_for_range)
+# e, às vezes, por mais de um processo: lock de thread + lock de arquivo ao lado do index.json
+_index_lock = threading.Lock()
+
+try:
+    import fcntl
+
+    def _lock_file(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def today_str() -> str:
+    return datetime.now(pytz.timezone(TIMEZONE)).strftime("%Y-%m-%d")
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: str, data: str) -> None:
+    dir_ = os.path.dirname(path)
+    os.makedirs(dir_, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dir_, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _index_path(day: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, day, "index.json")
+
+
+def _object_path(sha: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, "objects", f"{sha}.html")
+
+
+@contextmanager
+def _locked_index(day: str):
+    """Exclusão mútua do índice do dia entre threads e processos."""
+    path = _index_path(day) + ".lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _index_lock, open(path, "a+") as f:
+        _lock_file(f)
+        try:
+            yield
+        finally:
+            _unlock_file(f)
+
+
+def load_index(day: str) -> dict:
+    path = _index_path(day)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    return {}
+
+
+def get_entry(url: str, day: str | None = None) -> dict | None:
+    """Retorna os metadados do último snapshot da URL no dia (ou None)."""
+    return load_index(day or today_str()).get(url)
+
+
+def read_body(sha: str) -> str | None:
+    path = _object_path(sha)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def conditional_headers(entry: dict | None) -> dict:
+    """Cabeçalhos If-None-Match / If-Modified-Since a partir do snapshot anterior."""
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def save_snapshot(url: str, body: str, etag: str | None = None,
+                  last_modified: str | None = None, day: str | None = None) -> tuple[str, bool]:
+    """Grava o corpo (se ainda não existir) e atualiza o índice do dia.
+    Retorna (sha256, mudou) — `mudou` é False quando o corpo é idêntico ao snapshot anterior."""
+    day = day or today_str()
+    sha = body_hash(body)
+    if not os.path.exists(_object_path(sha)):
+        _atomic_write(_object_path(sha), body)
+
+    with _locked_index(day):
+        index = load_index(day)
+        anterior = index.get(url, {}).get("sha256")
+        index[url] = {
+            "sha256": sha,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().isoformat(),
+        }
+        _atomic_write(_index_path(day), json.dumps(index, indent=2))
+    return sha, sha != anterior
+
+
+def replay(url: str, day: str) -> str:
+    """Devolve o HTML gravado para a URL no dia informado (modo offline)."""
+    entry = get_entry(url, day)
+    body = read_body(entry["sha256"]) if entry else None
+    if body is None:
+        raise FileNotFoundError(f"Snapshot não encontrado para {url} em {day}")
+    return body
@@ -0,0 +1,103 @@
+# src/html_tables.py
+from io import BytesIO
+
+import pandas as pd
+from lxml import etree
+
+# Assinaturas de cabeçalho das tabelas de jogos do soccerstats (matches.asp)
+MATCHES_LISTING1_SIGNATURE = {'Country', '2.5+', '1.5+', 'GA', 'GF', 'TG', 'PPG', 'scope'}
+MATCHES_LISTING2_SIGNATURE = {'Country', 'BTS', 'W%', 'GP', 'scope'}
+
+
+def _cell_text(cell) -> str:
+    return " ".join("".join(cell.itertext()).split())
+
+
+def _expand(cells) -> list[tuple[str, bool]]:
+    """Expande colspan (como o pd.read_html) e marca se a célula é <th>."""
+    out = []
+    for cell in cells:
+        try:
+            span = max(1, int(cell.get("colspan", 1)))
+        except ValueError:
+            span = 1
+        out.extend([(_cell_text(cell), cell.tag == "th")] * span)
+    return out
+
+
+def _column_names(header: list[str]) -> list[str]:
+    """Mesma convenção do pandas: vazio -> 'Unnamed: i'; repetidos -> 'nome.1', 'nome.2'..."""
+    names = []
+    seen: dict[str, int] = {}
+    for i, name in enumerate(header):
+        if not name:
+            name = f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _rows(table) -> list:
+    return table.xpath("./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr")
+
+
+def _table_to_frame(table, header_idx: int, header: list[str]) -> pd.DataFrame:
+    columns = _column_names(header)
+    width = len(columns)
+    data = []
+    for row in _rows(table)[header_idx + 1:]:
+        cells = _expand(row.xpath("./th | ./td"))
+        # Linhas com outra largura (rodapés, banners) e cabeçalhos repetidos ficam de fora
+        if len(cells) != width or all(is_th for _, is_th in cells):
+            continue
+        data.append([text if text != "" else None for text, _ in cells])
+
+    df = pd.DataFrame(data, columns=columns)
+
+    # Tipagem direta: colunas totalmente numéricas viram números; o resto fica texto
+    for col in df.columns:
+        serie = df[col]
+        preenchidos = serie.notna().sum()
+        if preenchidos == 0:
+            continue
+        numerico = pd.to_numeric(serie, errors="coerce")
+        if numerico.notna().sum() == preenchidos:
+            df[col] = numerico
+    return df
+
+
+def _match_header(table, signature: set[str]) -> tuple[int, list[str]] | None:
+    for idx, row in enumerate(_rows(table)[:3]):
+        cells = _expand(row.xpath("./th | ./td"))
+        textos = [text for text, _ in cells]
+        if signature.issubset(textos):
+            return idx, textos
+    return None
+
+
+def extract_table(html: str | bytes, signature: set[str]) -> pd.DataFrame | None:
+    """Percorre o HTML em streaming e monta apenas a primeira tabela cujo cabeçalho contém `signature`.
+    Tabelas descartadas são liberadas da memória durante o parse. Retorna None se não encontrar."""
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    for _, table in etree.iterparse(BytesIO(html), events=("end",), tag="table", html=True, encoding="utf-8"):
+        found = _match_header(table, signature)
+        if found is not None:
+            return _table_to_frame(table, *found)
+        # Só limpa tabelas de nível superior: as aninhadas ainda fazem parte da tabela mãe
+        if not any(anc.tag == "table" for anc in table.iterancestors()):
+            table.clear()
+    return None
+
+
+def find_table_by_columns(tables: list[pd.DataFrame], signature: set[str]) -> pd.DataFrame | None:
+    """Para a saída do pd.read_html: localiza a tabela pela assinatura, e não por índice fixo."""
+    for df in tables:
+        if signature.issubset({str(c) for c in df.columns}):
+            return df
+    return None
@@ -0,0 +1,97 @@
+# src/kickoff_scheduler.py
+import heapq
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+from src.fixture_store import FIXTURES_PATH
+from src.frame_memo import load_processed, source_fingerprint
+from src.kickoff_time import TIMEZONE, kickoff_epoch
+
+# Agenda de alertas por horário de início: um min-heap de (instante de disparo, linha), com
+# disparo = kickoff - antecedência. O processo dorme até o próximo disparo (ou até a próxima
+# checagem barata do cache) e só reconstrói o heap quando o arquivo de jogos muda.
+CACHE_CHECK_SECONDS = 60
+
+
+class KickoffHeap:
+    """Heap de disparos de um DataFrame de jogos, para uma antecedência fixa."""
+
+    def __init__(self, lead_minutes: float, offset_hours: float | None = None):
+        self.lead = lead_minutes * 60
+        self.offset_hours = offset_hours
+        self.df = pd.DataFrame()
+        self._heap: list[tuple[float, int, float]] = []  # (disparo, posição, kickoff)
+
+    def rebuild(self, df: pd.DataFrame, now: datetime) -> None:
+        self.df = df.reset_index(drop=True)
+        kick = kickoff_epoch(self.df, now, self.offset_hours)
+        agora = now.timestamp()
+        self._heap = [
+            (k - self.lead, pos, k)
+            for pos, k in enumerate(kick.tolist())
+            if k == k and k >= agora  # ignora NaN e jogos já iniciados
+        ]
+        heapq.heapify(self._heap)
+
+    def next_fire(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> pd.DataFrame:
+        """Remove e devolve as linhas vencidas (disparo <= agora e jogo ainda não iniciado),
+        com 'Horário' já corrigido pelo offset."""
+        agora = now.timestamp()
+        due = []
+        while self._heap and self._heap[0][0] <= agora:
+            _, pos, kick = heapq.heappop(self._heap)
+            if kick >= agora:
+                due.append((pos, kick))
+        if not due:
+            return pd.DataFrame()
+        out = self.df.iloc[[pos for pos, _ in due]].copy()
+        out['Horário'] = [datetime.fromtimestamp(k, now.tzinfo).strftime('%H:%M') for _, k in due]
+        return out
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+def run_kickoff_scheduler(lead_minutes: float, on_due, select=None, offset_hours: float | None = None,
+                          path: str = FIXTURES_PATH, cache_check_seconds: float = CACHE_CHECK_SECONDS,
+                          stop_event: threading.Event | None = None, log=print) -> None:
+    """Loop orientado a eventos: `on_due(df)` recebe os jogos cuja janela de `lead_minutes` abriu.
+    `select(df)` filtra o DataFrame processado uma vez por atualização do cache.
+    `offset_hours=None` usa o HORARIO_OFFSET_HORAS da configuração."""
+    tz = pytz.timezone(TIMEZONE)
+    stop_event = stop_event or threading.Event()
+    heap = KickoffHeap(lead_minutes, offset_hours)
+    fingerprint = object()  # força a primeira construção
+
+    while not stop_event.is_set():
+        agora = datetime.now(tz)
+
+        fp = source_fingerprint(path)
+        if fp != fingerprint:
+            fingerprint = fp
+            df = load_processed(path)
+            if select is not None and not df.empty:
+                df = select(df)
+            heap.rebuild(df, agora)
+            proximo = heap.next_fire()
+            quando = datetime.fromtimestamp(proximo, tz).strftime('%H:%M:%S') if proximo else "-"
+            log(f"[scheduler] Cache atualizado: {len(heap)} alerta(s) agendado(s) (lead {lead_minutes} min); próximo: {quando}")
+
+        due = heap.pop_due(agora)
+        if not due.empty:
+            try:
+                on_due(due)
+            except Exception as e:
+                log(f"[scheduler] Erro ao disparar {len(due)} alerta(s): {e}")
+
+        # Dorme até o próximo disparo, acordando antes para checar o cache
+        proximo = heap.next_fire()
+        espera = cache_check_seconds if proximo is None else min(cache_check_seconds, proximo - time.time())
+        stop_event.wait(max(0.0, espera))
@@ -0,0 +1,73 @@
+# src/kickoff_time.py
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytz
+
+# Conversão vetorizada da coluna 'Horário' (uma passada sobre a coluna inteira, sem strptime por linha).
+# O SoccerStats publica o horário +3h em relação a São Paulo; o ajuste vem do ambiente.
+TIMEZONE = 'America/Sao_Paulo'
+HORARIO_OFFSET_HORAS = float(os.getenv("HORARIO_OFFSET_HORAS", "-3"))
+
+# 'HH:MM', 'HH:MM:SS', 'hh:mm AM/PM' (também 'a.m.'/'p.m.'), opcionalmente precedidos de uma data
+_HORARIO_RE = r'^\s*(?:\d{4}-\d{2}-\d{2}[ T])?(\d{1,2}):(\d{2})(?::\d{2})?\s*([AaPp])?\.?(?:[Mm]\.?)?'
+_DIA = pd.Timedelta(days=1)
+
+
+def _offset(offset_hours: float | None) -> pd.Timedelta:
+    return pd.Timedelta(hours=HORARIO_OFFSET_HORAS if offset_hours is None else offset_hours)
+
+
+def parse_horario(horarios: pd.Series) -> pd.Series:
+    """Hora do dia (Timedelta desde 00:00, sem offset) em formato 24h ou 12h; NaT se não der parse."""
+    partes = horarios.astype(str).str.extract(_HORARIO_RE)
+    hora = pd.to_numeric(partes[0], errors='coerce')
+    minuto = pd.to_numeric(partes[1], errors='coerce')
+    ampm = partes[2].str.upper()
+
+    doze_h = ampm.notna()
+    valido = (minuto < 60) & ((doze_h & hora.between(1, 12)) | (~doze_h & (hora < 24)))
+    hora = hora.where(~doze_h, hora % 12 + (ampm == 'P') * 12)
+
+    delta = pd.to_timedelta(hora * 60 + minuto, unit='min')
+    return delta.where(valido)
+
+
+def minutes_of_day(horarios: pd.Series, offset_hours: float | None = None) -> pd.Series:
+    """Minuto do dia (0-1439) já corrigido pelo offset; NaN se não der parse. Útil para ordenar."""
+    delta = (parse_horario(horarios) + _offset(offset_hours)) % _DIA
+    return delta.dt.total_seconds() // 60
+
+
+def format_horario(horarios: pd.Series, offset_hours: float | None = None) -> pd.Series:
+    """'HH:MM' (24h) corrigido pelo offset; valores sem parse são mantidos como texto original."""
+    minutos = minutes_of_day(horarios, offset_hours)
+    texto = (minutos // 60).astype('Int64').astype(str).str.zfill(2) + ':' + \
+            (minutos % 60).astype('Int64').astype(str).str.zfill(2)
+    return texto.where(minutos.notna(), horarios.fillna('').astype(str).str.strip())
+
+
+def kickoff_series(df: pd.DataFrame, now: datetime | None = None, offset_hours: float | None = None,
+                   tz: str = TIMEZONE) -> pd.Series:
+    """Kickoff tz-aware de cada jogo (data de `now` + 'Horário' + offset); NaT se não der parse."""
+    zona = pytz.timezone(tz)
+    now = now or datetime.now(zona)
+    if 'Horário' not in df.columns or df.empty:
+        return pd.Series(pd.NaT, index=df.index, dtype=f'datetime64[ns, {tz}]')
+    base = pd.Timestamp(now.astimezone(zona).date()).tz_localize(zona)
+    return base + parse_horario(df['Horário']) + _offset(offset_hours)
+
+
+def kickoff_epoch(df: pd.DataFrame, now: datetime | None = None, offset_hours: float | None = None) -> pd.Series:
+    """Kickoff em epoch (segundos, float); NaN se não der parse."""
+    kickoff = kickoff_series(df, now, offset_hours)
+    return (kickoff - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+
+
+def window_mask(df: pd.DataFrame, lead_minutes: float, now: datetime | None = None,
+                offset_hours: float | None = None) -> pd.Series:
+    """Máscara booleana dos jogos que começam entre agora e agora + `lead_minutes`."""
+    now = now or datetime.now(pytz.timezone(TIMEZONE))
+    delta = kickoff_series(df, now, offset_hours) - pd.Timestamp(now)
+    return (delta >= pd.Timedelta(0)) & (delta <= pd.Timedelta(minutes=lead_minutes))
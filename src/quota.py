@@ -1,59 +1,225 @@
 import os
 import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Tuple
 
-QUOTA_PATH_DEFAULT = "data/api_quota.json"
+# Cota da API em SQLite (transações BEGIN IMMEDIATE): seguro entre processos (Streamlit, scheduler,
+# backfill) e threads. Limite diário persistido + limite por minuto em memória (token bucket).
+QUOTA_PATH_DEFAULT = os.getenv("API_QUOTA_PATH", "data/api_quota.sqlite")
+LEGACY_JSON_PATH = "data/api_quota.json"
+PER_MINUTE_DEFAULT = int(os.getenv("API_PER_MINUTE_LIMIT", "10"))
+RESERVATION_TTL_SECONDS = 300  # reservas não confirmadas expiram (processo que morreu no meio)
 
-def _load_quota(path: str = QUOTA_PATH_DEFAULT) -> dict:
-    if os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return {"date": None, "count": 0}
-    return {"date": None, "count": 0}
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS quota_usage ("
+    " day TEXT PRIMARY KEY, used INTEGER NOT NULL DEFAULT 0, last_kind TEXT)",
+    "CREATE TABLE IF NOT EXISTS quota_reservations ("
+    " id TEXT PRIMARY KEY, day TEXT NOT NULL, kind TEXT, n INTEGER NOT NULL, created_at REAL NOT NULL)",
+)
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
 
-def _save_quota(state: dict, path: str = QUOTA_PATH_DEFAULT) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
 
 def _today_str() -> str:
     # Usa fuso local; se quiser, pode usar America/Sao_Paulo
     return datetime.now().strftime("%Y-%m-%d")
 
-def allow_request(kind: str = "default", max_per_day: int = 100, path: str = QUOTA_PATH_DEFAULT) -> bool:
+
+def _init(path: str) -> None:
+    with _init_lock:
+        if path in _initialized:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            for ddl in _SCHEMA:
+                db.execute(ddl)
+            _migrate_legacy_json(db)
+            db.commit()
+        finally:
+            db.close()
+        _initialized.add(path)
+
+
+def _migrate_legacy_json(db: sqlite3.Connection) -> None:
+    """Importa a contagem de hoje do antigo data/api_quota.json (uma vez)."""
+    if not os.path.exists(LEGACY_JSON_PATH):
+        return
+    try:
+        with open(LEGACY_JSON_PATH, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except Exception:
+        return
+    if state.get("date"):
+        db.execute(
+            "INSERT OR IGNORE INTO quota_usage (day, used, last_kind) VALUES (?, ?, ?)",
+            (state["date"], int(state.get("count", 0)), state.get("last_kind")),
+        )
+
+
+@contextmanager
+def _transaction(path: str):
+    """BEGIN IMMEDIATE: trava de escrita desde o início, sem leituras obsoletas entre processos."""
+    _init(path)
+    db = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    finally:
+        db.close()
+
+
+def _used_and_reserved(db: sqlite3.Connection, day: str) -> tuple[int, int]:
+    db.execute("DELETE FROM quota_reservations WHERE created_at < ?", (time.time() - RESERVATION_TTL_SECONDS,))
+    row = db.execute("SELECT used FROM quota_usage WHERE day = ?", (day,)).fetchone()
+    reserved = db.execute("SELECT COALESCE(SUM(n), 0) FROM quota_reservations WHERE day = ?", (day,)).fetchone()[0]
+    return (int(row[0]) if row else 0), int(reserved)
+
+
+def _add_used(db: sqlite3.Connection, day: str, n: int, kind: str | None) -> None:
+    db.execute(
+        "INSERT INTO quota_usage (day, used, last_kind) VALUES (?, ?, ?) "
+        "ON CONFLICT(day) DO UPDATE SET used = used + excluded.used, last_kind = excluded.last_kind",
+        (day, n, kind),
+    )
+
+
+# -------------------------------------------------------------
+# Limite por minuto (token bucket em memória, por processo)
+# -------------------------------------------------------------
+
+class RateLimited(Exception):
+    """Limite por minuto (não é falta de cota diária): tente de novo após `retry_after` segundos."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Limite por minuto da API atingido; tente em {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, n: int = 1, block: bool = True, timeout: float = 60.0) -> bool:
+        limite = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return True
+                espera = (n - self.tokens) / self.rate
+            if not block or time.monotonic() + espera > limite:
+                return False
+            time.sleep(espera)
+
+    def wait_time(self, n: int = 1) -> float:
+        """Segundos até haver `n` tokens disponíveis."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (n - self.tokens) / self.rate)
+
+    def give_back(self, n: int = 1) -> None:
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + n)
+
+
+_buckets: dict[int, TokenBucket] = {}
+
+
+def _bucket(per_minute: int) -> TokenBucket:
+    with _init_lock:
+        if per_minute not in _buckets:
+            _buckets[per_minute] = TokenBucket(per_minute)
+        return _buckets[per_minute]
+
+
+# -------------------------------------------------------------
+# API pública
+# -------------------------------------------------------------
+
+def reserve(kind: str = "default", n: int = 1, max_per_day: int = 100, per_minute: int | None = None,
+            block: bool = True, path: str = QUOTA_PATH_DEFAULT) -> str | None:
     """
-    Verifica e incrementa a cota diária (persistida). Retorna True se pode chamar, False se atingiu o limite.
+    Reserva `n` chamadas do orçamento diário (e do limite por minuto). Retorna o id da reserva,
+    ou None se o limite diário foi atingido. Confirme com commit() ou devolva com release().
+    Levanta RateLimited se não houver token por minuto (após esperar até 60s com block=True).
     """
-    state = _load_quota(path)
-    today = _today_str()
-    if state.get("date") != today:
-        state = {"date": today, "count": 0, "last_kind": None}
+    bucket = _bucket(per_minute or PER_MINUTE_DEFAULT)
+    if n > bucket.capacity:
+        raise ValueError(f"Reserva de {n} chamadas excede o limite por minuto ({bucket.capacity})")
+    if not bucket.take(n, block=block):
+        raise RateLimited(bucket.wait_time(n))
+    day = _today_str()
+    with _transaction(path) as db:
+        used, reserved = _used_and_reserved(db, day)
+        if used + reserved + n > int(max_per_day):
+            bucket.give_back(n)
+            return None
+        res_id = uuid.uuid4().hex
+        db.execute(
+            "INSERT INTO quota_reservations (id, day, kind, n, created_at) VALUES (?, ?, ?, ?, ?)",
+            (res_id, day, kind, n, time.time()),
+        )
+    return res_id
 
-    if int(state.get("count", 0)) >= int(max_per_day):
-        return False
 
-    state["count"] = int(state.get("count", 0)) + 1
-    state["last_kind"] = kind
-    _save_quota(state, path)
-    return True
+def commit(reservation_id: str, used: int | None = None, path: str = QUOTA_PATH_DEFAULT) -> None:
+    """Confirma a reserva: soma `used` (padrão: o total reservado) à contagem do dia."""
+    with _transaction(path) as db:
+        row = db.execute("SELECT day, kind, n FROM quota_reservations WHERE id = ?", (reservation_id,)).fetchone()
+        if row is None:
+            # Reserva expirada: a chamada aconteceu mesmo assim, então conta
+            if used is None or used > 0:
+                _add_used(db, _today_str(), 1 if used is None else used, None)
+            return
+        day, kind, n = row
+        db.execute("DELETE FROM quota_reservations WHERE id = ?", (reservation_id,))
+        if used is None:
+            used = n
+        if used > 0:
+            _add_used(db, day, used, kind)
+
+
+def release(reservation_id: str, path: str = QUOTA_PATH_DEFAULT) -> None:
+    """Devolve a reserva sem consumir cota (ex.: a requisição falhou antes de sair)."""
+    commit(reservation_id, used=0, path=path)
+
 
 def remaining_quota_today(max_per_day: int = 100, path: str = QUOTA_PATH_DEFAULT) -> int:
     """
-    Retorna o restante de cota de hoje (max - count). Se mudou o dia, reseta para max.
+    Retorna o restante de cota de hoje (max - usadas - reservadas). Se mudou o dia, reseta para max.
     """
-    state = _load_quota(path)
-    today = _today_str()
-    if state.get("date") != today:
-        return max_per_day
-    used = int(state.get("count", 0))
-    return max(0, int(max_per_day) - used)
+    with _transaction(path) as db:
+        used, reserved = _used_and_reserved(db, _today_str())
+    return max(0, int(max_per_day) - used - reserved)
+
 
 def quota_state(path: str = QUOTA_PATH_DEFAULT) -> Tuple[str, int]:
     """
     Retorna (data_str, count_hoje).
     """
-    state = _load_quota(path)
-    return (state.get("date"), int(state.get("count", 0)))
\ No newline at end of file
+    day = _today_str()
+    with _transaction(path) as db:
+        used, _ = _used_and_reserved(db, day)
+    return (day, used)
@@ -0,0 +1,102 @@
+# src/results_state.py
+import os
+import json
+import tempfile
+from datetime import datetime, timezone
+
+# Estado local dos jogos da API-Football, um arquivo por data:
+#   data/results_state/<YYYY-MM-DD>.json -> {fixture_id: linha do CSV + 'Kickoff_UTC'}
+STATE_DIR = os.getenv("RESULTS_STATE_DIR", "data/results_state")
+
+# Status que não mudam mais (placar final); os demais ainda são consultados
+FINISHED_STATUSES = frozenset({'FT', 'AET', 'PEN'})
+TERMINAL_STATUSES = FINISHED_STATUSES | {'PST', 'CANC', 'ABD', 'AWD', 'WO'}
+
+# Campos comparados para decidir se uma linha mudou
+TRACKED_FIELDS = ('Gols_Casa', 'Gols_Fora', 'Status', 'Time_Casa', 'Time_Fora', 'Liga', 'Horário')
+
+# Jogos finalizados ficam pendentes ('Aplicado': False) até o UPDATE no banco casá-los; os que não
+# casam (jogo ainda fora de `jogos`) voltam ao CSV nos próximos ciclos, até este limite de tentativas
+APPLY_MAX_ATTEMPTS = int(os.getenv("RESULTS_APPLY_MAX_ATTEMPTS", "8"))
+
+
+def _state_path(date_str: str) -> str:
+    return os.path.join(STATE_DIR, f"{date_str}.json")
+
+
+def load_state(date_str: str) -> dict[str, dict]:
+    path = _state_path(date_str)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_state(date_str: str, state: dict[str, dict]) -> None:
+    """Grava de forma atômica (arquivo temporário + rename)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=STATE_DIR, suffix=".json.tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, _state_path(date_str))
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def pending_ids(state: dict[str, dict], now: datetime | None = None) -> list[str]:
+    """Jogos que já começaram (kickoff <= agora) e ainda não têm status terminal."""
+    now = now or datetime.now(timezone.utc)
+    pendentes = []
+    for fid, row in state.items():
+        if row.get('Status') in TERMINAL_STATUSES:
+            continue
+        kickoff = row.get('Kickoff_UTC')
+        if kickoff and datetime.fromisoformat(kickoff) > now:
+            continue
+        pendentes.append(fid)
+    return pendentes
+
+
+def merge_rows(state: dict[str, dict], rows: list[dict]) -> list[dict]:
+    """Aplica `rows` (com 'Fixture_ID') ao estado e retorna só as linhas novas ou alteradas.
+    Linhas alteradas voltam a ficar pendentes de aplicação no banco."""
+    alteradas = []
+    for row in rows:
+        fid = str(row['Fixture_ID'])
+        anterior = state.get(fid)
+        if anterior is None or any(anterior.get(k) != row.get(k) for k in TRACKED_FIELDS):
+            alteradas.append(row)
+            state[fid] = {**row, 'Aplicado': False, 'Tentativas': 0}
+        else:
+            state[fid] = {**row, 'Aplicado': anterior.get('Aplicado', True),
+                          'Tentativas': anterior.get('Tentativas', 0)}
+    return alteradas
+
+
+def unapplied_rows(state: dict[str, dict]) -> list[dict]:
+    """Jogos finalizados que o banco ainda não recebeu (abaixo do limite de tentativas)."""
+    return [
+        row for row in state.values()
+        if row.get('Status') in FINISHED_STATUSES and not row.get('Aplicado', True)
+        and row.get('Tentativas', 0) < APPLY_MAX_ATTEMPTS
+    ]
+
+
+def record_apply(state: dict[str, dict], attempted_ids, applied_ids) -> None:
+    """Depois de um UPDATE bem-sucedido: marca os jogos casados como aplicados e conta uma
+    tentativa para os finalizados que não casaram."""
+    aplicados = {str(i) for i in applied_ids}
+    for fid in {str(i) for i in attempted_ids}:
+        row = state.get(fid)
+        if row is None or row.get('Status') not in FINISHED_STATUSES:
+            continue
+        if fid in aplicados:
+            row['Aplicado'] = True
+        else:
+            row['Tentativas'] = row.get('Tentativas', 0) + 1
@@ -1,50 +1,205 @@
 import pandas as pd
 import requests
-from datetime import datetime, date, time as dt_time
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta, time as dt_time
 import os
+import time
+import logging
+import threading
 import pytz
 
-def get_today_games():
-    header = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) appleWebKit/537.36 (KHTML, LIKE Gecko) Chrome/50.0.2661.75 Safari/537.36",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+from src import html_snapshots
+from src.fixture_store import save_fixtures
+from src.html_tables import (
+    extract_table, find_table_by_columns,
+    MATCHES_LISTING1_SIGNATURE, MATCHES_LISTING2_SIGNATURE,
+)
 
-    url_link1 = "https://www.soccerstats.com/matches.asp?matchday=1&listing=1"
-    url_link2 = "https://www.soccerstats.com/matches.asp?matchday=1&listing=2"
-    
-	# url_link1 = "https://www.soccerstats.com/matches.asp?matchday=2&daym=tomorrow&listing=1"
-	# url_link2 = "https://www.soccerstats.com/matches.asp?matchday=2&daym=tomorrow&listing=2"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) appleWebKit/537.36 (KHTML, LIKE Gecko) Chrome/50.0.2661.75 Safari/537.36",
+    "X-Requested-With": "XMLHttpRequest"
+}
 
-    r1 = requests.get(url_link1, headers=header)
-    r2 = requests.get(url_link2, headers=header)
+# Timeout por requisição (segundos): (conexão, leitura)
+REQUEST_TIMEOUT = (
+    float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("SCRAPER_READ_TIMEOUT", "30")),
+)
+MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "4"))
+logger = logging.getLogger(__name__)
+# O soccerstats só publica as listagens de hoje (matchday=1) e de amanhã (matchday=2&daym=tomorrow)
+MAX_DAYS_AHEAD = 1
 
-    df1 = pd.read_html(r1.text)
-    df2 = pd.read_html(r2.text)
-    
+# -------------------------------------------------------------
+# Camada de download (sessão keep-alive compartilhada + paralelismo)
+# -------------------------------------------------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Retorna a sessão HTTP do processo (pool de conexões keep-alive)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session = s
+        return _session
+
+
+def _fetch_one(url: str, timeout) -> tuple[str, str, float, str]:
+    """GET condicional: reaproveita o snapshot do dia quando o servidor responde 304."""
+    inicio = time.perf_counter()
+    entry = html_snapshots.get_entry(url)
+    r = get_session().get(url, timeout=timeout, headers=html_snapshots.conditional_headers(entry))
+    latencia = time.perf_counter() - inicio
+
+    if r.status_code == 304 and entry:
+        body = html_snapshots.read_body(entry["sha256"])
+        if body is not None:
+            return url, body, latencia, "304"
+        # Snapshot sumiu do disco: baixa de novo sem cabeçalhos condicionais
+        r = get_session().get(url, timeout=timeout)
+        latencia = time.perf_counter() - inicio
+
+    r.raise_for_status()
+    _, mudou = html_snapshots.save_snapshot(
+        url, r.text,
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+    )
+    return url, r.text, latencia, "novo" if mudou else "igual"
+
+
+def fetch_pages(urls: list[str], timeout=REQUEST_TIMEOUT, replay_date: str | None = None) -> dict[str, str]:
+    """Baixa todas as URLs em paralelo. Retorna {url: html}.
+    Latência de cada página em nível DEBUG; qualquer falha de rede interrompe o ciclo.
+    Com `replay_date` (YYYY-MM-DD) serve os snapshots gravados naquele dia, sem rede."""
+    if not urls:
+        return {}
+
+    if replay_date:
+        print(f"[scraper] Modo replay: snapshots de {replay_date}")
+        return {url: html_snapshots.replay(url, replay_date) for url in urls}
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(urls))) as executor:
+        resultados = list(executor.map(lambda u: _fetch_one(u, timeout), urls))
+
+    pages = {}
+    for url, html, latencia, estado in resultados:
+        logger.debug("%s -> %.2fs (%.0f KB, %s)", url, latencia, len(html) / 1024, estado)
+        pages[url] = html
+    print(f"[scraper] {len(urls)} páginas em {time.perf_counter() - inicio:.2f}s")
+    return pages
+
+
+# Memo do DataFrame já montado, por combinação de hashes das páginas
+_parsed_cache: dict[str, pd.DataFrame] = {}
+MAX_PARSED = 8  # parses guardados (um por dia raspado, com folga)
+
+
+def _pages_key(pages: list[str]) -> str:
+    return html_snapshots.body_hash("|".join(html_snapshots.body_hash(p) for p in pages))
+
+
+def _load_parsed(key: str) -> pd.DataFrame | None:
+    if key in _parsed_cache:
+        return _parsed_cache[key].copy()
+    path = os.path.join(html_snapshots.SNAPSHOT_DIR, "parsed", f"{key}.pkl")
+    if os.path.exists(path):
+        try:
+            df = pd.read_pickle(path)
+            _parsed_cache[key] = df
+            return df.copy()
+        except Exception:
+            return None
+    return None
+
+
+def _store_parsed(key: str, df: pd.DataFrame) -> None:
+    while len(_parsed_cache) >= MAX_PARSED:
+        _parsed_cache.pop(next(iter(_parsed_cache)))
+    _parsed_cache[key] = df
+    dir_ = os.path.join(html_snapshots.SNAPSHOT_DIR, "parsed")
+    os.makedirs(dir_, exist_ok=True)
+    df.to_pickle(os.path.join(dir_, f"{key}.pkl"))
+    # Mantém apenas os parses mais recentes (os HTMLs continuam nos snapshots)
+    arquivos = sorted(
+        (os.path.join(dir_, n) for n in os.listdir(dir_) if n.endswith(".pkl")),
+        key=os.path.getmtime,
+    )
+    for antigo in arquivos[:-MAX_PARSED]:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+
+
+def parse_matches_table(html: str, signature: set[str]) -> pd.DataFrame:
+    """Extrai só a tabela de jogos (localizada pelo cabeçalho). Cai para o pd.read_html
+    sobre a página inteira apenas se o extrator lxml não encontrar a tabela."""
+    df = extract_table(html, signature)
+    if df is not None:
+        return df
+    print("[scraper] Extrator lxml não achou a tabela; usando pd.read_html.")
+    df = find_table_by_columns(pd.read_html(html), signature)
+    if df is None:
+        raise RuntimeError(f"Tabela de jogos não encontrada (cabeçalho esperado: {sorted(signature)})")
+    return df
+
+
+# -------------------------------------------------------------
+# Montagem do DataFrame de jogos
+# -------------------------------------------------------------
+
+def listing_urls(matchday: int = 1) -> tuple[str, str]:
+    """URLs das duas listagens do soccerstats para o matchday (1 = hoje, 2 = amanhã).
+    Outros dias não têm listagem no site (ver MAX_DAYS_AHEAD)."""
+    if not 1 <= matchday <= MAX_DAYS_AHEAD + 1:
+        raise ValueError(f"matchday {matchday} fora do alcance do soccerstats (1 = hoje, 2 = amanhã)")
+    daym = "&daym=tomorrow" if matchday == 2 else ""
+    base = f"https://www.soccerstats.com/matches.asp?matchday={matchday}{daym}"
+    return f"{base}&listing=1", f"{base}&listing=2"
+
+
+def build_games_frame(html1: str, html2: str) -> pd.DataFrame:
+    """Monta o DataFrame de jogos a partir das páginas listing=1 e listing=2 de um mesmo dia.
+    Se as páginas forem idênticas às de um ciclo anterior, devolve o DataFrame já montado."""
+    pages_key = _pages_key([html1, html2])
+    cached = _load_parsed(pages_key)
+    if cached is not None:
+        print("[scraper] Páginas sem alteração desde o último ciclo; parse reaproveitado.")
+        return cached
 
     # Preparando a tabela 1
-    jogos_today1 = df1[8]
+    jogos_today1 = parse_matches_table(html1, MATCHES_LISTING1_SIGNATURE)
     print(jogos_today1)
-    jogos_today1 = jogos_today1[['Country','2.5+','1.5+','GA','GF','TG','PPG','scope', 
-                                 'Unnamed: 10', 'Unnamed: 11','Unnamed: 12', 'scope.1', 
+    jogos_today1 = jogos_today1[['Country','2.5+','1.5+','GA','GF','TG','PPG','scope',
+                                 'Unnamed: 10', 'Unnamed: 11','Unnamed: 12', 'scope.1',
                                  'PPG.1', 'TG.1', 'GF.1', 'GA.1', '1.5+.1', '2.5+.1']]
-    jogos_today1.columns = ['País', 'Over25_H', 'Over15_H', 'Gols_Sofridos_Casa', 'Gols_Marcados_Casa', 
-                            'Media_Gols_Casa', 'PPG_Casa', 'Casa', 'Time 1', 'Horário', 'Time 2', 
-                            'Fora', 'PPG_Fora', 'MediaGols_Fora', 'Gols_Marcados_Fora', 
+    jogos_today1.columns = ['País', 'Over25_H', 'Over15_H', 'Gols_Sofridos_Casa', 'Gols_Marcados_Casa',
+                            'Media_Gols_Casa', 'PPG_Casa', 'Casa', 'Time 1', 'Horário', 'Time 2',
+                            'Fora', 'PPG_Fora', 'MediaGols_Fora', 'Gols_Marcados_Fora',
                             'Gols_Sofridos_Fora', 'Over15_A', 'Over25_A']
 
     # Preparando a tabela 2
-    jogos_today2 = df2[8]
+    jogos_today2 = parse_matches_table(html2, MATCHES_LISTING2_SIGNATURE)
     print("Chaves do dicionário:", jogos_today2.keys())
     jogos_today2 = jogos_today2[['BTS','W%','BTS.1','W%.1', 'GP']]
     jogos_today2.columns = ['BTTS_H', '%Vitorias_H', 'BTTS_A', '%Vitorias_A', 'Partidas']
 
     # Concatenando tabelas
     jogos_today = pd.concat([jogos_today1, jogos_today2], axis=1)
-    jogos_today = jogos_today[['País','Partidas','Time 1','Time 2', 'Horário', '%Vitorias_H','%Vitorias_A', 
-                               'Over15_H', 'Over25_H', 'Over15_A', 'Over25_A', 'BTTS_H', 'BTTS_A', 
-                               'Gols_Marcados_Casa', 'Gols_Sofridos_Casa', 'Gols_Marcados_Fora', 
+    jogos_today = jogos_today[['País','Partidas','Time 1','Time 2', 'Horário', '%Vitorias_H','%Vitorias_A',
+                               'Over15_H', 'Over25_H', 'Over15_A', 'Over25_A', 'BTTS_H', 'BTTS_A',
+                               'Gols_Marcados_Casa', 'Gols_Sofridos_Casa', 'Gols_Marcados_Fora',
                                'Gols_Sofridos_Fora', 'Media_Gols_Casa', 'MediaGols_Fora', 'PPG_Casa','PPG_Fora']]
 
     # Tratamento de horários e porcentagens
@@ -68,6 +223,69 @@ def get_today_games():
     jogos_today.index = jogos_today.index.set_names(['Nº'])
     jogos_today = jogos_today.rename(index=lambda x: x + 1)
 
-    # Salvar Excel
-    jogos_today.to_excel("data/Jogos_de_Hoje.xlsx", index=False)
-    return jogos_today
\ No newline at end of file
+    _store_parsed(pages_key, jogos_today)
+    return jogos_today.copy()
+
+
+def get_today_games(replay_date: str | None = None):
+    """Raspa os jogos do dia e salva o cache de jogos (Parquet).
+    `replay_date` (ou SOCCERSTATS_REPLAY_DATE) refaz a raspagem de um dia gravado, offline."""
+    replay_date = replay_date or os.getenv("SOCCERSTATS_REPLAY_DATE") or None
+    url_link1, url_link2 = listing_urls(1)
+
+    pages = fetch_pages([url_link1, url_link2], replay_date=replay_date)
+    jogos_today = build_games_frame(pages[url_link1], pages[url_link2])
+
+    # Salvar cache (não sobrescreve o cache de hoje quando é replay)
+    if not replay_date:
+        save_fixtures(jogos_today)
+    return jogos_today
+
+
+def get_games_for_range(start: date, end: date | None = None) -> pd.DataFrame:
+    """Raspa todos os dias de `start` a `end` (inclusive) e devolve um único DataFrame com DATA_JOGO.
+
+    Hoje e amanhã são baixados do soccerstats (matchday = dias a partir de hoje + 1), todas as
+    páginas em paralelo; dias depois de amanhã ainda não têm listagem e são pulados. Dias passados não existem mais no site: são refeitos a partir
+    dos snapshots gravados naquele dia (ver src/html_snapshots.py); dias sem snapshot são pulados.
+    Não altera o cache de jogos de hoje."""
+    end = end or start
+    if end < start:
+        raise ValueError(f"Intervalo inválido: {start} > {end}")
+
+    hoje = datetime.now(pytz.timezone(html_snapshots.TIMEZONE)).date()
+    dias = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    # Uma única rodada de downloads para hoje e amanhã
+    limite = hoje + timedelta(days=MAX_DAYS_AHEAD)
+    urls_por_dia = {d: listing_urls((d - hoje).days + 1) for d in dias if hoje <= d <= limite}
+    pages = fetch_pages([u for par in urls_por_dia.values() for u in par])
+
+    frames = []
+    for dia in dias:
+        if dia > limite:
+            print(f"[scraper] {dia}: além de amanhã, sem listagem no soccerstats. Dia ignorado.")
+            continue
+        try:
+            if dia in urls_por_dia:
+                u1, u2 = urls_por_dia[dia]
+                html1, html2 = pages[u1], pages[u2]
+            else:
+                u1, u2 = listing_urls(1)
+                html1 = html_snapshots.replay(u1, dia.strftime("%Y-%m-%d"))
+                html2 = html_snapshots.replay(u2, dia.strftime("%Y-%m-%d"))
+        except FileNotFoundError as e:
+            print(f"[scraper] {dia}: {e}. Dia ignorado.")
+            continue
+
+        df_dia = build_games_frame(html1, html2)
+        df_dia['DATA_JOGO'] = dia
+        frames.append(df_dia)
+        print(f"[scraper] {dia}: {len(df_dia)} jogos")
+
+    if not frames:
+        return pd.DataFrame()
+
+    jogos = pd.concat(frames, ignore_index=True)
+    jogos.index = jogos.index.set_names(['Nº'])
+    return jogos.rename(index=lambda x: x + 1)
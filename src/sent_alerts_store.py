@@ -0,0 +1,118 @@
+# src/sent_alerts_store.py
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytz
+
+# Registro de jogos já alertados (substitui data/sent_alerts.json).
+# SQLite em WAL: consulta por chave primária (O(1) por id), escrita concorrente de main.py e app.py,
+# e expiração por data (o arquivo não cresce para sempre).
+# A chave é o game_id ou, para alertas de regras (src.alert_rules), "<regra>:<game_id>".
+SENT_ALERTS_DB_PATH = os.getenv("SENT_ALERTS_DB_PATH", "data/sent_alerts.sqlite")
+LEGACY_JSON_PATH = "data/sent_alerts.json"
+KEEP_DAYS = int(os.getenv("SENT_ALERTS_KEEP_DAYS", "3"))
+TIMEZONE = 'America/Sao_Paulo'
+_IN_CHUNK = 500  # limite de parâmetros por consulta IN (...)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS sent_alerts ("
+    " game_id TEXT PRIMARY KEY, alert_date TEXT NOT NULL, created_at TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_sent_alerts_date ON sent_alerts (alert_date)",
+)
+_initialized: set[str] = set()
+_last_expiry: dict[str, str] = {}  # path -> dia da última expiração (processos longos expiram uma vez por dia)
+_init_lock = threading.Lock()
+
+
+def _today_str() -> str:
+    return datetime.now(pytz.timezone(TIMEZONE)).strftime("%Y-%m-%d")
+
+
+def _init(path: str) -> None:
+    with _init_lock:
+        if path not in _initialized:
+            _create(path)
+            _initialized.add(path)
+        hoje = _today_str()
+        if _last_expiry.get(path) == hoje:
+            return
+        _last_expiry[path] = hoje
+    expire(path=path)
+
+
+def _create(path: str) -> None:
+    """Cria o schema e migra o JSON legado (uma vez por processo)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        for ddl in _SCHEMA:
+            db.execute(ddl)
+        _migrate_legacy_json(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _migrate_legacy_json(db: sqlite3.Connection) -> None:
+    """Importa o antigo sent_alerts.json (datado como hoje, expira normalmente) e o renomeia."""
+    if not os.path.exists(LEGACY_JSON_PATH):
+        return
+    try:
+        with open(LEGACY_JSON_PATH, "r") as f:
+            ids = json.load(f)
+    except Exception:
+        return
+    hoje, agora = _today_str(), datetime.now().isoformat(timespec="seconds")
+    db.executemany(
+        "INSERT OR IGNORE INTO sent_alerts (game_id, alert_date, created_at) VALUES (?, ?, ?)",
+        [(str(i), hoje, agora) for i in ids],
+    )
+    os.replace(LEGACY_JSON_PATH, LEGACY_JSON_PATH + ".migrated")
+
+
+@contextmanager
+def _connect(path: str):
+    db = sqlite3.connect(path, timeout=30)
+    try:
+        with db:  # commit/rollback
+            yield db
+    finally:
+        db.close()
+
+
+def already_sent(game_ids, path: str = SENT_ALERTS_DB_PATH) -> set[str]:
+    """Subconjunto de `game_ids` que já foi alertado."""
+    _init(path)
+    ids = list(dict.fromkeys(str(i) for i in game_ids))
+    vistos = set()
+    with _connect(path) as db:
+        for i in range(0, len(ids), _IN_CHUNK):
+            lote = ids[i:i + _IN_CHUNK]
+            vistos.update(r[0] for r in db.execute(
+                f"SELECT game_id FROM sent_alerts WHERE game_id IN ({', '.join('?' * len(lote))})", lote))
+    return vistos
+
+
+def mark_sent(game_ids, alert_date: str | None = None, path: str = SENT_ALERTS_DB_PATH) -> int:
+    """Registra os ids (idempotente). Retorna quantos eram novos."""
+    _init(path)
+    dia, agora = alert_date or _today_str(), datetime.now().isoformat(timespec="seconds")
+    with _connect(path) as db:
+        antes = db.total_changes
+        db.executemany(
+            "INSERT OR IGNORE INTO sent_alerts (game_id, alert_date, created_at) VALUES (?, ?, ?)",
+            [(str(i), dia, agora) for i in game_ids],
+        )
+        return db.total_changes - antes
+
+
+def expire(keep_days: int = KEEP_DAYS, path: str = SENT_ALERTS_DB_PATH) -> int:
+    """Remove ids alertados há mais de `keep_days` dias."""
+    limite = (datetime.now(pytz.timezone(TIMEZONE)) - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    with _connect(path) as db:
+        return db.execute("DELETE FROM sent_alerts WHERE alert_date < ?", (limite,)).rowcount
@@ -0,0 +1,75 @@
+# src/stage_dag.py
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, NamedTuple
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[dict], object]            # recebe {nome: resultado} das dependências
+    deps: tuple[str, ...] = ()
+    inputs: Callable[[dict], object] | None = None  # impressão digital das entradas; None = sempre roda
+    require_deps_ok: bool = True             # False: roda mesmo se uma dependência falhar
+
+
+class StageRun(NamedTuple):
+    name: str
+    status: str      # 'ok' | 'skipped' | 'error' | 'blocked'
+    seconds: float
+    result: object
+
+
+class StageDAG:
+    """Executa estágios em threads assim que suas dependências terminam (I/O independente em paralelo).
+    Um estágio com `inputs` é pulado quando a impressão digital é igual à da última execução bem-sucedida.
+    Se uma dependência falha, os dependentes ficam 'blocked' (a menos que require_deps_ok=False)."""
+
+    def __init__(self, stages: list[Stage], max_workers: int = 4):
+        nomes = {s.name for s in stages}
+        for s in stages:
+            faltando = set(s.deps) - nomes
+            if faltando:
+                raise ValueError(f"Estágio '{s.name}' depende de estágios inexistentes: {sorted(faltando)}")
+        self.stages = {s.name: s for s in stages}
+        self.max_workers = max_workers
+        self._last_inputs: dict[str, object] = {}
+
+    def _execute(self, stage: Stage, results: dict) -> StageRun:
+        inicio = time.perf_counter()
+        try:
+            fp = stage.inputs(results) if stage.inputs is not None else None
+            if fp is not None and self._last_inputs.get(stage.name) == fp:
+                return StageRun(stage.name, 'skipped', time.perf_counter() - inicio, None)
+            resultado = stage.run(results)
+            if fp is not None:
+                self._last_inputs[stage.name] = fp
+            return StageRun(stage.name, 'ok', time.perf_counter() - inicio, resultado)
+        except Exception as e:
+            return StageRun(stage.name, 'error', time.perf_counter() - inicio, e)
+
+    def run(self) -> dict[str, StageRun]:
+        runs: dict[str, StageRun] = {}
+        results: dict[str, object] = {}
+        pendentes = dict(self.stages)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            em_execucao = {}
+            while pendentes or em_execucao:
+                for nome, stage in list(pendentes.items()):
+                    if stage.require_deps_ok and any(
+                            runs.get(d) is not None and runs[d].status in ('error', 'blocked') for d in stage.deps):
+                        runs[nome] = StageRun(nome, 'blocked', 0.0, None)
+                        del pendentes[nome]
+                    elif all(d in runs for d in stage.deps):
+                        em_execucao[pool.submit(self._execute, stage, dict(results))] = nome
+                        del pendentes[nome]
+                if not em_execucao:
+                    if pendentes:
+                        raise ValueError(f"Dependência circular entre os estágios: {sorted(pendentes)}")
+                    continue
+                prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for fut in prontos:
+                    nome = em_execucao.pop(fut)
+                    runs[nome] = fut.result()
+                    if runs[nome].status == 'ok':
+                        results[nome] = runs[nome].result
+        return runs
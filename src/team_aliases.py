@@ -0,0 +1,223 @@
+"""Dicionário persistente de aliases de times: nome na API-Football -> nome no soccerstats (tabela `jogos`).
+
+Cada mapeamento confirmado (match por ID depois do fallback com score >= ALIAS_LEARN_MIN_SCORE, ou
+cadastro manual) é gravado em SQLite e carregado uma vez em memória; upsert_results_from_csv consulta o
+dicionário antes de tudo. Matches de score menor ficam pendentes (ignorados no lookup) até o `confirm`.
+
+Uso:
+    python -m src.team_aliases list [--filtro TEXTO] [--pendentes]
+    python -m src.team_aliases add "FC Santiago" "Santiago"
+    python -m src.team_aliases confirm "FC Santiago"
+    python -m src.team_aliases remove "FC Santiago"
+    python -m src.team_aliases export aliases.csv
+    python -m src.team_aliases import aliases.csv
+"""
+import os
+import csv
+import sqlite3
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.team_matcher import normalize_keep_diacritics
+
+ALIASES_PATH = os.getenv("TEAM_ALIASES_PATH", "data/team_aliases.sqlite")
+CSV_FIELDS = ["api_name", "db_name", "origin", "hits", "updated_at"]
+# Score mínimo do matcher para um alias virar global automaticamente; abaixo disso fica 'pending'
+ALIAS_LEARN_MIN_SCORE = float(os.getenv("TEAM_ALIASES_MIN_SCORE", "0.9"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS team_aliases (
+    api_key    TEXT PRIMARY KEY,   -- nome da API normalizado
+    api_name   TEXT NOT NULL,
+    db_name    TEXT NOT NULL,
+    origin     TEXT NOT NULL,      -- 'auto' | 'manual' | 'pending' (não usado no lookup)
+    hits       INTEGER NOT NULL DEFAULT 1,
+    updated_at TEXT NOT NULL
+)
+"""
+
+
+def alias_key(name: str) -> str:
+    return normalize_keep_diacritics(name)
+
+
+class AliasStore:
+    """Aliases em SQLite com espelho em dict (lookup O(1)). Aliases manuais não são sobrescritos por automáticos;
+    pendentes ficam só no SQLite até serem confirmados."""
+
+    def __init__(self, path: str = ALIASES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+            rows = db.execute("SELECT api_key, db_name, origin FROM team_aliases").fetchall()
+        self._map = {k: v for k, v, o in rows if o != "pending"}
+        self._manual = {k for k, _, o in rows if o == "manual"}
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:  # commit/rollback
+                yield db
+        finally:
+            db.close()
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def get(self, api_name: str) -> str | None:
+        return self._map.get(alias_key(api_name))
+
+    def _upsert(self, db, key: str, api_name: str, db_name: str, origin: str) -> None:
+        db.execute(
+            "INSERT INTO team_aliases (api_key, api_name, db_name, origin, hits, updated_at) "
+            "VALUES (?, ?, ?, ?, 1, ?) "
+            "ON CONFLICT(api_key) DO UPDATE SET "
+            "hits = CASE WHEN db_name = excluded.db_name THEN hits + 1 ELSE 1 END, "
+            "api_name = excluded.api_name, db_name = excluded.db_name, "
+            "origin = CASE WHEN origin = 'manual' THEN 'manual' ELSE excluded.origin END, "
+            "updated_at = excluded.updated_at",
+            (key, str(api_name).strip(), db_name, origin, datetime.now().isoformat(timespec="seconds")),
+        )
+
+    def learn(self, api_name: str, db_name: str, origin: str = "auto") -> bool:
+        """Registra/confirma api_name -> db_name. Retorna True se o dicionário mudou."""
+        if origin == "pending":
+            return self.suggest(api_name, db_name)
+        key = alias_key(api_name)
+        db_name = str(db_name).strip()
+        if not key or not db_name or alias_key(db_name) == key:
+            return False  # nomes iguais já casam no UPDATE exato
+        if origin == "auto" and key in self._manual and self._map.get(key) != db_name:
+            return False
+        with self._lock, self._connect() as db:
+            self._upsert(db, key, api_name, db_name, origin)
+            mudou = self._map.get(key) != db_name
+            self._map[key] = db_name
+            if origin == "manual":
+                self._manual.add(key)
+        return mudou
+
+    def suggest(self, api_name: str, db_name: str) -> bool:
+        """Guarda api_name -> db_name como pendente (match de score baixo), sem afetar o lookup.
+        Não sobrescreve um alias ativo. Retorna True se a sugestão é nova ou mudou de destino."""
+        key = alias_key(api_name)
+        db_name = str(db_name).strip()
+        if not key or not db_name or alias_key(db_name) == key or key in self._map:
+            return False
+        with self._lock, self._connect() as db:
+            anterior = db.execute("SELECT db_name FROM team_aliases WHERE api_key = ?", (key,)).fetchone()
+            self._upsert(db, key, api_name, db_name, "pending")
+        return anterior is None or anterior[0] != db_name
+
+    def confirm(self, api_name: str) -> bool:
+        """Promove um alias pendente a manual (passa a valer no lookup)."""
+        key = alias_key(api_name)
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT db_name FROM team_aliases WHERE api_key = ? AND origin = 'pending'", (key,)).fetchone()
+            if row is None:
+                return False
+            db.execute("UPDATE team_aliases SET origin = 'manual', updated_at = ? WHERE api_key = ?",
+                       (datetime.now().isoformat(timespec="seconds"), key))
+            self._map[key] = row[0]
+            self._manual.add(key)
+        return True
+
+    def remove(self, api_name: str) -> bool:
+        key = alias_key(api_name)
+        with self._lock, self._connect() as db:
+            cur = db.execute("DELETE FROM team_aliases WHERE api_key = ?", (key,))
+            self._map.pop(key, None)
+            self._manual.discard(key)
+        return cur.rowcount > 0
+
+    def rows(self, filtro: str | None = None, origin: str | None = None) -> list[dict]:
+        sql = f"SELECT {', '.join(CSV_FIELDS)} FROM team_aliases WHERE 1 = 1"
+        params = ()
+        if filtro:
+            sql += " AND (api_name LIKE ? OR db_name LIKE ?)"
+            params += (f"%{filtro}%", f"%{filtro}%")
+        if origin:
+            sql += " AND origin = ?"
+            params += (origin,)
+        with self._connect() as db:
+            return [dict(zip(CSV_FIELDS, r)) for r in db.execute(sql + " ORDER BY api_key", params)]
+
+    def export_csv(self, path: str) -> int:
+        rows = self.rows()
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+        return len(rows)
+
+    def import_csv(self, path: str, origin: str = "manual") -> int:
+        """Importa um CSV com colunas api_name,db_name (demais colunas são opcionais)."""
+        total = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("api_name") and row.get("db_name"):
+                    self.learn(row["api_name"], row["db_name"], origin=row.get("origin") or origin)
+                    total += 1
+        return total
+
+
+_store: AliasStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_alias_store(path: str = ALIASES_PATH) -> AliasStore:
+    """Instância compartilhada por processo (carregada uma vez)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = AliasStore(path)
+        return _store
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=ALIASES_PATH, help="arquivo SQLite dos aliases")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="lista os aliases")
+    p_list.add_argument("--filtro", default=None)
+    p_list.add_argument("--pendentes", action="store_true", help="só aliases pendentes de confirmação")
+    p_add = sub.add_parser("add", help="cadastra/corrige um alias manual")
+    p_add.add_argument("api_name")
+    p_add.add_argument("db_name")
+    p_conf = sub.add_parser("confirm", help="confirma um alias pendente")
+    p_conf.add_argument("api_name")
+    p_rm = sub.add_parser("remove", help="remove um alias")
+    p_rm.add_argument("api_name")
+    p_exp = sub.add_parser("export", help="exporta para CSV")
+    p_exp.add_argument("csv_path")
+    p_imp = sub.add_parser("import", help="importa de CSV (api_name,db_name)")
+    p_imp.add_argument("csv_path")
+    args = parser.parse_args(argv)
+
+    store = AliasStore(args.db)
+    if args.cmd == "list":
+        rows = store.rows(args.filtro, origin="pending" if args.pendentes else None)
+        for r in rows:
+            print(f"{r['api_name']!r:40} -> {r['db_name']!r:40} [{r['origin']}, hits={r['hits']}, {r['updated_at']}]")
+        print(f"{len(rows)} alias(es)")
+    elif args.cmd == "add":
+        store.learn(args.api_name, args.db_name, origin="manual")
+        print(f"OK: {args.api_name!r} -> {args.db_name!r}")
+    elif args.cmd == "confirm":
+        print("Confirmado." if store.confirm(args.api_name) else "Alias pendente não encontrado.")
+    elif args.cmd == "remove":
+        print("Removido." if store.remove(args.api_name) else "Alias não encontrado.")
+    elif args.cmd == "export":
+        print(f"{store.export_csv(args.csv_path)} alias(es) exportado(s) para {args.csv_path}")
+    elif args.cmd == "import":
+        print(f"{store.import_csv(args.csv_path)} alias(es) importado(s) de {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# src/team_matcher.py
+import re
+from typing import NamedTuple
+
+# Prefixos comuns de clubes
+STOPWORDS_PREFIXES = {
+    'fc', 'club', 'cf', 'ac', 'sc', 'sd', 'cd', 'ud', 'fk', 'sk',
+    'al', 'el', 'de', 'da', 'do', 'la', 'las', 'los', 'sv', 'if', 'afc'
+}
+# Sufixos ou marcadores de gênero comuns
+STOPWORDS_SUFFIXES = {
+    'w', 'women', 'fem', 'femenino', 'ladies'
+}
+# Categorias por idade / times B/II comumente geram variações
+CATEGORY_TOKENS = {
+    'u15', 'u16', 'u17', 'u18', 'u19', 'u20', 'u21', 'u23',
+    'reserves', 'reserve', 'b', 'ii'
+}
+
+# Limiares do matcher em memória
+MIN_SCORE = 0.5    # similaridade mínima (0..1) para aceitar um candidato
+MIN_MARGIN = 0.15  # folga mínima entre o melhor e o segundo melhor candidato
+
+
+# -------------------------------------------------------------
+# Normalização de nomes
+# -------------------------------------------------------------
+
+def normalize_keep_diacritics(name: str) -> str:
+    s = str(name).lower().strip()
+    # mantém diacríticos, espaços e separadores comuns, remove símbolos estranhos
+    s = re.sub(r'[^0-9a-zA-ZÀ-ÿ\s/.\-]', ' ', s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s
+
+
+def stopwords(remove_prefixes: bool = True, remove_suffixes: bool = True,
+              remove_categories: bool = True) -> set[str]:
+    to_remove = set()
+    if remove_prefixes:
+        to_remove |= STOPWORDS_PREFIXES
+    if remove_suffixes:
+        to_remove |= STOPWORDS_SUFFIXES
+    if remove_categories:
+        to_remove |= CATEGORY_TOKENS
+    return to_remove
+
+
+def tokenize_filtered(name: str, to_remove: set[str]) -> tuple[list[str], str]:
+    base = normalize_keep_diacritics(name)
+    tokens = [t for t in re.split(r'[\s/.\-]+', base) if t]
+    filtered = [t for t in tokens if t not in to_remove]
+    return filtered, base
+
+
+def build_like_patterns(name: str, to_remove: set[str]) -> list[str]:
+    filtered_tokens, base = tokenize_filtered(name, to_remove)
+
+    patterns = []
+    # Padrão com a string completa (como veio)
+    if base:
+        patterns.append(f"%{base}%")
+    # Padrão com tokens filtrados (sem prefixos/sufixos/categorias)
+    if filtered_tokens:
+        name_filtered = ' '.join(filtered_tokens)
+        patterns.append(f"%{name_filtered}%")
+    # Padrão com coringa entre tokens filtrados
+    if len(filtered_tokens) > 1:
+        patterns.append('%' + '%'.join(filtered_tokens) + '%')
+
+    # Deduplicar mantendo ordem
+    return list(dict.fromkeys(patterns))
+
+
+def _token_set(name: str, to_remove: set[str]) -> frozenset[str]:
+    filtered, base = tokenize_filtered(name, to_remove)
+    # Nome composto só de stopwords (ex.: "Club B"): usa os tokens originais
+    return frozenset(filtered or [t for t in re.split(r'[\s/.\-]+', base) if t])
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Média de Jaccard e de contenção (|A∩B| / min(|A|,|B|)) entre conjuntos de tokens."""
+    if not a or not b:
+        return 0.0
+    comum = len(a & b)
+    if comum == 0:
+        return 0.0
+    return 0.5 * comum / len(a | b) + 0.5 * comum / min(len(a), len(b))
+
+
+# -------------------------------------------------------------
+# Índice em memória dos jogos do dia
+# -------------------------------------------------------------
+
+class MatchResult(NamedTuple):
+    match_id: int | None
+    score: float
+    reversed: bool
+    status: str  # 'ok' | 'ambiguous' | 'none'
+    candidates: list  # [(id, score, reversed, time_casa, time_fora)], melhores primeiro
+
+
+class TeamMatchIndex:
+    """Jogos de `jogos` carregados uma vez, com conjuntos de tokens normalizados por time e um
+    índice invertido (data, token) -> jogos. Cada linha do CSV é casada em memória, sem LIKE."""
+
+    def __init__(self, rows, remove_prefixes: bool = True, remove_suffixes: bool = True,
+                 remove_categories: bool = True):
+        self.to_remove = stopwords(remove_prefixes, remove_suffixes, remove_categories)
+        self.games: list[tuple] = []  # (id, data, casa, fora, tokens_casa, tokens_fora)
+        self.postings: dict[tuple, set[int]] = {}
+        self.ambiguities: list[dict] = []
+        for id_, dt, casa, fora in rows:
+            self.add(id_, dt, casa, fora)
+
+    @classmethod
+    def from_db(cls, conn, dates, **opts) -> "TeamMatchIndex":
+        """Uma única consulta para todas as datas do CSV."""
+        dates = sorted(set(dates))
+        if not dates:
+            return cls([], **opts)
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT ID, DATA_JOGO, TIME_CASA, TIME_FORA FROM jogos "
+                f"WHERE DATA_JOGO IN ({', '.join(['%s'] * len(dates))})",
+                tuple(dates),
+            )
+            return cls(cur.fetchall(), **opts)
+        finally:
+            cur.close()
+
+    def add(self, id_, dt, casa, fora) -> None:
+        pos = len(self.games)
+        tc = _token_set(casa, self.to_remove)
+        tf = _token_set(fora, self.to_remove)
+        self.games.append((id_, dt, casa, fora, tc, tf))
+        for token in tc | tf:
+            self.postings.setdefault((dt, token), set()).add(pos)
+
+    def match(self, dt, casa: str, fora: str, min_score: float = MIN_SCORE,
+              min_margin: float = MIN_MARGIN) -> MatchResult:
+        tc = _token_set(casa, self.to_remove)
+        tf = _token_set(fora, self.to_remove)
+
+        candidatos = set()
+        for token in tc | tf:
+            candidatos |= self.postings.get((dt, token), set())
+
+        pontuados = []
+        for pos in candidatos:
+            id_, _, db_casa, db_fora, db_tc, db_tf = self.games[pos]
+            # Os dois lados precisam compartilhar tokens (como no LIKE em TIME_CASA e TIME_FORA)
+            direto = (similarity(tc, db_tc), similarity(tf, db_tf))
+            invertido = (similarity(tc, db_tf), similarity(tf, db_tc))
+            for (sc, sf), rev in ((direto, False), (invertido, True)):
+                if sc > 0 and sf > 0:
+                    pontuados.append((id_, round((sc + sf) / 2, 3), rev, db_casa, db_fora))
+        pontuados.sort(key=lambda c: c[1], reverse=True)
+
+        # Um mesmo jogo pode aparecer nas duas orientações: fica só a melhor
+        vistos, unicos = set(), []
+        for c in pontuados:
+            if c[0] not in vistos:
+                vistos.add(c[0])
+                unicos.append(c)
+
+        if not unicos or unicos[0][1] < min_score:
+            return MatchResult(None, unicos[0][1] if unicos else 0.0, False, 'none', unicos[:5])
+
+        melhor = unicos[0]
+        if len(unicos) > 1 and melhor[1] - unicos[1][1] < min_margin:
+            self.ambiguities.append({
+                'data': dt, 'time_casa': casa, 'time_fora': fora,
+                'candidatos': [(c[0], c[1], c[3], c[4]) for c in unicos[:5]],
+            })
+            return MatchResult(None, melhor[1], melhor[2], 'ambiguous', unicos[:5])
+
+        return MatchResult(melhor[0], melhor[1], melhor[2], 'ok', unicos[:5])
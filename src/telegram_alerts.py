@@ -1,12 +1,11 @@
 # src/telegram_alerts.py
 import requests
 import pandas as pd 
-import os
-import json
 from datetime import datetime as dt 
 
-# --- Configurações de Estado ---
-SENT_ALERTS_PATH = "data/sent_alerts.json"
+from src import alert_outbox
+from src.sent_alerts_store import already_sent, mark_sent
+from src.features import arredondar_features
 
 # --- Funções de Suporte ao Estado ---
 
@@ -17,23 +16,6 @@ def get_game_id(row):
     horario_str = str(row.get('Horário', '00:00')).split(' ')[-1][:5]
     return f"{row.get('País', 'NP')}-{row.get('Time 1', 'NT1')}-vs-{row.get('Time 2', 'NT2')}-{horario_str}"
 
-def load_sent_alerts():
-    """Carrega IDs de jogos já alertados."""
-    if os.path.exists(SENT_ALERTS_PATH):
-        try:
-            with open(SENT_ALERTS_PATH, 'r') as f:
-                return set(json.load(f))
-        except Exception:
-            return set()
-    return set()
-
-def save_sent_alerts(sent_alerts_set):
-    """Salva IDs de jogos já alertados."""
-    if not os.path.exists('data'): 
-        os.makedirs('data')
-    with open(SENT_ALERTS_PATH, 'w') as f:
-        json.dump(list(sent_alerts_set), f, indent=4)
-
 # --- Função de Envio Genérica ---
 
 def enviar_mensagem(chat_id, mensagem, token):
@@ -150,42 +132,52 @@ def formatar_mensagem_alerta(row):
 
 # --- Função de Envio Único (A ser chamada pelo main.py e app.py) ---
 
-def enviar_alertes_unicos(df_com_filtros_aplicados, token, usuarios):
+def enviar_alertes_unicos(df_com_filtros_aplicados, token, usuarios, regra=None):
     """
     Filtra o DF de alertas, enviando apenas os jogos que ainda não foram alertados,
     e usa a formatação detalhada.
+    Com `regra` (nome da regra de src.alert_rules), a deduplicação é por (regra, jogo): cada regra
+    entrega o jogo aos seus destinatários mesmo que outra regra já o tenha alertado.
     """
     
-    # 1. Carrega os alertas já enviados
-    sent_alerts = load_sent_alerts()
-    
-    # 2. Prepara o ID de cada jogo para verificação
+    # 1. Prepara o ID de cada jogo (e a chave de deduplicação) para verificação
     df_com_filtros_aplicados['game_id'] = df_com_filtros_aplicados.apply(get_game_id, axis=1)
-    
+    chaves = df_com_filtros_aplicados['game_id'] if regra is None else f"{regra}:" + df_com_filtros_aplicados['game_id']
+
+    # 2. Consulta só essas chaves no registro de alertas já enviados
+    sent_alerts = already_sent(chaves)
+
     # Filtra apenas os jogos que AINDA NÃO foram enviados
-    df_novos_alertas = df_com_filtros_aplicados[~df_com_filtros_aplicados['game_id'].isin(sent_alerts)].copy()
+    novos = ~chaves.isin(sent_alerts)
+    df_novos_alertas = arredondar_features(df_com_filtros_aplicados[novos].copy())  # float32 -> 2 casas
+    chaves_novas = chaves[novos]
     
-    # 3. Se houver novos alertas, envia
+    # 3. Se houver novos alertas: grava primeiro na outbox (durável), depois marca e entrega
     if not df_novos_alertas.empty:
-        
-        newly_sent_ids = set()
-        
-        for _, row in df_novos_alertas.iterrows():
-            
+
+        # Chave da outbox com a data: o mesmo game_id pode voltar depois que o registro expira
+        hoje = dt.now().strftime('%Y-%m-%d')
+        mensagens = []
+        for chave, (_, row) in zip(chaves_novas, df_novos_alertas.iterrows()):
             # Monta a mensagem usando a função detalhada
             mensagem = formatar_mensagem_alerta(row)
-            
-            # Envia para todos os usuários
-            for user_id in usuarios:
-                enviar_mensagem(user_id, mensagem, token)
-            
-            # Adiciona o ID para a atualização
-            newly_sent_ids.add(row['game_id'])
-        
-        # 4. Atualiza o registro de alertas enviados
-        sent_alerts.update(newly_sent_ids)
-        save_sent_alerts(sent_alerts)
-        
+            mensagens.extend((f"{hoje}:{chave}", user_id, mensagem) for user_id in usuarios)
+        alert_outbox.enqueue(mensagens)
+
+        # 4. Atualiza o registro de alertas enviados (a entrega agora é garantida pela outbox)
+        mark_sent(chaves_novas)
+
+        # 5. Entrega: o worker de segundo plano, se houver, senão uma drenagem imediata
+        worker = alert_outbox.running_worker()
+        if worker is not None:
+            worker.notify()
+        else:
+            relatorio = alert_outbox.drain(token)
+            print(f"[telegram] {relatorio}")
+            for d in relatorio.deliveries:
+                if not d.ok:
+                    print(f"Erro ao enviar {d.key[0]} para {d.chat_id} (nova tentativa agendada): {d.error}")
+
         return df_novos_alertas
-        
-    return pd.DataFrame()
\ No newline at end of file
+
+    return pd.DataFrame()
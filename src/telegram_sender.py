@@ -0,0 +1,120 @@
+# src/telegram_sender.py
+import os
+import asyncio
+import time
+from typing import NamedTuple
+
+import httpx
+
+# Envio assíncrono ao Telegram: um único AsyncClient (pool de conexões) e fan-out concorrente,
+# respeitando os limites do Bot API (~30 msg/s no total e ~1 msg/s por chat).
+GLOBAL_RATE_PER_SEC = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+CHAT_RATE_PER_SEC = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+MAX_CONCURRENCY = int(os.getenv("TELEGRAM_MAX_CONCURRENCY", "20"))
+REQUEST_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", "15"))
+
+
+class Delivery(NamedTuple):
+    key: object       # identificador do chamador (ex.: game_id)
+    chat_id: int
+    ok: bool
+    error: str | None
+    attempts: int
+
+
+class SendReport(NamedTuple):
+    sent: int
+    failed: int
+    throttled: int    # respostas 429 recebidas (cada uma aguardou retry_after)
+    deliveries: list  # [Delivery]
+
+    def __str__(self) -> str:
+        return f"enviadas={self.sent} falhas={self.failed} throttled={self.throttled}"
+
+
+class AsyncTokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float | None = None):
+        self.rate = rate_per_sec
+        self.capacity = capacity or max(1.0, rate_per_sec)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _send_one(client: httpx.AsyncClient, url: str, key, chat_id: int, text: str,
+                    global_bucket: AsyncTokenBucket, chat_bucket: AsyncTokenBucket,
+                    sem: asyncio.Semaphore, counters: dict) -> Delivery:
+    erro = None
+    for tentativa in range(1, MAX_RETRIES + 1):
+        await chat_bucket.take()
+        await global_bucket.take()
+        try:
+            async with sem:
+                resp = await client.post(url, data={"chat_id": chat_id, "text": text, "parse_mode": "HTML"})
+        except httpx.HTTPError as e:
+            erro = f"{type(e).__name__}: {e}"
+            await asyncio.sleep(2 ** (tentativa - 1))
+            continue
+
+        if resp.status_code == 200:
+            return Delivery(key, chat_id, True, None, tentativa)
+        if resp.status_code == 429:
+            counters["throttled"] += 1
+            try:
+                retry_after = float(resp.json().get("parameters", {}).get("retry_after", 1))
+            except Exception:
+                retry_after = float(resp.headers.get("Retry-After", 1))
+            erro = f"429 retry_after={retry_after}"
+            await asyncio.sleep(retry_after)
+            continue
+        erro = f"{resp.status_code}: {resp.text[:200]}"
+        if resp.status_code < 500:
+            break  # 400/403 (chat inválido, bot bloqueado): não adianta repetir
+        await asyncio.sleep(2 ** (tentativa - 1))
+    return Delivery(key, chat_id, False, erro, tentativa)
+
+
+async def send_all_async(messages: list[tuple], token: str) -> SendReport:
+    """`messages`: [(key, chat_id, texto)]. Envia tudo concorrentemente e devolve o relatório."""
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    global_bucket = AsyncTokenBucket(GLOBAL_RATE_PER_SEC)
+    chat_buckets: dict[int, AsyncTokenBucket] = {}
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    counters = {"throttled": 0}
+
+    limits = httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        tarefas = []
+        for key, chat_id, text in messages:
+            bucket = chat_buckets.setdefault(chat_id, AsyncTokenBucket(CHAT_RATE_PER_SEC))
+            tarefas.append(_send_one(client, url, key, chat_id, text, global_bucket, bucket, sem, counters))
+        deliveries = await asyncio.gather(*tarefas)
+
+    sent = sum(d.ok for d in deliveries)
+    return SendReport(sent, len(deliveries) - sent, counters["throttled"], list(deliveries))
+
+
+def send_all(messages: list[tuple], token: str) -> SendReport:
+    """Versão síncrona (main.py, app.py, schedulers). Dentro de um loop já ativo, roda numa thread à parte."""
+    if not messages:
+        return SendReport(0, 0, 0, [])
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(send_all_async(messages, token))
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, send_all_async(messages, token)).result()
@@ -1,31 +1,29 @@
-import pandas as pd
-from datetime import datetime, timedelta
-from src.telegram_alerts import enviar_alertas
+from datetime import datetime
+from src.telegram_alerts import enviar_alertes_unicos
+from src.kickoff_scheduler import run_kickoff_scheduler
+from src.alert_rules import RuleSet
 import os
 from dotenv import load_dotenv
-import time
 
 load_dotenv()
 token = os.getenv("TELEGRAM_TOKEN")
-usuarios = [int(x) for x in os.getenv("TELEGRAM_USERS").split(",")]
 
-EXCEL_PATH = "data/Jogos_de_Hoje.xlsx"
+# Rodar este script liga a regra de 30 min (todos os jogos) de config/alert_rules.json
+REGRAS = RuleSet.from_file("alerts", names=["todos_30min"])
+ALERT_LEAD_MINUTES = REGRAS.get("todos_30min").lead_minutes
 
-while True:
-    try:
-        df = pd.read_excel(EXCEL_PATH)
-
-        agora = datetime.now()
-        for idx, row in df.iterrows():
-            jogo_time = datetime.strptime(row['Horário'], '%H:%M')
-            jogo_time = jogo_time.replace(
-                year=agora.year, month=agora.month, day=agora.day
-            )
-
-            if timedelta(minutes=0) <= jogo_time - agora <= timedelta(minutes=30):
-                enviar_alertas(pd.DataFrame([row]), token, usuarios)
 
+def disparar_alertas(df_alertas):
+    try:
+        for hit in REGRAS.fire(df_alertas):
+            jogos = hit.games.copy()
+            jogos['Tipo_Alerta'] = hit.rule.tipo_alerta
+            enviados = enviar_alertes_unicos(jogos, token, list(hit.recipients), regra=hit.rule.name)
+            print(f"[{datetime.now()}] {len(enviados)} alerta(s) de {ALERT_LEAD_MINUTES:g} min enviados.")
     except Exception as e:
         print("Erro ao enviar alertas:", e)
 
-    time.sleep(60)  # verifica a cada minuto
+
+# Dorme até o próximo jogo entrar na janela de 30 min (heap reconstruído só quando o cache muda;
+# horário corrigido pelo HORARIO_OFFSET_HORAS da configuração)
+run_kickoff_scheduler(ALERT_LEAD_MINUTES, disparar_alertas, select=REGRAS.select)
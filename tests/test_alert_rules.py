@@ -0,0 +1,80 @@
+# tests/test_alert_rules.py
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pytz")
+
+from src.alert_rules import RuleSet, compile_rules  # noqa: E402
+
+SECAO = {
+    "params": {"perc_min": 70},
+    "all": [{"column": "Partidas", "op": ">=", "value": 5}],
+    "rules": [
+        {"name": "over", "any": [{"column": ["Prob_Over1.5", "Over15_MEDIA"], "value": "$perc_min"},
+                                 {"column": "Over25_MEDIA", "value": "$perc_min"}],
+         "recipients": [1, 2], "sort_by": "Over15_MEDIA", "ascending": False},
+        {"name": "mandante", "all": [{"column": "PPG_Casa", "op": ">=", "value": 1.5},
+                                     {"column": "PPG_A", "op": "<", "value": 1.0}],
+         "recipients": [3]},
+        {"name": "off", "enabled": False, "recipients": [], "lead_minutes": 30},
+    ],
+}
+
+DF = pd.DataFrame({
+    'Partidas': [10, 10, 3],
+    'Over15_MEDIA': [80, 60, 90],
+    'Over25_MEDIA': [40, 75, 90],
+    'PPG_Casa': [2.0, 0.5, 2.0],
+    'PPG_Fora': [0.5, 2.0, 0.5],
+})
+
+
+def test_compile_substitutes_params_and_section_conditions():
+    over = compile_rules(SECAO)[0]
+    assert [c.value for c in over.any] == [70.0, 70.0]
+    assert over.all[0].columns == ("Partidas",)
+    assert over.params == frozenset({"perc_min"})
+    assert compile_rules(SECAO, {"perc_min": 50})[0].any[0].value == 50.0
+
+
+def test_compile_rejects_unknown_operator_and_missing_param():
+    with pytest.raises(ValueError):
+        compile_rules({"rules": [{"name": "x", "all": [{"column": "A", "op": "~", "value": 1}], "recipients": []}]})
+    with pytest.raises(ValueError):
+        compile_rules({"rules": [{"name": "x", "all": [{"column": "A", "value": "$nada"}], "recipients": []}]})
+
+
+def test_evaluate_uses_first_present_column_and_section_filter():
+    regras = RuleSet(compile_rules(SECAO))
+    matriz = regras.evaluate(DF)
+    assert matriz['over'].tolist() == [True, True, False]
+
+
+def test_missing_column_never_matches(capsys):
+    matriz = RuleSet(compile_rules(SECAO)).evaluate(DF)
+    assert not matriz['mandante'].any()
+    assert "PPG_A" in capsys.readouterr().out
+
+
+def test_select_sorts_and_fire_groups_by_rule():
+    regras = RuleSet([r for r in compile_rules(SECAO) if r.name == "over"])
+    assert regras.select(DF)['Over15_MEDIA'].tolist() == [80, 60]
+    hits = regras.fire(DF)
+    assert [(h.rule.name, len(h.games), h.recipients) for h in hits] == [("over", 2, (1, 2))]
+
+
+def test_from_file_enabled_and_named(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"alerts": SECAO}), encoding="utf-8")
+    assert [r.name for r in RuleSet.from_file("alerts", path=str(path)).rules] == ["over", "mandante"]
+    regras = RuleSet.from_file("alerts", names=["off"], path=str(path))
+    assert regras.leads() == [30]
+    with pytest.raises(ValueError):
+        RuleSet.from_file("alerts", names=["inexistente"], path=str(path))
+
+
+def test_shipped_panel_rules_only_use_scraper_columns():
+    colunas = {c for r in RuleSet.from_file("painel").rules for c in r.all + r.any for c in c.columns}
+    assert "PPG_A" not in colunas and "PPG_Fora" in colunas
@@ -0,0 +1,53 @@
+# tests/test_features.py
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from src.features import FEATURE_DTYPE, arredondar_features, limpar_e_converter_dados, processar_features  # noqa: E402
+
+
+def _bruto():
+    return pd.DataFrame({
+        'Over15_H': ['56,67%', '70%', 'x'],
+        'Over15_A': ['80%', '70%', '50%'],
+        'Over25_H': ['50%', '60%', '50%'],
+        'Over25_A': ['40%', '60%', '50%'],
+        'BTTS_H': ['33,33%', '50%', '50%'],
+        'BTTS_A': ['60%', '50%', '50%'],
+        'Over35_H': ['12,5%', '20%', '10%'],
+        'PPG_Casa': ['1,57', '2', '0,5'],
+        'Partidas': ['10', '8', '3'],
+    })
+
+
+def test_percent_and_decimal_conversion():
+    df = limpar_e_converter_dados(_bruto())
+    assert len(df) == 2  # linha com porcentagem inválida é descartada
+    assert df['Over15_H'].dtype == FEATURE_DTYPE
+    assert df['Over35_H'].dtype == FEATURE_DTYPE  # Over*/BTTS* fora da lista também é porcentagem
+    assert df['PPG_Casa'].tolist() == pytest.approx([1.57, 2.0], abs=1e-6)
+    assert df['Partidas'].tolist() == [10, 8]
+
+
+def test_probabilities_and_aliases():
+    df = processar_features(_bruto())
+    assert df['Prob_Over1.5'].tolist() == pytest.approx([68.34, 70.0], abs=1e-4)
+    assert df['Over15_MEDIA'].tolist() == df['Prob_Over1.5'].tolist()
+    assert df['Over_BOTH'].tolist() == pytest.approx([46.66, 50.0], abs=1e-4)
+    assert df['MÉDIA_PROB'].tolist() == pytest.approx([53.33, 60.0], abs=1e-4)
+
+
+def test_missing_pair_leaves_media_prob_zero():
+    df = processar_features(_bruto().drop(columns=['BTTS_A']))
+    assert 'Prob_BTTS' not in df.columns
+    assert (df['MÉDIA_PROB'] == 0).all()
+
+
+def test_float32_is_rounded_for_display_and_db():
+    df = processar_features(_bruto())
+    assert f"{df['Over15_H'].iloc[0]}" != "56.67"  # float32 vaza casas
+    df = arredondar_features(df)
+    assert df['Over15_H'].dtype == np.float64
+    assert [f"{v}" for v in df['Over15_H']] == ["56.67", "70.0"]
+    assert f"{df['PPG_Casa'].iloc[0]}" == "1.57"
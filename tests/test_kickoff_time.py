@@ -0,0 +1,36 @@
+# tests/test_kickoff_time.py
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytz = pytest.importorskip("pytz")
+
+from src.kickoff_time import format_horario, minutes_of_day, parse_horario, window_mask  # noqa: E402
+
+
+def test_parse_24h_and_12h():
+    s = pd.Series(['15:30', '09:05:00', '3:30 PM', '12:00 AM', '12:15 p.m.', '2025-01-10 20:45'])
+    minutos = (parse_horario(s).dt.total_seconds() // 60).tolist()
+    assert minutos == [930, 545, 930, 0, 735, 1245]
+
+
+def test_invalid_times_stay_unparsed():
+    s = pd.Series(['13:00 PM', '0:30 AM', '24:00', '10:75', 'Postp.', None])
+    assert parse_horario(s).isna().all()
+    assert format_horario(s).tolist() == ['13:00 PM', '0:30 AM', '24:00', '10:75', 'Postp.', '']
+
+
+def test_offset_wraps_around_midnight():
+    s = pd.Series(['01:30', '23:00'])
+    assert minutes_of_day(s, offset_hours=-3).tolist() == [1350.0, 1200.0]
+    assert format_horario(s, offset_hours=-3).tolist() == ['22:30', '20:00']
+    assert format_horario(s, offset_hours=2).tolist() == ['03:30', '01:00']
+
+
+def test_window_mask():
+    zona = pytz.timezone('America/Sao_Paulo')
+    agora = zona.localize(datetime(2025, 1, 10, 12, 0))
+    df = pd.DataFrame({'Horário': ['12:10', '12:40', '11:50', 'Postp.']})
+    assert window_mask(df, 30, agora, offset_hours=0).tolist() == [True, False, False, False]
+    assert window_mask(df, 30, agora, offset_hours=-0.5).tolist() == [False, True, False, False]
@@ -0,0 +1,47 @@
+# tests/test_results_state.py
+from src import results_state as rs
+
+
+def _row(fid, status='FT', gols=(1, 0)):
+    return {'Fixture_ID': fid, 'Status': status, 'Gols_Casa': gols[0], 'Gols_Fora': gols[1],
+            'Time_Casa': 'A', 'Time_Fora': 'B', 'Liga': 'L', 'Horário': '15:00'}
+
+
+def test_merge_rows_marks_new_and_changed_rows_pending():
+    state = {}
+    assert rs.merge_rows(state, [_row(1)]) == [_row(1)]
+    assert state['1']['Aplicado'] is False and state['1']['Tentativas'] == 0
+
+    rs.record_apply(state, ['1'], ['1'])
+    assert rs.merge_rows(state, [_row(1)]) == []
+    assert state['1']['Aplicado'] is True
+
+    alterada = _row(1, gols=(2, 0))
+    assert rs.merge_rows(state, [alterada]) == [alterada]
+    assert state['1']['Aplicado'] is False
+
+
+def test_unapplied_rows_only_finished_and_not_applied():
+    state = {}
+    rs.merge_rows(state, [_row(1), _row(2, status='1H'), _row(3)])
+    rs.record_apply(state, ['1', '3'], ['3'])
+    assert [r['Fixture_ID'] for r in rs.unapplied_rows(state)] == [1]
+
+
+def test_record_apply_ignores_unfinished_and_unknown_ids():
+    state = {}
+    rs.merge_rows(state, [_row(1, status='1H')])
+    rs.record_apply(state, ['1', '99'], [])
+    assert state['1']['Tentativas'] == 0
+    assert '99' not in state
+
+
+def test_attempt_cap_drops_row_from_unapplied(monkeypatch):
+    monkeypatch.setattr(rs, 'APPLY_MAX_ATTEMPTS', 2)
+    state = {}
+    rs.merge_rows(state, [_row(1)])
+    rs.record_apply(state, ['1'], [])
+    assert len(rs.unapplied_rows(state)) == 1
+    rs.record_apply(state, ['1'], [])
+    assert state['1']['Tentativas'] == 2
+    assert rs.unapplied_rows(state) == []
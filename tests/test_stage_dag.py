@@ -0,0 +1,70 @@
+# tests/test_stage_dag.py
+import pytest
+
+from src.stage_dag import Stage, StageDAG
+
+
+def test_stage_with_same_inputs_is_skipped_after_success():
+    chamadas = []
+    entrada = {'v': 1}
+    dag = StageDAG([Stage('a', lambda r: chamadas.append(1) or 'ok', inputs=lambda r: entrada['v'])])
+
+    assert dag.run()['a'].status == 'ok'
+    assert dag.run()['a'].status == 'skipped'
+    entrada['v'] = 2
+    assert dag.run()['a'].status == 'ok'
+    assert len(chamadas) == 2
+
+
+def test_stage_without_inputs_always_runs():
+    chamadas = []
+    dag = StageDAG([Stage('a', lambda r: chamadas.append(1))])
+    dag.run()
+    dag.run()
+    assert len(chamadas) == 2
+
+
+def test_failed_run_does_not_record_fingerprint():
+    falhas = {'n': 1}
+
+    def run(_):
+        if falhas['n']:
+            falhas['n'] -= 1
+            raise RuntimeError('falhou')
+        return 'ok'
+
+    dag = StageDAG([Stage('a', run, inputs=lambda r: 'mesma')])
+    assert dag.run()['a'].status == 'error'
+    assert dag.run()['a'].status == 'ok'
+
+
+def test_dependency_results_and_skipped_dependency():
+    dag = StageDAG([
+        Stage('a', lambda r: 10, inputs=lambda r: 'fixo'),
+        Stage('b', lambda r: r.get('a'), deps=('a',)),
+    ])
+    assert dag.run()['b'].result == 10
+    runs = dag.run()
+    assert runs['a'].status == 'skipped'
+    assert runs['b'].status == 'ok' and runs['b'].result is None  # pulado não publica resultado
+
+
+def test_failed_dependency_blocks_unless_not_required():
+    def falha(_):
+        raise RuntimeError('x')
+
+    runs = StageDAG([
+        Stage('a', falha),
+        Stage('b', lambda r: 'b', deps=('a',)),
+        Stage('c', lambda r: 'c', deps=('a',), require_deps_ok=False),
+    ]).run()
+    assert runs['a'].status == 'error'
+    assert runs['b'].status == 'blocked'
+    assert runs['c'].status == 'ok'
+
+
+def test_unknown_dependency_and_cycle_raise():
+    with pytest.raises(ValueError):
+        StageDAG([Stage('a', lambda r: None, deps=('x',))])
+    with pytest.raises(ValueError):
+        StageDAG([Stage('a', lambda r: None, deps=('b',)), Stage('b', lambda r: None, deps=('a',))]).run()
@@ -0,0 +1,61 @@
+# tests/test_team_matcher.py
+import datetime as dt
+
+from src.team_matcher import MIN_SCORE, TeamMatchIndex, similarity, _token_set, stopwords
+from src.team_aliases import AliasStore
+
+DIA = dt.date(2025, 1, 10)
+
+
+def _index(rows):
+    return TeamMatchIndex([(i, DIA, casa, fora) for i, (casa, fora) in enumerate(rows, start=1)])
+
+
+def test_similarity_bounds():
+    sw = stopwords()
+    assert similarity(_token_set('FC Porto', sw), _token_set('Porto', sw)) == 1.0
+    assert similarity(_token_set('Porto', sw), _token_set('Benfica', sw)) == 0.0
+
+
+def test_match_ok_and_reversed():
+    idx = _index([('Sporting CP', 'FC Porto'), ('Benfica', 'Braga')])
+    res = idx.match(DIA, 'Sporting', 'Porto')
+    assert res.status == 'ok' and res.match_id == 1 and not res.reversed
+
+    res = idx.match(DIA, 'Porto', 'Sporting CP')
+    assert res.status == 'ok' and res.match_id == 1 and res.reversed
+
+
+def test_match_requires_min_score_and_same_date():
+    idx = _index([('Real Madrid Castilla', 'Atletico Madrid B')])
+    res = idx.match(DIA, 'Real Sociedad San Sebastian', 'Sevilla Atletico')
+    assert res.status == 'none' and res.score < MIN_SCORE
+    assert idx.match(DIA + dt.timedelta(days=1), 'Real Madrid Castilla', 'Atletico Madrid').status == 'none'
+    assert idx.match(DIA, 'Real Madrid Castilla', 'Atletico Madrid').status == 'ok'
+    assert idx.match(DIA, 'Real Madrid Castilla', 'Atletico Madrid', min_score=1.01).status == 'none'
+
+
+def test_match_ambiguous_within_margin_is_reported():
+    idx = _index([('Nacional', 'Penarol'), ('Nacional', 'Penarol Montevideo')])
+    res = idx.match(DIA, 'Nacional', 'Penarol Montevideo', min_margin=0.5)
+    assert res.status == 'ambiguous' and res.match_id is None
+    assert len(idx.ambiguities) == 1 and len(idx.ambiguities[0]['candidatos']) == 2
+
+    assert idx.match(DIA, 'Nacional', 'Penarol Montevideo', min_margin=0.0).match_id == 2
+
+
+def test_alias_store_pending_and_manual(tmp_path):
+    store = AliasStore(str(tmp_path / 'aliases.sqlite'))
+    assert store.learn('FC Santiago', 'Santiago City')
+    assert store.get('fc  santiago') == 'Santiago City'
+    assert not store.learn('Porto', 'porto')  # nomes iguais não viram alias
+
+    assert store.suggest('Club X', 'X United')
+    assert store.get('Club X') is None
+    assert AliasStore(store.path).get('Club X') is None
+    assert store.confirm('Club X') and store.get('Club X') == 'X United'
+
+    store.learn('Y', 'Manual Y', origin='manual')
+    assert not store.learn('Y', 'Auto Y')
+    assert not store.suggest('Y', 'Outro Y')
+    assert AliasStore(store.path).get('Y') == 'Manual Y'